@@ -0,0 +1,4 @@
+# Local performance benchmarks for the Motivo API.
+#
+# Run them through the management commands, e.g.
+#   python manage.py loadtest
@@ -0,0 +1,117 @@
+"""
+Concurrent throughput of the async (ASGI) read path against the DRF (WSGI) one.
+
+The WSGI side runs N client threads through django.test.Client; the ASGI side
+runs N concurrent coroutines through django.test.AsyncClient, which drives
+Django's ASGIHandler in-process.
+"""
+import asyncio
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection
+from django.test import AsyncClient, Client
+
+from .loadtest import percentile
+
+# (name, WSGI path, ASGI path, needs auth)
+ENDPOINTS = [
+    ("categories", "/api/categories/", "/api/async/categories/", False),
+    ("product_list", "/api/products/?category={category}", "/api/async/products/?category={category}", False),
+    ("product_search", "/api/products/?search=car", "/api/async/products/?search=car", False),
+    ("product_detail", "/api/products/{pid}/", "/api/async/products/{pid}/", False),
+    ("product_related", "/api/products/{pid}/related/", "/api/async/products/{pid}/related/", False),
+    ("wishlist", "/api/wishlist-items/", "/api/async/wishlist-items/", True),
+]
+
+
+def _paths(template, ctx, count, seed_value):
+    rng = random.Random(seed_value)
+    return [
+        template.format(pid=rng.choice(ctx["product_ids"]), category=rng.choice(ctx["category_slugs"]))
+        for _ in range(count)
+    ]
+
+
+def _summary(latencies, wall):
+    latencies = [t * 1000 for t in latencies]
+    return {
+        "requests_per_s": round(len(latencies) / wall, 1) if wall else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+    }
+
+
+def run_wsgi(paths, headers, concurrency):
+    def worker(chunk):
+        client = Client()
+        timings = []
+        for path in chunk:
+            start = time.perf_counter()
+            client.get(path, **headers)
+            timings.append(time.perf_counter() - start)
+        connection.close()
+        return timings
+
+    chunks = [paths[i::concurrency] for i in range(concurrency)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = [t for timings in pool.map(worker, chunks) for t in timings]
+    return _summary(latencies, time.perf_counter() - start)
+
+
+def run_asgi(paths, headers, concurrency):
+    async def main():
+        client = AsyncClient()
+        gate = asyncio.Semaphore(concurrency)
+        latencies = []
+
+        async def one(path):
+            async with gate:
+                start = time.perf_counter()
+                await client.get(path, **headers)
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(path) for path in paths))
+        return latencies, time.perf_counter() - start
+
+    latencies, wall = asyncio.run(main())
+    return _summary(latencies, wall)
+
+
+def check_same_shape(ctx, seed_value=1):
+    """Return the endpoints whose async response differs from the DRF one."""
+    client = Client()
+    mismatched = []
+    for name, wsgi_path, asgi_path, auth in ENDPOINTS:
+        headers = ctx["buyer_auth"] if auth else {}
+        wsgi = client.get(_paths(wsgi_path, ctx, 1, seed_value)[0], **headers)
+        asgi = client.get(_paths(asgi_path, ctx, 1, seed_value)[0], **headers)
+        if wsgi.status_code != asgi.status_code or json.loads(wsgi.content) != json.loads(asgi.content):
+            mismatched.append(name)
+    return mismatched
+
+
+def compare(ctx, requests=200, concurrency=16, seed_value=1):
+    results = {}
+    for name, wsgi_path, asgi_path, auth in ENDPOINTS:
+        headers = ctx["buyer_auth"] if auth else {}
+        results[name] = {
+            "wsgi": run_wsgi(_paths(wsgi_path, ctx, requests, seed_value), headers, concurrency),
+            "asgi": run_asgi(_paths(asgi_path, ctx, requests, seed_value), headers, concurrency),
+        }
+    return results
+
+
+def format_table(results):
+    header = f"{'endpoint':<17}{'wsgi req/s':>12}{'asgi req/s':>12}{'wsgi p95':>10}{'asgi p95':>10}"
+    lines = [header, "-" * len(header)]
+    for name, r in results.items():
+        lines.append(
+            f"{name:<17}{r['wsgi']['requests_per_s']:>12.1f}{r['asgi']['requests_per_s']:>12.1f}"
+            f"{r['wsgi']['p95_ms']:>10.2f}{r['asgi']['p95_ms']:>10.2f}"
+        )
+    return "\n".join(lines)
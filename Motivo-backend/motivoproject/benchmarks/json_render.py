@@ -0,0 +1,69 @@
+"""
+Microbenchmark for JSON encoding/decoding of ProductSerializer and
+OrderSerializer output: DRF's stdlib JSONRenderer/JSONParser against
+motivoapp.renderers.FastJSONRenderer/FastJSONParser.
+
+Serializer output is produced once from real rows and tiled up to the
+requested size, so only the encode/decode step is timed.
+"""
+import io
+import itertools
+import time
+
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from motivoapp.models import Order, Product
+from motivoapp.renderers import FastJSONParser, FastJSONRenderer, orjson
+from motivoapp.serializers import OrderSerializer, ProductSerializer
+
+
+def sample_payloads():
+    products = ProductSerializer(Product.objects.select_related("category"), many=True).data
+    orders = OrderSerializer(
+        Order.objects.select_related("user", "payment").prefetch_related("order_items__product__category"),
+        many=True,
+    ).data
+    return {"products": list(products), "orders": list(orders)}
+
+
+def _best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run(payloads, sizes=(1_000, 5_000, 10_000), repeat=5):
+    stdlib_renderer, fast_renderer = JSONRenderer(), FastJSONRenderer()
+    stdlib_parser, fast_parser = JSONParser(), FastJSONParser()
+    results = []
+    for name, rows in payloads.items():
+        for size in sizes:
+            data = list(itertools.islice(itertools.cycle(rows), size))
+            body = stdlib_renderer.render(data)
+            results.append({
+                "payload": name,
+                "rows": size,
+                "kb": round(len(body) / 1024),
+                "render_stdlib_ms": _best_of(lambda: stdlib_renderer.render(data), repeat),
+                "render_fast_ms": _best_of(lambda: fast_renderer.render(data), repeat),
+                "parse_stdlib_ms": _best_of(lambda: stdlib_parser.parse(io.BytesIO(body)), repeat),
+                "parse_fast_ms": _best_of(lambda: fast_parser.parse(io.BytesIO(body)), repeat),
+            })
+    return results
+
+
+def format_table(results):
+    header = (f"{'payload':<10}{'rows':>7}{'KB':>7}{'render std':>12}{'render fast':>13}"
+              f"{'parse std':>11}{'parse fast':>12}")
+    lines = [f"orjson {'available' if orjson else 'NOT installed (fast path falls back to stdlib)'}", header,
+             "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r['payload']:<10}{r['rows']:>7}{r['kb']:>7}{r['render_stdlib_ms']:>10.1f}ms"
+            f"{r['render_fast_ms']:>11.1f}ms{r['parse_stdlib_ms']:>9.1f}ms{r['parse_fast_ms']:>10.1f}ms"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,340 @@
+"""
+In-process HTTP load benchmark for the API.
+
+Requests go through the full WSGI stack (middleware, DRF, JWT auth) via
+django.test.Client against a throwaway benchmark database, so numbers reflect
+what gunicorn would run minus the network.
+"""
+import json
+import math
+import random
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from decimal import Decimal
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext, override_settings, setup_test_environment, teardown_test_environment,
+)
+from rest_framework_simplejwt.tokens import RefreshToken
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+
+SEARCH_TERMS = ["car", "doll", "ball", "block", "kit", "set"]
+PRODUCT_WORDS = ["Car", "Doll", "Ball", "Block", "Kit", "Set", "Puzzle", "Crayon", "Bottle", "Frock"]
+AGE_RANGES = ["0-2 years", "3-5 years", "6-8 years", "9-12 years", "13+ years"]
+
+
+# ------------------------
+# Fixture data
+# ------------------------
+@contextmanager
+def benchmark_database():
+    """Create a throwaway test database (file-backed for SQLite so threads can share it)."""
+    setup_test_environment()
+    settings_dict = connection.settings_dict
+    old_name = settings_dict["NAME"]
+    if connection.vendor == "sqlite":
+        settings_dict.setdefault("TEST", {})["NAME"] = str(Path(tempfile.gettempdir()) / "motivo_loadtest.sqlite3")
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    # One simulated client from one IP would just drain the auth/checkout
+    # buckets, and --concurrency threads can exceed the per-process in-flight
+    # caps; measure the handlers, not the limits.
+    limits = override_settings(RATE_LIMITS={}, CONCURRENCY_LIMITS={})
+    limits.enable()
+    try:
+        yield
+    finally:
+        limits.disable()
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def seed(products=200, orders=20, seed_value=1):
+    """Populate the benchmark database with a small, deterministic catalog."""
+    from motivoapp.models import Category, Product, CartItem, WishlistItem, Order, OrderItem, Payment
+    from sellers.models import Seller
+
+    rng = random.Random(seed_value)
+    categories = list(Category.objects.all())
+    if not categories:
+        categories = [Category.objects.create(name=name) for name, _ in Category.CATEGORY_CHOICES]
+
+    seller = User.objects.create_user(username="bench-seller@example.com", email="bench-seller@example.com")
+    Seller.objects.create(user=seller, shop_name="Bench Toys")
+    buyer = User.objects.create_user(username="bench-buyer@example.com", email="bench-buyer@example.com")
+
+    rows = []
+    for i in range(products):
+        price = Decimal(rng.randint(99, 4999))
+        rows.append(Product(
+            seller=seller,
+            category=categories[i % len(categories)],
+            name=f"{rng.choice(PRODUCT_WORDS)} {rng.choice(PRODUCT_WORDS)} {i}",
+            slug=f"bench-product-{i}",
+            description="Benchmark product",
+            price=price,
+            original_price=price + rng.randint(0, 500),
+            age_range=rng.choice(AGE_RANGES),
+            location="Hyderabad",
+        ))
+    Product.objects.bulk_create(rows)
+
+    product_ids = list(Product.objects.values_list("id", flat=True))
+    CartItem.objects.bulk_create(
+        CartItem(user=buyer, product_id=pid, quantity=1) for pid in product_ids[:3]
+    )
+    WishlistItem.objects.bulk_create(WishlistItem(user=buyer, product_id=pid) for pid in product_ids[-5:])
+
+    prices = dict(Product.objects.values_list("id", "price"))
+    for _ in range(orders):
+        lines = [(pid, rng.randint(1, 3)) for pid in rng.sample(product_ids, 3)]
+        total = sum(prices[pid] * qty for pid, qty in lines)
+        order = Order.objects.create(user=buyer, total_price=total)
+        OrderItem.objects.bulk_create(
+            OrderItem(order=order, product_id=pid, quantity=qty, price_at_purchase=prices[pid]) for pid, qty in lines
+        )
+        Payment.objects.create(order=order, amount=total, payment_method="card", payment_status="Completed")
+    return {"seller": seller, "buyer": buyer, "product_ids": product_ids}
+
+
+def _auth_header(user):
+    return {"HTTP_AUTHORIZATION": f"Bearer {RefreshToken.for_user(user).access_token}"}
+
+
+# ------------------------
+# Scenarios
+# ------------------------
+# Each scenario performs one iteration (one or more requests) and returns the
+# number of HTTP requests it issued. Anything that must not be measured
+# (looking up an OTP code, picking ids) happens outside the request calls.
+# Read-only scenarios run first so that writes from cart_add/checkout do not
+# change what they measure.
+
+def catalog_browse(client, ctx, rng):
+    client.get("/api/categories/")
+    client.get("/api/products/", {"category": rng.choice(ctx["category_slugs"])})
+    return 2
+
+
+def catalog_search(client, ctx, rng):
+    client.get("/api/products/", {"search": rng.choice(SEARCH_TERMS)})
+    return 1
+
+
+def product_detail(client, ctx, rng):
+    pid = rng.choice(ctx["product_ids"])
+    client.get(f"/api/products/{pid}/")
+    client.get(f"/api/products/{pid}/related/")
+    return 2
+
+
+def cart_add(client, ctx, rng):
+    client.post(
+        "/api/cart/",
+        {"product_id": rng.choice(ctx["product_ids"]), "quantity": 1},
+        content_type="application/json",
+        **ctx["buyer_auth"],
+    )
+    return 1
+
+
+def checkout(client, ctx, rng):
+    items = [{"product": pid, "quantity": rng.randint(1, 3)} for pid in rng.sample(ctx["product_ids"], 3)]
+    client.post("/api/orders/", {"items": items}, content_type="application/json", **ctx["buyer_auth"])
+    return 1
+
+
+def otp_login(client, ctx, rng):
+    from motivoapp.models import OTP
+
+    email = ctx["buyer"].email
+    client.post("/api/auth/login/", {"email": email}, content_type="application/json")
+    with ctx["untimed"]():
+        code = OTP.objects.filter(user=ctx["buyer"], verified=False).order_by("-created_at").values_list("code", flat=True).first()
+    client.post("/api/auth/verify-otp/", {"email": email, "otp": code}, content_type="application/json")
+    return 2
+
+
+def _consume(response):
+    # Streamed bodies are produced (and their queries run) only as they're read
+    return b"".join(response.streaming_content) if response.streaming else response.content
+
+
+def seller_dashboard(client, ctx, rng):
+    client.get("/api/sellers/dashboard-stats/", **ctx["seller_auth"])
+    _consume(client.get("/api/sellers/my-products/", **ctx["seller_auth"]))
+    _consume(client.get("/api/sellers/my-orders/", **ctx["seller_auth"]))
+    return 3
+
+
+SCENARIOS = {
+    "catalog_browse": catalog_browse,
+    "catalog_search": catalog_search,
+    "product_detail": product_detail,
+    "seller_dashboard": seller_dashboard,
+    "otp_login": otp_login,
+    "cart_add": cart_add,
+    "checkout": checkout,
+}
+
+
+# ------------------------
+# Runner
+# ------------------------
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lo, hi = math.floor(k), math.ceil(k)
+    if lo == hi:
+        return ordered[int(k)]
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+class _Untimed:
+    """Lets a scenario exclude bookkeeping queries from its own measurement."""
+
+    def __init__(self):
+        self.local = threading.local()
+
+    def __call__(self):
+        return self
+
+    def __enter__(self):
+        self.local.start = time.perf_counter()
+        self.local.queries = len(connection.queries)
+
+    def __exit__(self, *exc):
+        self.local.skipped_time = getattr(self.local, "skipped_time", 0.0) + time.perf_counter() - self.local.start
+        self.local.skipped_queries = getattr(self.local, "skipped_queries", 0) + len(connection.queries) - self.local.queries
+
+    def pop(self):
+        skipped = getattr(self.local, "skipped_time", 0.0), getattr(self.local, "skipped_queries", 0)
+        self.local.skipped_time, self.local.skipped_queries = 0.0, 0
+        return skipped
+
+
+def build_context(data):
+    from motivoapp.models import Category
+
+    return {
+        "buyer": data["buyer"],
+        "seller": data["seller"],
+        "product_ids": data["product_ids"],
+        "category_slugs": list(Category.objects.values_list("slug", flat=True)),
+        "buyer_auth": _auth_header(data["buyer"]),
+        "seller_auth": _auth_header(data["seller"]),
+        "untimed": _Untimed(),
+    }
+
+
+def _run_iteration(scenario, ctx, rng, client):
+    # The query log is a bounded deque; start each iteration empty so the
+    # counts stay exact on long runs.
+    connection.queries_log.clear()
+    with CaptureQueriesContext(connection) as captured:
+        start = time.perf_counter()
+        requests = scenario(client, ctx, rng)
+        elapsed = time.perf_counter() - start
+    skipped_time, skipped_queries = ctx["untimed"].pop()
+    return elapsed - skipped_time, len(captured) - skipped_queries, requests
+
+
+def run_scenario(name, ctx, iterations=50, warmup=5, concurrency=1, seed_value=1):
+    scenario = SCENARIOS[name]
+
+    def worker(worker_id, count):
+        rng = random.Random(f"{seed_value}-{name}-{worker_id}")
+        client = Client()
+        for _ in range(warmup):
+            _run_iteration(scenario, ctx, rng, client)
+        results = [_run_iteration(scenario, ctx, rng, client) for _ in range(count)]
+        connection.close()
+        return results
+
+    shares = [iterations // concurrency + (1 if i < iterations % concurrency else 0) for i in range(concurrency)]
+    wall_start = time.perf_counter()
+    if concurrency == 1:
+        samples = worker(0, iterations)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            samples = [s for chunk in pool.map(worker, range(concurrency), shares) for s in chunk]
+    wall = time.perf_counter() - wall_start
+
+    latencies = [s[0] * 1000 for s in samples]
+    total_requests = sum(s[2] for s in samples)
+    return {
+        "iterations": len(samples),
+        "requests": total_requests,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "mean_ms": round(statistics.fmean(latencies), 3) if latencies else 0.0,
+        "iterations_per_s": round(len(samples) / wall, 2) if wall else 0.0,
+        "requests_per_s": round(total_requests / wall, 2) if wall else 0.0,
+        "queries_per_request": round(sum(s[1] for s in samples) / total_requests, 2) if total_requests else 0.0,
+    }
+
+
+# ------------------------
+# Baseline comparison
+# ------------------------
+def load_baseline(path=BASELINE_PATH):
+    path = Path(path)
+    if not path.exists():
+        return None
+    with path.open() as fh:
+        return json.load(fh)
+
+
+def save_baseline(results, meta, path=BASELINE_PATH):
+    with Path(path).open("w") as fh:
+        json.dump({"meta": meta, "scenarios": results}, fh, indent=2, sort_keys=True)
+        fh.write("\n")
+
+
+def compare(results, baseline, tolerance=0.25):
+    """
+    Compare a run against a baseline. Latency may drift by `tolerance`
+    (machines differ); query counts only get a little slack because cart_add
+    alternates between insert and update depending on which products it picks.
+    """
+    regressions = []
+    if not baseline:
+        return regressions
+    for name, current in results.items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        allowed = previous["queries_per_request"] + max(0.5, previous["queries_per_request"] * 0.05)
+        if current["queries_per_request"] > allowed:
+            regressions.append(
+                f"{name}: queries/request {previous['queries_per_request']} -> {current['queries_per_request']}"
+            )
+        for key in ("p50_ms", "p95_ms"):
+            if previous[key] and current[key] > previous[key] * (1 + tolerance):
+                regressions.append(f"{name}: {key} {previous[key]} -> {current[key]}")
+    return regressions
+
+
+def format_table(results, baseline=None):
+    header = f"{'scenario':<18}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}{'q/req':>8}"
+    lines = [header, "-" * len(header)]
+    previous = (baseline or {}).get("scenarios", {})
+    for name, r in results.items():
+        line = f"{name:<18}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}{r['requests_per_s']:>10.1f}{r['queries_per_request']:>8.2f}"
+        if name in previous:
+            old = previous[name]
+            delta = (r["p95_ms"] / old["p95_ms"] - 1) * 100 if old["p95_ms"] else 0.0
+            line += f"   p95 {delta:+.0f}% vs baseline, q/req was {old['queries_per_request']:.2f}"
+        lines.append(line)
+    return "\n".join(lines)
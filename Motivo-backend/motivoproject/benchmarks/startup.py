@@ -0,0 +1,95 @@
+"""
+Cold-start profile of the Django process.
+
+A fresh interpreter is started with `python -X importtime` and goes through
+the same steps as a worker booting: settings, django.setup(), the WSGI
+handler (middleware), the URL resolver and, optionally, motivoapp.warmup.
+Phase timings come back on stdout. The import log on stderr gives each
+module's self and cumulative import time.
+"""
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+# Runs in the child process; prints {phase: seconds} as JSON
+BOOT_SCRIPT = """
+import json, sys, time
+phases = {}
+start = last = time.perf_counter()
+def mark(name):
+    global last
+    now = time.perf_counter()
+    phases[name] = now - last
+    last = now
+
+from django.conf import settings
+settings.INSTALLED_APPS
+mark("settings")
+import django
+django.setup()
+mark("django.setup")
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+mark("wsgi handler")
+from django.urls import get_resolver
+get_resolver().url_patterns
+mark("url resolver")
+if "--warmup" in sys.argv:
+    from motivoapp.warmup import warm_up
+    for step, seconds in warm_up().items():
+        phases["warmup: " + step] = seconds
+    last = time.perf_counter()
+phases["total"] = time.perf_counter() - start
+print(json.dumps(phases))
+"""
+
+
+def run(warmup=False, settings_module="motivoproject.settings"):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings_module, WARMUP_ON_START="")
+    args = [sys.executable, "-X", "importtime", "-c", BOOT_SCRIPT] + (["--warmup"] if warmup else [])
+    proc = subprocess.run(args, cwd=PROJECT_DIR, env=env, capture_output=True, text=True)
+    if proc.returncode:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "boot failed")
+    phases = json.loads(proc.stdout.strip().splitlines()[-1])
+    return phases, parse_importtime(proc.stderr)
+
+
+def parse_importtime(log):
+    """[(module, self_seconds, cumulative_seconds)] from `-X importtime` output."""
+    modules = []
+    for line in log.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the header line
+        modules.append((fields[2].strip(), int(fields[0]) / 1e6, int(fields[1]) / 1e6))
+    return modules
+
+
+def by_package(modules):
+    """{top-level package: summed self time}, largest first."""
+    totals = defaultdict(float)
+    for name, self_time, _ in modules:
+        totals[name.split(".")[0]] += self_time
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def format_report(phases, modules, limit=25):
+    lines = ["Phases", f"{'phase':<24}{'ms':>10}"]
+    for name, seconds in phases.items():
+        lines.append(f"{name:<24}{'failed' if seconds is None else f'{seconds * 1000:.1f}':>10}")
+
+    lines += ["", f"Slowest imports ({len(modules)} modules)", f"{'module':<56}{'self ms':>10}{'cum ms':>10}"]
+    for name, self_time, cumulative in sorted(modules, key=lambda m: m[2], reverse=True)[:limit]:
+        lines.append(f"{name:<56}{self_time * 1000:>10.1f}{cumulative * 1000:>10.1f}")
+
+    lines += ["", "Import time by package (self)", f"{'package':<56}{'ms':>10}"]
+    for package, seconds in list(by_package(modules).items())[:limit]:
+        lines.append(f"{package:<56}{seconds * 1000:>10.1f}")
+    return "\n".join(lines)
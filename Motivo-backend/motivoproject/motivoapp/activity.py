@@ -0,0 +1,126 @@
+# activity.py
+#
+# Buffered product view / cart-add counters and the trending ranking built
+# from them.
+#
+# Writing a row per product view would serialise every product page on the
+# SQLite write lock. Instead each process counts in memory, keyed by
+# (product, hour), and every FLUSH_INTERVAL seconds writes the whole buffer
+# as one batch of upserts into ProductActivity. A crash loses at most one
+# interval of counts, which is fine for ranking.
+import atexit
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.db.models import F, FloatField, Sum, Value
+from django.db.models.functions import Exp
+
+from .metrics import registry as metrics_registry
+from .models import Product, ProductActivity
+
+VIEW = 0
+CART_ADD = 1
+
+
+def current_hour():
+    return int(time.time() // 3600)
+
+
+class ActivityBuffer:
+    def __init__(self, flush_interval=10.0, max_pending=5000):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.pending = {}  # (product_id, hour) -> [views, cart_adds]
+        self.lock = threading.Lock()
+        self.last_flush = time.monotonic()
+
+    def record(self, product_id, kind, amount=1):
+        key = (int(product_id), current_hour())
+        with self.lock:
+            counts = self.pending.get(key)
+            if counts is None:
+                counts = self.pending[key] = [0, 0]
+            counts[kind] += amount
+
+    def maybe_flush(self):
+        if not self.pending:
+            return 0
+        if time.monotonic() - self.last_flush < self.flush_interval and len(self.pending) < self.max_pending:
+            return 0
+        return self.flush()
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            self.last_flush = time.monotonic()
+        if not pending:
+            return 0
+
+        try:
+            # Products deleted since they were counted would fail the FK
+            live = set(Product.objects.filter(id__in={pid for pid, _ in pending}).values_list('id', flat=True))
+            rows = [(pid, hour, v, c) for (pid, hour), (v, c) in pending.items() if pid in live]
+            if rows:
+                table = connection.ops.quote_name(ProductActivity._meta.db_table)
+                sql = (
+                    f"INSERT INTO {table} (product_id, hour, views, cart_adds) VALUES (%s, %s, %s, %s) "
+                    f"ON CONFLICT (product_id, hour) DO UPDATE SET "
+                    f"views = {table}.views + excluded.views, "
+                    f"cart_adds = {table}.cart_adds + excluded.cart_adds"
+                )
+                with transaction.atomic(), connection.cursor() as cursor:
+                    cursor.executemany(sql, rows)
+        except DatabaseError:
+            # Put the counts back and retry on the next flush (e.g. database locked)
+            with self.lock:
+                for key, (v, c) in pending.items():
+                    counts = self.pending.setdefault(key, [0, 0])
+                    counts[VIEW] += v
+                    counts[CART_ADD] += c
+            metrics_registry.inc("activity_flush_errors_total")
+            return 0
+        return len(rows)
+
+
+_config = getattr(settings, "PRODUCT_ACTIVITY", {})
+activity_buffer = ActivityBuffer(
+    flush_interval=_config.get("FLUSH_INTERVAL", 10.0),
+    max_pending=_config.get("MAX_PENDING", 5000),
+)
+atexit.register(activity_buffer.flush)
+
+
+def trending(limit=10, category_slug=None, now_hour=None):
+    """
+    [(product_id, score)] ranked by exponentially decayed activity:
+        score = sum over hourly buckets of
+                (views * VIEW_WEIGHT + cart_adds * CART_ADD_WEIGHT) * 2 ** (-age_hours / HALF_LIFE_HOURS)
+    Only buckets inside WINDOW_HOURS are read (hour index), and the decay is
+    computed in the database, so this is one grouped query.
+    """
+    if now_hour is None:
+        now_hour = current_hour()
+    decay = math.log(2) / _config.get("HALF_LIFE_HOURS", 24)
+    weighted = (
+        F('views') * Value(float(_config.get("VIEW_WEIGHT", 1.0)))
+        + F('cart_adds') * Value(float(_config.get("CART_ADD_WEIGHT", 5.0)))
+    )
+    age_factor = Exp((F('hour') - now_hour) * Value(decay), output_field=FloatField())
+
+    rows = ProductActivity.objects.filter(hour__gt=now_hour - _config.get("WINDOW_HOURS", 168))
+    if category_slug:
+        rows = rows.filter(product__category__slug__iexact=category_slug)
+    rows = (
+        rows.values('product_id')
+        .annotate(score=Sum(weighted * age_factor, output_field=FloatField()))
+        .order_by('-score', 'product_id')[:limit]
+    )
+    return [(row['product_id'], row['score']) for row in rows]
+
+
+def trending_cache_key(limit, category_slug=""):
+    # ProductViewSet.trending caches ranked ids under this key for a minute
+    return f"trending:{(category_slug or '').lower()}:{limit}"
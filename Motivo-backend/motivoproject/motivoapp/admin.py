@@ -1,44 +1,104 @@
 from django.contrib import admin
+from django.utils import timezone
 from .models import (
     UserProfile, Category, Product, CartItem,
-    WishlistItem, Order, OrderItem
+    WishlistItem, Order, OrderItem, Review, ArchivedOrder, Job
 )
+from .admin_utils import LargeTableAdmin, SellerInputFilter, UserFilter
+
+# Big tables use LargeTableAdmin (bounded counts), list_select_related for
+# every FK shown in list_display, text-box filters instead of per-user
+# sidebars, and autocomplete/raw-id widgets instead of <select>s of all rows.
 
 @admin.register(UserProfile)
-class UserProfileAdmin(admin.ModelAdmin):
+class UserProfileAdmin(LargeTableAdmin):
     list_display = ('user', 'phone', 'city', 'zip_code')
     search_fields = ('user__username', 'phone', 'city', 'zip_code')
+    list_select_related = ('user',)
+    raw_id_fields = ('user',)
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
     list_display = ('name', 'slug')
+    search_fields = ('name',)
     prepopulated_fields = {'slug': ('name',)}
 
 @admin.register(Product)
-class ProductAdmin(admin.ModelAdmin):
+class ProductAdmin(LargeTableAdmin):
     list_display = ('name', 'category', 'seller', 'price', 'rating', 'is_new', 'is_sale', 'location','created_at')
-    list_filter = ('category', 'seller', 'is_new', 'is_sale', 'age_range', 'created_at')
+    list_filter = ('category', SellerInputFilter, 'is_new', 'is_sale', 'age_range', 'created_at')
     search_fields = ('name', 'description', 'seller__username')
     prepopulated_fields = {'slug': ('name',)}
+    list_select_related = ('category', 'seller')
+    autocomplete_fields = ('category', 'seller')
 
 
 @admin.register(CartItem)
-class CartItemAdmin(admin.ModelAdmin):
+class CartItemAdmin(LargeTableAdmin):
     list_display = ('user', 'product', 'quantity')
     search_fields = ('user__username', 'product__name')
+    list_filter = (UserFilter,)
+    list_select_related = ('user', 'product')
+    autocomplete_fields = ('user', 'product')
 
 @admin.register(WishlistItem)
-class WishlistItemAdmin(admin.ModelAdmin):
+class WishlistItemAdmin(LargeTableAdmin):
     list_display = ('user', 'product')
     search_fields = ('user__username', 'product__name')
+    list_filter = (UserFilter,)
+    list_select_related = ('user', 'product')
+    autocomplete_fields = ('user', 'product')
 
 @admin.register(Order)
-class OrderAdmin(admin.ModelAdmin):
+class OrderAdmin(LargeTableAdmin):
     list_display = ('id', 'user', 'total_price', 'status', 'created_at')
-    list_filter = ('status', 'created_at')
+    list_filter = ('status', UserFilter, 'created_at')
     search_fields = ('user__username',)
+    list_select_related = ('user',)
+    autocomplete_fields = ('user',)
 
 @admin.register(OrderItem)
-class OrderItemAdmin(admin.ModelAdmin):
+class OrderItemAdmin(LargeTableAdmin):
     list_display = ('order', 'product', 'quantity', 'price_at_purchase')
     search_fields = ('order__id', 'product__name')
+    # Order.__str__ shows the buyer's username
+    list_select_related = ('order__user', 'product')
+    raw_id_fields = ('order',)
+    autocomplete_fields = ('product',)
+
+@admin.register(Review)
+class ReviewAdmin(LargeTableAdmin):
+    list_display = ('product', 'user', 'rating', 'created_at')
+    list_filter = ('rating', 'created_at')
+    search_fields = ('product__name', 'user__username')
+    list_select_related = ('product', 'user')
+    raw_id_fields = ('product', 'user')
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(LargeTableAdmin):
+    # Filled by `manage.py archive_orders`; read-only history
+    list_display = ('id', 'user', 'total_price', 'status', 'created_at', 'archived_at')
+    list_filter = ('status', UserFilter)
+    search_fields = ('user__username',)
+    list_select_related = ('user',)
+    raw_id_fields = ('user',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(Job)
+class JobAdmin(LargeTableAdmin):
+    list_display = ('id', 'name', 'queue', 'status', 'priority', 'attempts', 'run_at', 'finished_at')
+    list_filter = ('status', 'queue', 'name')
+    search_fields = ('name', 'last_error')
+    readonly_fields = ('locked_by', 'locked_at', 'created_at', 'finished_at', 'last_error')
+    actions = ['retry_now']
+
+    @admin.action(description="Run again now")
+    def retry_now(self, request, queryset):
+        queryset.exclude(status=Job.RUNNING).update(
+            status=Job.QUEUED, run_at=timezone.now(), attempts=0, finished_at=None,
+        )
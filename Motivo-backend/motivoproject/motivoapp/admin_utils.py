@@ -0,0 +1,114 @@
+# admin_utils.py
+#
+# Changelist helpers for tables too big for the admin defaults: a paginator
+# that never runs an unbounded COUNT(*), and a free-text list filter for
+# foreign keys with too many rows to list in the sidebar.
+from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connection
+from django.utils.functional import cached_property
+
+
+def estimated_row_count(model):
+    """
+    Approximate row count from planner statistics: pg_class on Postgres,
+    sqlite_stat1 (written by ANALYZE) on SQLite. None when there are none.
+    (The highest id is no estimate: deletes and archive_orders leave it far
+    above the real count, which showed phantom pages.)
+    """
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [table])
+            row = cursor.fetchone()
+            return row[0] if row and row[0] > 0 else None
+        if connection.vendor == "sqlite":
+            try:
+                # Each stat row starts with the table's row count
+                cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s", [table])
+            except DatabaseError:
+                return None  # no ANALYZE yet
+            counts = [int(stat.split()[0]) for (stat,) in cursor.fetchall() if stat]
+            return max(counts) if counts else None
+    return None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Counts exactly up to EXACT_COUNT_LIMIT rows with a LIMITed subquery, so the
+    cost is bounded. Past that, an unfiltered changelist uses
+    estimated_row_count() when the database has statistics; otherwise, and for
+    filtered changelists, it stops at the limit. Pages beyond the limit are
+    then not linked, but search and filters still reach them.
+    """
+
+    EXACT_COUNT_LIMIT = 10_000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        bounded = queryset.order_by().values("pk")[:self.EXACT_COUNT_LIMIT + 1].count()
+        if bounded <= self.EXACT_COUNT_LIMIT:
+            return bounded
+        if not queryset.query.where:
+            estimate = estimated_row_count(queryset.model)
+            if estimate is not None:
+                return max(estimate, bounded)
+        return self.EXACT_COUNT_LIMIT
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False  # skip the second, unfiltered COUNT(*)
+
+
+class InputFilter(admin.SimpleListFilter):
+    """
+    List filter rendered as a text box instead of one link per related row.
+    Subclasses set title/parameter_name and implement queryset().
+    """
+
+    template = "admin/input_filter.html"
+    placeholder = ""
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def has_output(self):
+        return True
+
+    def choices(self, changelist):
+        # Only the "All" link, plus the other active params so the form keeps them
+        all_choice = next(super().choices(changelist))
+        all_choice["query_parts"] = [
+            (key, value)
+            for key, values in changelist.get_filters_params().items() if key != self.parameter_name
+            for value in (values if isinstance(values, list) else [values])
+        ]
+        yield all_choice
+
+
+class UserInputFilter(InputFilter):
+    """Filter a user foreign key (`field_name`) by id or exact username."""
+
+    field_name = "user"
+    placeholder = "username or id"
+
+    def queryset(self, request, queryset):
+        value = (self.value() or "").strip()
+        if not value:
+            return queryset
+        if value.isdigit():
+            return queryset.filter(**{f"{self.field_name}_id": int(value)})
+        return queryset.filter(**{f"{self.field_name}__username": value})
+
+
+class SellerInputFilter(UserInputFilter):
+    title = "seller"
+    parameter_name = "seller"
+    field_name = "seller"
+
+
+class UserFilter(UserInputFilter):
+    title = "user"
+    parameter_name = "user"
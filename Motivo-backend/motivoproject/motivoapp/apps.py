@@ -6,4 +6,5 @@ class MotivoappConfig(AppConfig):
     name = 'motivoapp'
     
     def ready(self):
-        import motivoapp.signals 
\ No newline at end of file
+        import motivoapp.signals
+        import motivoapp.tasks  # registers the background job handlers 
\ No newline at end of file
@@ -0,0 +1,18 @@
+# archive.py
+#
+# Read side of the order archive. `manage.py archive_orders` moves finished
+# orders out of the hot Order/OrderItem/Payment tables into the Archived*
+# models; order history endpoints merge them back in when the client passes
+# ?include_archived=1, so the default listing only touches the small hot tables.
+import heapq
+
+TRUTHY = ("1", "true", "yes")
+
+
+def include_archived(request):
+    return request.query_params.get("include_archived", "").lower() in TRUTHY
+
+
+def newest_first(*querysets):
+    """Merge querysets that are each ordered by -created_at into one list."""
+    return list(heapq.merge(*querysets, key=lambda order: order.created_at, reverse=True))
@@ -0,0 +1,220 @@
+# async_views.py
+#
+# Async-native read endpoints for the catalog and wishlist. They return the
+# same JSON as the DRF viewsets in views.py but use Django's async ORM, so
+# under an ASGI server (see motivoproject/asgi.py) a slow query parks a
+# coroutine instead of tying up a whole worker thread. Also home to the
+# order status event stream, which needs ASGI to hold connections open.
+import asyncio
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core import signing
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from .activity import VIEW, activity_buffer
+from .authentication import CachedJWTAuthentication
+from .catalog import filter_products, order_products, search_products
+from .events import event_hub
+from .renderers import dumps
+from .models import Category, Order, Product, WishlistItem
+from .serializers import CategorySerializer, ProductSerializer, WishlistItemSerializer
+
+_jwt_auth = CachedJWTAuthentication()
+
+
+def _json(data, status=200):
+    # Same encoder as the DRF views (see renderers.py)
+    return HttpResponse(dumps(data), status=status, content_type="application/json")
+
+
+def _not_found(model):
+    return _json({"detail": f"No {model.__name__} matches the given query."}, status=404)
+
+
+def _product_queryset():
+    # Same base queryset as ProductViewSet
+    return Product.objects.select_related('category').all()
+
+
+async def _authenticate(request):
+    try:
+        result = await sync_to_async(_jwt_auth.authenticate)(request)
+    except (InvalidToken, TokenError) as exc:
+        response = _json(getattr(exc, "detail", {"detail": str(exc)}), status=401)
+    else:
+        if result is not None:
+            return result[0], None
+        response = _json({"detail": "Authentication credentials were not provided."}, status=401)
+    response["WWW-Authenticate"] = _jwt_auth.authenticate_header(request)
+    return None, response
+
+
+# ------------------------
+# Categories
+# ------------------------
+@require_GET
+async def category_list(request):
+    categories = [c async for c in Category.objects.all()]
+    return _json(CategorySerializer(categories, many=True).data)
+
+
+@require_GET
+async def category_detail(request, pk):
+    try:
+        category = await Category.objects.aget(pk=pk)
+    except (Category.DoesNotExist, ValueError):
+        return _not_found(Category)
+    return _json(CategorySerializer(category).data)
+
+
+# ------------------------
+# Products
+# ------------------------
+@require_GET
+async def product_list(request):
+    queryset = filter_products(_product_queryset(), request.GET)
+    queryset = search_products(queryset, request.GET.get('search', ''))
+    queryset = order_products(queryset, request.GET.get('ordering', ''))
+
+    products = [p async for p in queryset]
+    serializer = ProductSerializer(products, many=True, context={"request": request})
+    return _json(serializer.data)
+
+
+@require_GET
+async def product_detail(request, pk):
+    try:
+        product = await _product_queryset().aget(pk=pk)
+    except (Product.DoesNotExist, ValueError):
+        return _not_found(Product)
+    activity_buffer.record(product.pk, VIEW)
+    await sync_to_async(activity_buffer.maybe_flush)()
+    return _json(ProductSerializer(product, context={"request": request}).data)
+
+
+@require_GET
+async def product_related(request, pk):
+    try:
+        product = await _product_queryset().aget(pk=pk)
+    except (Product.DoesNotExist, ValueError):
+        return _not_found(Product)
+    related = [
+        p async for p in
+        _product_queryset().filter(category_id=product.category_id).exclude(id=product.id)[:4]
+    ]
+    serializer = ProductSerializer(related, many=True, context={"request": request})
+    return _json(serializer.data)
+
+
+# ------------------------
+# Wishlist (Authenticated user)
+# ------------------------
+@require_GET
+async def wishlist_list(request):
+    user, error = await _authenticate(request)
+    if error:
+        return error
+    items = [
+        item async for item in
+        WishlistItem.objects.filter(user=user).select_related('product__category')
+    ]
+    serializer = WishlistItemSerializer(items, many=True, context={"request": request})
+    return _json(serializer.data)
+
+
+# ------------------------
+# Order / payment status stream (Server-Sent Events, ASGI only)
+# ------------------------
+SSE_HEARTBEAT_SECONDS = 20
+SSE_SNAPSHOT_LIMIT = 50
+SSE_TICKET_MAX_AGE = 30  # seconds
+SSE_TICKET_SALT = "motivoapp.order_events"
+FINAL_ORDER_STATUSES = ('delivered', 'cancelled')
+
+
+def _sse(event, data, event_id=None):
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines += [f"event: {event}", f"data: {dumps(data).decode()}"]
+    return "\n".join(lines) + "\n\n"
+
+
+@csrf_exempt  # authenticated by the Authorization header, not cookies
+@require_POST
+async def order_events_ticket(request):
+    """
+    {"ticket": ...} for one connection to order_events. EventSource can't set
+    headers, and a JWT in the query string would end up in access logs, so the
+    stream takes this signed, single-use ticket that expires in
+    SSE_TICKET_MAX_AGE seconds instead.
+    """
+    user, error = await _authenticate(request)
+    if error:
+        return error
+    ticket = signing.dumps({"user": user.id, "nonce": uuid.uuid4().hex}, salt=SSE_TICKET_SALT)
+    return _json({"ticket": ticket, "expires_in": SSE_TICKET_MAX_AGE})
+
+
+async def _authenticate_stream(request):
+    ticket = request.GET.get('ticket')
+    if not ticket or request.headers.get('Authorization'):
+        return await _authenticate(request)
+    try:
+        claims = signing.loads(ticket, salt=SSE_TICKET_SALT, max_age=SSE_TICKET_MAX_AGE)
+    except signing.BadSignature:  # includes SignatureExpired
+        return None, _json({"detail": "Invalid or expired ticket."}, status=401)
+    # Single use: the first connection claims the nonce
+    if not await sync_to_async(cache.add)(f"sse_ticket:{claims['nonce']}", 1, timeout=SSE_TICKET_MAX_AGE):
+        return None, _json({"detail": "Ticket already used."}, status=401)
+    user = await User.objects.filter(pk=claims["user"], is_active=True).afirst()
+    if user is None:
+        return None, _json({"detail": "User not found or inactive."}, status=401)
+    return user, None
+
+
+@require_GET
+async def order_events(request):
+    """
+    text/event-stream of the user's order_status and payment_status changes.
+    Starts with a `snapshot` of open orders, so reconnecting clients catch up.
+    Authenticate with a Bearer header or ?ticket= from order_events_ticket.
+    """
+    if not isinstance(request, ASGIRequest):
+        # Under WSGI Django drains the async generator before sending a byte,
+        # so the stream would never start and would hold the worker forever.
+        return _json({"detail": "Event stream requires the ASGI server (motivoproject.asgi)."}, status=501)
+    user, error = await _authenticate_stream(request)
+    if error:
+        return error
+
+    async def stream():
+        # Subscribe before reading the snapshot so nothing falls in between
+        queue = event_hub.subscribe(user.id)
+        try:
+            yield "retry: 5000\n\n"
+            snapshot = [
+                {"order_id": row["id"], "status": row["status"], "payment_status": row["payment__payment_status"]}
+                async for row in Order.objects.filter(user=user).exclude(status__in=FINAL_ORDER_STATUSES)
+                .order_by('-created_at').values('id', 'status', 'payment__payment_status')[:SSE_SNAPSHOT_LIMIT]
+            ]
+            yield _sse("snapshot", {"orders": snapshot})
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"  # keeps proxies from closing an idle stream
+                    continue
+                yield _sse(message["event"], message["data"], message["id"])
+        finally:
+            event_hub.unsubscribe(user.id, queue)
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # nginx: don't buffer the stream
+    return response
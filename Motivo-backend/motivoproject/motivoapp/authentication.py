@@ -0,0 +1,93 @@
+# authentication.py
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .metrics import registry as metrics_registry
+
+
+class UserCache:
+    """
+    Bounded per-process LRU of User objects with a TTL.
+
+    Entries are dropped on User save/delete and on logout in the process that
+    sees the change (signals.py); other gunicorn workers pick it up when the
+    TTL expires, so keep the TTL short. Keys are str(user_id): tokens carry
+    the id as a string, while signals pass the integer pk.
+    """
+
+    def __init__(self, max_size=1024, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()  # str(user_id) -> (expires_at, user)
+        self.lock = threading.Lock()
+
+    def get(self, user_id):
+        user_id = str(user_id)
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self.entries[user_id]
+                return None
+            self.entries.move_to_end(user_id)
+            user = entry[1]
+        # Hand out a copy so a view mutating request.user can't leak into
+        # other requests.
+        return copy.copy(user)
+
+    def set(self, user_id, user):
+        if self.max_size <= 0:
+            return
+        user_id = str(user_id)
+        with self.lock:
+            self.entries[user_id] = (time.monotonic() + self.ttl, copy.copy(user))
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self.lock:
+            self.entries.pop(str(user_id), None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+_config = getattr(settings, "JWT_USER_CACHE", {})
+user_cache = UserCache(max_size=_config.get("MAX_SIZE", 1024), ttl=_config.get("TTL", 60))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves the token's user from `user_cache`, saving
+    the per-request User lookup. The same active/revocation checks as
+    simplejwt run on cached users too.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        user = user_cache.get(user_id) if user_id is not None else None
+        metrics_registry.record_cache("jwt_user", user is not None)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user)
+            return user
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return user
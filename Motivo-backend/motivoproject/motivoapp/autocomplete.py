@@ -0,0 +1,208 @@
+# autocomplete.py
+#
+# In-memory prefix index for search-box typeahead.
+#
+# Every product and category name is normalised into word-suffix terms
+# ("Wooden Toy Train" -> "wooden toy train", "toy train", "train") kept in one
+# sorted list of (term, key). A prefix lookup is a bisect to the first
+# candidate plus a short forward scan, with no database access. Results are
+# ranked by popularity (review count, then rating).
+#
+# Each worker builds its own index lazily on the first lookup. Product and
+# Category signals update it in place, and it is rebuilt every
+# REBUILD_INTERVAL seconds to pick up changes made by other workers and
+# rating updates that bypass save(). A rebuild reads the catalog without
+# holding the index lock: lookups keep using the old index meanwhile, edits
+# made during the read are replayed onto the new one, and the swap is a
+# single reference assignment under the lock.
+import heapq
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+
+from django.conf import settings
+
+PRODUCT = "product"
+CATEGORY = "category"
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize(text):
+    text = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode()
+    return _WORD_RE.findall(text.lower())
+
+
+def _terms(name):
+    words = normalize(name)
+    return {" ".join(words[i:]) for i in range(len(words))}
+
+
+class PrefixIndex:
+    def __init__(self, rebuild_interval=600, max_scan=20000, result_cache_size=1024):
+        self.rebuild_interval = rebuild_interval
+        self.max_scan = max_scan
+        self.result_cache_size = result_cache_size
+        self.keys = []       # sorted [(term, kind, id)]
+        self.entries = {}    # (kind, id) -> (weight, terms, payload)
+        self.results = {}    # (prefix, limit) -> memoised result
+        self.built_at = None
+        self.lock = threading.RLock()
+        self.build_lock = threading.Lock()  # one rebuild at a time
+        self.pending = None  # edits made while a rebuild reads the catalog
+
+    # ------------------------
+    # Building / incremental updates
+    # ------------------------
+    def build(self):
+        from .models import Category, Product
+
+        with self.lock:
+            self.pending = []
+        keys, entries = [], {}
+        for row in Category.objects.values("id", "name", "slug"):
+            self._add(keys, entries, CATEGORY, row["id"], row["name"], (0, 0.0),
+                      {"id": row["id"], "name": row["name"], "slug": row["slug"]})
+        products = Product.objects.values("id", "name", "slug", "price", "image", "review_count", "rating")
+        for row in products.iterator(chunk_size=2000):
+            self._add(keys, entries, PRODUCT, row["id"], row["name"], (row["review_count"], row["rating"]),
+                      _product_payload(row))
+        keys.sort()
+        with self.lock:
+            pending, self.pending = self.pending, None
+            self.keys, self.entries, self.results = keys, entries, {}
+            self.built_at = time.monotonic()
+            for args in pending:
+                self._apply(*args)
+
+    def ensure_built(self):
+        if self.built_at is None:
+            # Nothing to serve yet: wait for whichever thread is building
+            with self.build_lock:
+                if self.built_at is None:
+                    self.build()
+        elif time.monotonic() - self.built_at > self.rebuild_interval:
+            # Stale: one thread rebuilds, the rest keep answering from the old index
+            if self.build_lock.acquire(blocking=False):
+                try:
+                    if time.monotonic() - self.built_at > self.rebuild_interval:
+                        self.build()
+                finally:
+                    self.build_lock.release()
+
+    @staticmethod
+    def _add(keys, entries, kind, pk, name, weight, payload):
+        terms = _terms(name)
+        entries[(kind, pk)] = (weight, terms, payload)
+        keys.extend((term, kind, pk) for term in terms)
+
+    def upsert(self, kind, pk, name, weight, payload):
+        self._record(kind, pk, name, weight, payload)
+
+    def remove(self, kind, pk):
+        self._record(kind, pk, None, None, None)
+
+    def _record(self, *args):
+        with self.lock:
+            if self.pending is not None:
+                self.pending.append(args)  # the rebuild may have read the old row
+            if self.built_at is not None:  # not built yet: the first lookup reads the database anyway
+                self._apply(*args)
+
+    def _apply(self, kind, pk, name, weight, payload):
+        if name is None:
+            self._forget(self._remove(kind, pk))
+            return
+        old_terms = self._remove(kind, pk)
+        terms = _terms(name)
+        self.entries[(kind, pk)] = (weight, terms, payload)
+        for term in terms:
+            insort(self.keys, (term, kind, pk))
+        self._forget(old_terms | terms)
+
+    def _remove(self, kind, pk):
+        entry = self.entries.pop((kind, pk), None)
+        if entry is None:
+            return set()
+        for term in entry[1]:
+            i = bisect_left(self.keys, (term, kind, pk))
+            if i < len(self.keys) and self.keys[i] == (term, kind, pk):
+                del self.keys[i]
+        return entry[1]
+
+    def _forget(self, terms):
+        # Drop only the memoised prefixes the changed entry could appear under,
+        # so edits don't cool the whole result cache.
+        stale = [key for key in self.results if any(term.startswith(key[0]) for term in terms)]
+        for key in stale:
+            del self.results[key]
+
+    # ------------------------
+    # Lookup
+    # ------------------------
+    def search(self, query, limit=8):
+        prefix = " ".join(normalize(query))
+        if not prefix:
+            return {"categories": [], "products": []}
+        self.ensure_built()
+        with self.lock:
+            cached = self.results.get((prefix, limit))
+            if cached is not None:
+                return cached
+
+            matches = {CATEGORY: set(), PRODUCT: set()}
+            i = bisect_left(self.keys, (prefix,))
+            end = min(len(self.keys), i + self.max_scan)
+            while i < end and self.keys[i][0].startswith(prefix):
+                _, kind, pk = self.keys[i]
+                matches[kind].add(pk)
+                i += 1
+
+            result = {
+                "categories": self._top(CATEGORY, matches[CATEGORY], limit),
+                "products": self._top(PRODUCT, matches[PRODUCT], limit),
+            }
+            if len(self.results) >= self.result_cache_size:
+                self.results.clear()
+            self.results[(prefix, limit)] = result
+            return result
+
+    def _top(self, kind, ids, limit):
+        ranked = heapq.nlargest(limit, ids, key=lambda pk: (self.entries[(kind, pk)][0], -pk))
+        return [self.entries[(kind, pk)][2] for pk in ranked]
+
+
+def _product_payload(row):
+    return {
+        "id": row["id"],
+        "name": row["name"],
+        "slug": row["slug"],
+        "price": str(row["price"]),
+        "image": str(row["image"] or "") or None,  # storage name; the view turns it into a URL
+    }
+
+
+def product_entry(product):
+    return (
+        PRODUCT, product.pk, product.name, (product.review_count, product.rating),
+        _product_payload({
+            "id": product.pk, "name": product.name, "slug": product.slug,
+            "price": product.price, "image": product.image.name if product.image else None,
+        }),
+    )
+
+
+def category_entry(category):
+    return (
+        CATEGORY, category.pk, category.name, (0, 0.0),
+        {"id": category.pk, "name": category.name, "slug": category.slug},
+    )
+
+
+_config = getattr(settings, "AUTOCOMPLETE", {})
+autocomplete_index = PrefixIndex(
+    rebuild_interval=_config.get("REBUILD_INTERVAL", 600),
+    max_scan=_config.get("MAX_SCAN", 20000),
+)
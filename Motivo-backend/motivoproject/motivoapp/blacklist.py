@@ -0,0 +1,138 @@
+# blacklist.py
+#
+# Fast negative lookups for the simplejwt refresh-token blacklist.
+#
+# With ROTATE_REFRESH_TOKENS + BLACKLIST_AFTER_ROTATION every refresh adds a
+# BlacklistedToken row, and every refresh checks the presented token against
+# that table. Nearly all checks are misses, so a per-process Bloom filter of
+# blacklisted jtis answers them from memory. Only a filter hit, which may be a
+# false positive, goes to the database for the exact answer.
+#
+# Other workers blacklist tokens too. Every new BlacklistedToken row writes a
+# fresh marker to the shared cache once committed (signals.py). A check only
+# goes to the database when the marker differs from the one seen at the last
+# sync, and then just for the rows added since (an id range scan on the
+# primary key). The filter is rebuilt from scratch periodically to forget
+# expired tokens. Expired rows are deleted by the `prune_tokens` command.
+import hashlib
+import math
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate=0.001):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.capacity = capacity
+        self.count = 0
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        # Kirsch-Mitzenmacher: k positions from two halves of one digest
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class BlacklistFilter:
+    # Re-read a few ids below the watermark on each sync so rows committed
+    # slightly out of id order are not missed.
+    LOOKBACK_IDS = 50
+    CHANGED_KEY = "token_blacklist:changed"
+
+    def __init__(self, capacity=100_000, error_rate=0.001, rebuild_interval=3600, chunk_size=5000):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.rebuild_interval = rebuild_interval
+        self.chunk_size = chunk_size
+        self.bloom = None
+        self.watermark = 0
+        self.built_at = 0.0
+        self.seen_marker = None
+        self.lock = threading.Lock()
+
+    def rebuild(self):
+        # Read the marker first: a row committed after this point changes it again
+        self.seen_marker = cache.get(self.CHANGED_KEY)
+        # Only unexpired tokens matter; expired ones fail signature/exp checks anyway.
+        live = BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now())
+        watermark = BlacklistedToken.objects.aggregate(m=Max("id"))["m"] or 0
+        bloom = BloomFilter(max(self.capacity, int(live.count() * 1.5)), self.error_rate)
+        for jti in live.filter(id__lte=watermark).values_list("token__jti", flat=True).iterator(chunk_size=self.chunk_size):
+            bloom.add(jti)
+        self.bloom, self.watermark, self.built_at = bloom, watermark, time.monotonic()
+
+    def sync(self):
+        marker = cache.get(self.CHANGED_KEY)
+        if marker == self.seen_marker:
+            return
+        self.seen_marker = marker
+        rows = BlacklistedToken.objects.filter(id__gt=self.watermark - self.LOOKBACK_IDS).values_list("id", "token__jti")
+        for row_id, jti in rows:
+            if jti not in self.bloom:
+                self.bloom.add(jti)
+            self.watermark = max(self.watermark, row_id)
+
+    def might_contain(self, jti):
+        with self.lock:
+            stale = time.monotonic() - self.built_at > self.rebuild_interval
+            if self.bloom is None or stale or self.bloom.count > self.bloom.capacity:
+                self.rebuild()
+            else:
+                self.sync()
+            return jti in self.bloom
+
+    def add(self, jti):
+        with self.lock:
+            if self.bloom is not None:
+                self.bloom.add(jti)
+
+    def reset(self):
+        with self.lock:
+            self.bloom = None
+
+    @classmethod
+    def mark_changed(cls):
+        """Tell every worker's filter that new rows exist; call after they are committed."""
+        cache.set(cls.CHANGED_KEY, uuid.uuid4().hex, timeout=None)
+
+
+_config = getattr(settings, "TOKEN_BLACKLIST_FILTER", {})
+blacklist_filter = BlacklistFilter(
+    capacity=_config.get("CAPACITY", 100_000),
+    error_rate=_config.get("ERROR_RATE", 0.001),
+    rebuild_interval=_config.get("REBUILD_INTERVAL", 3600),
+)
+
+
+class FilteredRefreshToken(RefreshToken):
+    """RefreshToken whose blacklist check consults `blacklist_filter` first."""
+
+    def check_blacklist(self):
+        if blacklist_filter.might_contain(self.payload[api_settings.JTI_CLAIM]):
+            super().check_blacklist()
+
+    def blacklist(self):
+        result = super().blacklist()
+        blacklist_filter.add(self.payload[api_settings.JTI_CLAIM])
+        return result
@@ -0,0 +1,57 @@
+# caching.py
+#
+# Per-user version counters. A write bumps the user's version; readers use the
+# current version as a validator (the cart summary's ETag), so a client holding
+# an older one is simply answered in full.
+#
+# The counters live in the database (CacheVersion), not in the cache: the
+# file-based cache's incr() is a read-modify-write, so two workers bumping at
+# once could both write the same value and a reader could keep a stale entry.
+# A bump here is a single upsert, atomic under concurrent writers. Callers
+# bump after commit, so a new version never describes uncommitted data.
+import time
+
+from django.db import connection
+
+from .models import CacheVersion
+
+# Namespaces
+CART = "cart"
+
+
+def _seed():
+    # Start from the clock rather than 1: if the table is ever reset, restarted
+    # counters can't land on a version whose entry is still in the cache.
+    return time.time_ns() // 1000
+
+
+def get_version(namespace, user_id):
+    version = (
+        CacheVersion.objects.filter(namespace=namespace, user_id=user_id)
+        .values_list('version', flat=True).first()
+    )
+    if version is None:
+        bump_versions(namespace, [user_id], create_only=True)
+        version = CacheVersion.objects.get(namespace=namespace, user_id=user_id).version
+    return version
+
+
+def bump_versions(namespace, user_ids, create_only=False):
+    """Move each user in `user_ids` to a new version with one batch of upserts."""
+    user_ids = sorted(set(user_ids))
+    if not user_ids:
+        return
+    table = connection.ops.quote_name(CacheVersion._meta.db_table)
+    on_conflict = "DO NOTHING" if create_only else f"DO UPDATE SET version = {table}.version + 1"
+    sql = (
+        f"INSERT INTO {table} (namespace, user_id, version) VALUES (%s, %s, %s) "
+        f"ON CONFLICT (namespace, user_id) {on_conflict}"
+    )
+    seed = _seed()
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, [(namespace, user_id, seed) for user_id in user_ids])
+
+
+def bump_version(namespace, user_id):
+    bump_versions(namespace, [user_id])
+
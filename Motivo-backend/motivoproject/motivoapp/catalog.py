@@ -0,0 +1,59 @@
+# catalog.py
+#
+# Product list filtering shared by the DRF ProductViewSet (views.py) and the
+# async product_list endpoint (async_views.py), so both stacks accept the
+# same query parameters and return the same rows in the same order.
+import re
+from decimal import Decimal, InvalidOperation
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
+
+SEARCH_FIELDS = ['name', 'category__name']
+ORDERING_FIELDS = ['price', 'rating', 'review_count', 'created_at']
+
+
+def filter_products(queryset, params):
+    """Apply ?category=, ?min_rating=, ?min_price= and ?max_price=; unparseable values are ignored."""
+    category_slug = params.get('category')
+    min_rating = params.get('min_rating')
+
+    if category_slug:
+        queryset = queryset.filter(category__slug__iexact=category_slug)
+    if min_rating:
+        try:
+            queryset = queryset.filter(rating__gte=float(min_rating))
+        except ValueError:
+            pass
+    for param, lookup in (('min_price', 'price__gte'), ('max_price', 'price__lte')):
+        value = params.get(param)
+        if value:
+            try:
+                value = Decimal(value)
+            except InvalidOperation:
+                continue
+            if value.is_finite():  # nan/inf parse but can't be compared
+                queryset = queryset.filter(**{lookup: value})
+    return queryset
+
+
+def search_terms(value):
+    # Mirrors rest_framework.filters.SearchFilter.get_search_terms
+    value = value.replace('\x00', '')
+    return [term for term in re.split(r'[\s,]+', value) if term]
+
+
+def search_products(queryset, value):
+    # Same matching as SearchFilter with SEARCH_FIELDS
+    for term in search_terms(value):
+        queryset = queryset.filter(reduce(or_, [Q(**{f"{field}__icontains": term}) for field in SEARCH_FIELDS]))
+    return queryset
+
+
+def order_products(queryset, value):
+    # Same as OrderingFilter with ORDERING_FIELDS: unknown fields are dropped,
+    # and with none left the queryset keeps its default order
+    terms = [term.strip() for term in value.split(',')]
+    terms = [term for term in terms if term.removeprefix('-') in ORDERING_FIELDS]
+    return queryset.order_by(*terms) if terms else queryset
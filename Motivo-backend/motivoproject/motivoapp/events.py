@@ -0,0 +1,60 @@
+# events.py
+#
+# In-process fan-out hub for per-user events (order and payment status
+# changes), consumed by the server-sent events stream in async_views.py.
+#
+# Publishers are ordinary sync code (signal handlers, often on a worker
+# thread); subscribers are asyncio queues owned by the ASGI event loop, so
+# events are handed over with call_soon_threadsafe. The hub only sees events
+# raised in its own process: that covers a single ASGI node. Clients that
+# reconnect get a fresh snapshot first, so missed events are not lost.
+import asyncio
+import itertools
+import threading
+
+
+class EventHub:
+    def __init__(self, max_queue=100):
+        self.max_queue = max_queue
+        self.subscribers = {}  # user_id -> {queue: loop}
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+
+    def subscribe(self, user_id):
+        queue = asyncio.Queue(maxsize=self.max_queue)
+        with self.lock:
+            self.subscribers.setdefault(user_id, {})[queue] = asyncio.get_running_loop()
+        return queue
+
+    def unsubscribe(self, user_id, queue):
+        with self.lock:
+            queues = self.subscribers.get(user_id)
+            if queues is not None:
+                queues.pop(queue, None)
+                if not queues:
+                    del self.subscribers[user_id]
+
+    def subscriber_count(self):
+        with self.lock:
+            return sum(len(queues) for queues in self.subscribers.values())
+
+    def publish(self, user_id, event, data):
+        with self.lock:
+            targets = list(self.subscribers.get(user_id, {}).items())
+            message = {"id": next(self.ids), "event": event, "data": data}
+        for queue, loop in targets:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, message)
+            except RuntimeError:
+                self.unsubscribe(user_id, queue)  # loop already closed
+        return len(targets)
+
+
+def _offer(queue, message):
+    # A stalled client must not grow memory without bound: drop its oldest event
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(message)
+
+
+event_hub = EventHub()
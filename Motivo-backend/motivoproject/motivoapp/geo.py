@@ -0,0 +1,212 @@
+# geo.py
+#
+# Offline geocoding of Product.location and a geohash grid for "near me"
+# queries.
+#
+# Locations are matched against the bundled gazetteer (data/gazetteer.csv),
+# so no network calls are made. Each geocoded product stores its geohash.
+# Because a geohash cell is a string prefix, a cell and its eight
+# neighbours are nine index range scans on Product.geohash. Exact distances
+# are then computed in SQL only for the products in those cells, and only the
+# nearest rows are returned.
+import csv
+import math
+import os
+import re
+from functools import lru_cache
+
+from django.db.models import ExpressionWrapper, FloatField, Q, Value
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+
+EARTH_RADIUS_KM = 6371.0088
+GEOHASH_PRECISION = 9  # ~5 m cells; shorter prefixes give coarser cells
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_DECODE = {c: i for i, c in enumerate(_BASE32)}
+
+GAZETTEER_PATH = os.path.join(os.path.dirname(__file__), "data", "gazetteer.csv")
+
+
+# ------------------------
+# Gazetteer
+# ------------------------
+def _normalize(text):
+    return " ".join(re.findall(r"[a-z]+", (text or "").lower()))
+
+
+@lru_cache(maxsize=1)
+def gazetteer():
+    """{normalised place name or alias: (latitude, longitude)}"""
+    places = {}
+    with open(GAZETTEER_PATH, newline="", encoding="utf-8") as fh:
+        for row in csv.DictReader(fh):
+            point = (float(row["latitude"]), float(row["longitude"]))
+            for name in [row["name"], *filter(None, (row.get("aliases") or "").split("|"))]:
+                places[_normalize(name)] = point
+    return places
+
+
+def geocode(location):
+    """
+    (latitude, longitude) for a free-text location such as
+    "Madhapur, Hyderabad, Telangana", or None if no known place is mentioned.
+    Comma-separated parts are tried first, then two-word and one-word runs.
+    """
+    places = gazetteer()
+    parts = [_normalize(p) for p in re.split(r"[,/;]", location or "")]
+    for part in parts:
+        if part in places:
+            return places[part]
+    for part in parts:
+        words = part.split()
+        for size in (2, 1):
+            for i in range(len(words) - size + 1):
+                point = places.get(" ".join(words[i:i + size]))
+                if point:
+                    return point
+    return None
+
+
+# ------------------------
+# Geohash
+# ------------------------
+def encode(latitude, longitude, precision=GEOHASH_PRECISION):
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        rng, coord = (lon_range, longitude) if even else (lat_range, latitude)
+        mid = (rng[0] + rng[1]) / 2
+        value <<= 1
+        if coord >= mid:
+            value |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits = value = 0
+    return "".join(chars)
+
+
+def decode_box(geohash):
+    """(min_lat, max_lat, min_lon, max_lon) of a geohash cell."""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = _DECODE[char]
+        for shift in range(4, -1, -1):
+            rng = lon_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if value >> shift & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return lat_range[0], lat_range[1], lon_range[0], lon_range[1]
+
+
+def neighbours(geohash):
+    """The cell itself plus the (up to) eight cells around it."""
+    min_lat, max_lat, min_lon, max_lon = decode_box(geohash)
+    lat, lon = (min_lat + max_lat) / 2, (min_lon + max_lon) / 2
+    dlat, dlon = max_lat - min_lat, max_lon - min_lon
+    cells = set()
+    for i in (-1, 0, 1):
+        for j in (-1, 0, 1):
+            nlat = lat + i * dlat
+            if -90 <= nlat <= 90:
+                nlon = (lon + j * dlon + 180) % 360 - 180
+                cells.add(encode(nlat, nlon, len(geohash)))
+    return sorted(cells)
+
+
+def cell_size_km(precision, latitude):
+    """(height, width) in km of a geohash cell at this precision and latitude."""
+    lat_bits = precision * 5 // 2
+    lon_bits = precision * 5 - lat_bits
+    height = 180.0 / 2 ** lat_bits * 111.32
+    width = 360.0 / 2 ** lon_bits * 111.32 * math.cos(math.radians(latitude))
+    return height, width
+
+
+def precision_for_radius(radius_km, latitude):
+    """Finest precision whose cells are at least radius_km across, so the 3x3 block covers the circle."""
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        if min(cell_size_km(precision, latitude)) >= radius_km:
+            return precision
+    return 0
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi, dlmb = phi2 - phi1, math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+# ------------------------
+# Queries
+# ------------------------
+def cell_filter(cells):
+    # A prefix match written as a range ("~" sorts after every base32 char) so
+    # it is an index range scan on both SQLite and Postgres.
+    condition = Q()
+    for cell in cells:
+        condition |= Q(geohash__gte=cell, geohash__lt=cell + "~")
+    return condition
+
+
+def distance_expression(latitude, longitude):
+    """Haversine distance in km from (latitude, longitude) to each row, computed in SQL."""
+    phi1 = math.radians(latitude)
+    phi2 = Radians("latitude")
+    half_dphi = (phi2 - Value(phi1)) / 2
+    half_dlmb = (Radians("longitude") - Value(math.radians(longitude))) / 2
+    a = Power(Sin(half_dphi), 2) + Value(math.cos(phi1)) * Cos(phi2) * Power(Sin(half_dlmb), 2)
+    return ExpressionWrapper(2 * EARTH_RADIUS_KM * ASin(Sqrt(a)), output_field=FloatField())
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """Q for the lat/lng rectangle around a circle; longitude is left open near the poles/antimeridian."""
+    dlat = radius_km / 111.32
+    condition = Q(latitude__gte=latitude - dlat, latitude__lte=latitude + dlat)
+    cos_lat = math.cos(math.radians(latitude))
+    if cos_lat > 0.01:
+        dlon = radius_km / (111.32 * cos_lat)
+        if -180 <= longitude - dlon and longitude + dlon <= 180:
+            condition &= Q(longitude__gte=longitude - dlon, longitude__lte=longitude + dlon)
+    return condition
+
+
+def _candidates(queryset, latitude, longitude, precision, radius_km=None, limit=None):
+    # Filtering, distance, ordering and LIMIT all run in the database, so a
+    # city's worth of products in the block is never loaded into Python.
+    queryset = queryset.filter(latitude__isnull=False, longitude__isnull=False)
+    if precision:
+        queryset = queryset.filter(cell_filter(neighbours(encode(latitude, longitude, precision))))
+    queryset = queryset.annotate(distance_km=distance_expression(latitude, longitude))
+    if radius_km is not None:
+        queryset = queryset.filter(bounding_box(latitude, longitude, radius_km), distance_km__lte=radius_km)
+    rows = queryset.order_by("distance_km", "id").values_list("distance_km", "id")
+    return list(rows[:limit] if limit else rows)
+
+
+def nearby(queryset, latitude, longitude, radius_km=None, limit=None):
+    """
+    [(distance_km, product_id)] nearest first, restricted to `queryset`
+    (so category/price filters still apply). With radius_km, everything
+    within that distance; otherwise the `limit` nearest.
+    """
+    if radius_km is not None:
+        precision = precision_for_radius(radius_km, latitude)
+        return _candidates(queryset, latitude, longitude, precision, radius_km=radius_km, limit=limit)
+
+    # Nearest-N: widen the 3x3 block until the N-th hit is closer than the
+    # block's inner edge, i.e. nothing outside it could be nearer.
+    limit = limit or 10
+    for precision in range(6, -1, -1):
+        hits = _candidates(queryset, latitude, longitude, precision, limit=limit)
+        covered = min(cell_size_km(precision, latitude)) if precision else math.inf
+        if precision == 0 or (len(hits) >= limit and hits[limit - 1][0] <= covered):
+            return hits
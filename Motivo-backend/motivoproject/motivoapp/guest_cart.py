@@ -0,0 +1,74 @@
+# guest_cart.py
+#
+# Cart for visitors who haven't signed in, kept entirely in a signed cookie
+# ("12:1,40:3" = product 12 x1, product 40 x3), so anonymous browsing makes
+# no database writes. The signature stops clients from forging the contents;
+# prices are always read from Product, never from the cookie.
+#
+# verify_otp folds the cookie into the user's CartItem rows with a single
+# batch of upserts (quantities add up) and clears it.
+from django.conf import settings
+from django.db import connection, transaction
+
+from .caching import CART, bump_version
+from .models import CartItem, Product
+
+_config = getattr(settings, "GUEST_CART", {})
+COOKIE_NAME = _config.get("COOKIE_NAME", "guest_cart")
+MAX_AGE = _config.get("MAX_AGE", 30 * 24 * 3600)
+MAX_LINES = _config.get("MAX_LINES", 50)
+MAX_QUANTITY = _config.get("MAX_QUANTITY", 99)
+SALT = "motivoapp.guest_cart"
+
+
+def encode(cart):
+    return ",".join(f"{pid}:{qty}" for pid, qty in cart.items())
+
+
+def decode(value):
+    cart = {}
+    for part in (value or "").split(","):
+        pid, _, qty = part.partition(":")
+        if pid.isdigit() and qty.isdigit() and int(qty) > 0 and len(cart) < MAX_LINES:
+            cart[int(pid)] = min(int(qty), MAX_QUANTITY)
+    return cart
+
+
+def read(request):
+    """{product_id: quantity}; empty if the cookie is missing, expired or tampered with."""
+    return decode(request.get_signed_cookie(COOKIE_NAME, default="", salt=SALT, max_age=MAX_AGE))
+
+
+def write(response, cart):
+    if not cart:
+        clear(response)
+        return
+    response.set_signed_cookie(
+        COOKIE_NAME, encode(cart), salt=SALT, max_age=MAX_AGE,
+        secure=settings.SIMPLE_JWT["AUTH_COOKIE_SECURE"],
+        httponly=True,
+        samesite=settings.SIMPLE_JWT["AUTH_COOKIE_SAMESITE"],
+    )
+
+
+def clear(response):
+    response.delete_cookie(COOKIE_NAME, samesite=settings.SIMPLE_JWT["AUTH_COOKIE_SAMESITE"])
+
+
+def merge(user, cart):
+    """Add the guest cart to the user's CartItems in one batch of upserts; returns lines merged."""
+    live = set(Product.objects.filter(id__in=cart).values_list("id", flat=True))
+    rows = [(user.pk, pid, qty) for pid, qty in cart.items() if pid in live]
+    if not rows:
+        return 0
+    table = connection.ops.quote_name(CartItem._meta.db_table)
+    sql = (
+        f"INSERT INTO {table} (user_id, product_id, quantity) VALUES (%s, %s, %s) "
+        f"ON CONFLICT (user_id, product_id) DO UPDATE SET quantity = {table}.quantity + excluded.quantity"
+    )
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, rows)
+        # Raw SQL skips the CartItem signals that move the cart version
+        transaction.on_commit(lambda: bump_version(CART, user.pk))
+    return len(rows)
@@ -0,0 +1,156 @@
+# jobs.py
+#
+# Background job queue kept in the project's own database (the Job model),
+# so it needs no Redis or other broker.
+#
+# enqueue() inserts a row, inside the caller's transaction if there is one, so
+# a rolled-back request never leaves a job behind. `manage.py runworker`
+# claims due jobs, highest priority first, and runs them on a thread pool.
+#
+# A claim is a single conditional UPDATE (status queued -> running, tagged with
+# a unique token), so two workers can never take the same job. On Postgres
+# the candidates are picked with SELECT ... FOR UPDATE SKIP LOCKED, so workers
+# don't queue behind each other's row locks. A failed job is retried with
+# exponential backoff until max_attempts. A job whose worker died is requeued
+# once it has been running longer than VISIBILITY_TIMEOUT.
+import random
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .metrics import registry as metrics_registry
+from .models import Job
+
+_config = getattr(settings, "JOB_QUEUE", {})
+_handlers = {}  # name -> (function, default queue)
+
+
+def job(name=None, queue="default"):
+    """Register a function as a job handler: @job("send_email", queue="email")."""
+    def register(fn):
+        _handlers[name or fn.__name__] = (fn, queue)
+        return fn
+    return register
+
+
+def enqueue(name, payload=None, *, queue=None, priority=0, run_at=None, delay=None, max_attempts=None):
+    """Queue `name(**payload)`. The payload must be JSON-serialisable."""
+    if name not in _handlers:
+        raise LookupError(f"No job handler registered as {name!r}")
+    if _config.get("EAGER"):
+        # Run inline (tests, or deployments without a worker)
+        _handlers[name][0](**(payload or {}))
+        return None
+    if run_at is None:
+        run_at = timezone.now() + (delay or timedelta())
+    return Job.objects.create(
+        queue=queue or _handlers[name][1],
+        name=name,
+        payload=payload or {},
+        priority=priority,
+        run_at=run_at,
+        max_attempts=max_attempts or _config.get("MAX_ATTEMPTS", 5),
+    )
+
+
+# ------------------------
+# Worker side
+# ------------------------
+def claim(queues, limit, worker_id):
+    """Atomically take up to `limit` due jobs from `queues`; returns them."""
+    token = f"{worker_id}:{uuid.uuid4().hex[:12]}"
+    due = (
+        Job.objects.filter(status=Job.QUEUED, queue__in=queues, run_at__lte=timezone.now())
+        .order_by('-priority', 'run_at', 'id')
+    )
+    with transaction.atomic():
+        if connection.features.has_select_for_update_skip_locked:
+            ids = list(due.select_for_update(skip_locked=True).values_list('id', flat=True)[:limit])
+        else:
+            # SQLite: the UPDATE below re-checks status and runs under the write lock
+            ids = list(due.values_list('id', flat=True)[:limit])
+        if not ids:
+            return []
+        Job.objects.filter(id__in=ids, status=Job.QUEUED).update(
+            status=Job.RUNNING, locked_by=token, locked_at=timezone.now(), attempts=F('attempts') + 1,
+        )
+    return list(Job.objects.filter(locked_by=token, status=Job.RUNNING).order_by('-priority', 'run_at', 'id'))
+
+
+def backoff(attempts):
+    """Seconds before retry number `attempts`: exponential, capped, with jitter."""
+    base = _config.get("RETRY_BASE_SECONDS", 10)
+    delay = min(base * 2 ** (attempts - 1), _config.get("RETRY_MAX_SECONDS", 3600))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def run(job_row):
+    """Execute a claimed job and record the outcome; returns the new status."""
+    close_old_connections()
+    started = timezone.now()
+    try:
+        handler = _handlers.get(job_row.name)
+        if handler is None:
+            raise LookupError(f"No job handler registered as {job_row.name!r}")
+        handler[0](**job_row.payload)
+    except Exception:
+        error = traceback.format_exc()[-4000:]
+        if job_row.attempts < job_row.max_attempts:
+            status = Job.QUEUED
+            updates = {'run_at': timezone.now() + timedelta(seconds=backoff(job_row.attempts))}
+        else:
+            status = Job.FAILED
+            updates = {'finished_at': timezone.now()}
+        Job.objects.filter(id=job_row.id, locked_by=job_row.locked_by).update(
+            status=status, last_error=error, locked_by='', locked_at=None, **updates,
+        )
+    else:
+        status = Job.DONE
+        Job.objects.filter(id=job_row.id, locked_by=job_row.locked_by).update(
+            status=status, locked_by='', locked_at=None, finished_at=timezone.now(),
+        )
+    finally:
+        close_old_connections()
+
+    labels = {"queue": job_row.queue, "job": job_row.name}
+    metrics_registry.inc("jobs_total", {**labels, "outcome": "retry" if status == Job.QUEUED else status})
+    metrics_registry.observe("job_duration_seconds", (timezone.now() - started).total_seconds(), labels)
+    return status
+
+
+def requeue_stale():
+    """Put back jobs whose worker stopped responding; returns how many."""
+    cutoff = timezone.now() - timedelta(seconds=_config.get("VISIBILITY_TIMEOUT", 600))
+    stale = Job.objects.filter(status=Job.RUNNING, locked_at__lt=cutoff)
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED, locked_by='', locked_at=None, finished_at=timezone.now(),
+        last_error="Worker stopped before the job finished",
+    )
+    return failed + stale.update(status=Job.QUEUED, locked_by='', locked_at=None)
+
+
+def purge_finished(chunk_size=1000):
+    """Delete done jobs older than KEEP_DONE_HOURS, a chunk at a time; failed jobs are kept."""
+    cutoff = timezone.now() - timedelta(hours=_config.get("KEEP_DONE_HOURS", 72))
+    deleted = 0
+    while True:
+        ids = list(
+            Job.objects.filter(status=Job.DONE, finished_at__lt=cutoff)
+            .order_by('id').values_list('id', flat=True)[:chunk_size]
+        )
+        if not ids:
+            return deleted
+        deleted += Job.objects.filter(id__in=ids).delete()[0]
+
+
+def _queue_depth():
+    rows = Job.objects.filter(status=Job.QUEUED).values('queue').annotate(n=Count('id'))
+    return {(("queue", row['queue']),): row['n'] for row in rows}
+
+
+metrics_registry.register_gauge("job_queue_depth", "Background jobs waiting to run, by queue.", _queue_depth)
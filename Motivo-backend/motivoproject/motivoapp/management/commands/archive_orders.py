@@ -0,0 +1,80 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from motivoapp.models import (
+    ArchivedOrder, ArchivedOrderItem, ArchivedPayment, Order, OrderItem, Payment,
+)
+
+ORDER_FIELDS = ("id", "user_id", "total_price", "status", "created_at")
+ITEM_FIELDS = ("id", "order_id", "product_id", "quantity", "price_at_purchase")
+PAYMENT_FIELDS = ("id", "order_id", "amount", "payment_method", "payment_status", "transaction_id", "created_at")
+
+
+class Command(BaseCommand):
+    help = (
+        "Move delivered/cancelled orders older than ORDER_ARCHIVE['AFTER_DAYS'] (with their items and "
+        "payment) to the archive tables, one chunk per transaction."
+    )
+
+    def add_arguments(self, parser):
+        config = getattr(settings, "ORDER_ARCHIVE", {})
+        parser.add_argument("--days", type=int, default=config.get("AFTER_DAYS", 180),
+                            help="Archive orders placed more than this many days ago.")
+        parser.add_argument("--chunk-size", type=int, default=config.get("CHUNK_SIZE", 500))
+        parser.add_argument("--sleep", type=float, default=0.0, help="Seconds to pause between chunks.")
+        parser.add_argument("--max-chunks", type=int, default=0, help="Stop after this many chunks (0 = no limit).")
+        parser.add_argument("--dry-run", action="store_true", help="Only count the orders that would move.")
+
+    def handle(self, *args, **opts):
+        statuses = getattr(settings, "ORDER_ARCHIVE", {}).get("STATUSES", ["delivered", "cancelled"])
+        cutoff = timezone.now() - timedelta(days=opts["days"])
+        eligible = Order.objects.filter(status__in=statuses, created_at__lt=cutoff)
+
+        if opts["dry_run"]:
+            self.stdout.write(f"{eligible.count()} order(s) older than {opts['days']} days would be archived.")
+            return
+
+        archived = chunks = last_id = 0
+        while True:
+            ids = list(
+                eligible.filter(id__gt=last_id).order_by("id").values_list("id", flat=True)[:opts["chunk_size"]]
+            )
+            if not ids:
+                break
+            archived += self.archive_chunk(ids, statuses, cutoff)
+            last_id = ids[-1]
+            chunks += 1
+            if opts["max_chunks"] and chunks >= opts["max_chunks"]:
+                break
+            if opts["sleep"]:
+                time.sleep(opts["sleep"])
+
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} order(s) in {chunks} chunk(s)."))
+
+    def archive_chunk(self, ids, statuses, cutoff):
+        with transaction.atomic():
+            # Re-read under the transaction: an order may have been reopened since the id scan
+            orders = list(
+                Order.objects.select_for_update()
+                .filter(id__in=ids, status__in=statuses, created_at__lt=cutoff).values(*ORDER_FIELDS)
+            )
+            ids = [order["id"] for order in orders]
+            if not ids:
+                return 0
+            items = OrderItem.objects.filter(order_id__in=ids).values(*ITEM_FIELDS)
+            payments = Payment.objects.filter(order_id__in=ids).values(*PAYMENT_FIELDS)
+
+            # Copy first, then delete children before parents
+            ArchivedOrder.objects.bulk_create([ArchivedOrder(**order) for order in orders])
+            ArchivedOrderItem.objects.bulk_create([ArchivedOrderItem(**item) for item in items])
+            ArchivedPayment.objects.bulk_create([ArchivedPayment(**payment) for payment in payments])
+
+            OrderItem.objects.filter(order_id__in=ids).delete()
+            Payment.objects.filter(order_id__in=ids).delete()
+            Order.objects.filter(id__in=ids).delete()
+        return len(ids)
@@ -0,0 +1,33 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from motivoapp.models import UserProfile
+
+
+class Command(BaseCommand):
+    help = "Create missing UserProfile rows (accounts created before the post_save signal or via bulk inserts)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **opts):
+        created = 0
+        last_id = 0
+        while True:
+            # Walk users by id so each chunk is an index range scan.
+            ids = list(
+                User.objects.filter(id__gt=last_id, profile__isnull=True)
+                .order_by("id").values_list("id", flat=True)[:opts["chunk_size"]]
+            )
+            if not ids:
+                break
+            # A profile can appear between the select and the insert (the post_save
+            # signal of a concurrent save); ignore_conflicts skips it, so count what
+            # the insert actually added.
+            chunk = UserProfile.objects.filter(user_id__in=ids)
+            before = chunk.count()
+            UserProfile.objects.bulk_create([UserProfile(user_id=uid) for uid in ids], ignore_conflicts=True)
+            created += chunk.count() - before
+            last_id = ids[-1]
+
+        self.stdout.write(self.style.SUCCESS(f"Created {created} missing profile(s)."))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks import async_compare, loadtest
+
+
+class Command(BaseCommand):
+    help = "Compare concurrent throughput of the async (ASGI) catalog/wishlist reads with the DRF (WSGI) views."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint and path.")
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument("--products", type=int, default=200)
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **opts):
+        if opts["requests"] < 1 or opts["concurrency"] < 1:
+            raise CommandError("--requests and --concurrency must be positive")
+
+        with loadtest.benchmark_database():
+            ctx = loadtest.build_context(loadtest.seed(products=opts["products"], seed_value=opts["seed"]))
+            mismatched = async_compare.check_same_shape(ctx, opts["seed"])
+            results = async_compare.compare(ctx, opts["requests"], opts["concurrency"], opts["seed"])
+
+        self.stdout.write(async_compare.format_table(results))
+        if mismatched:
+            raise CommandError(f"Async responses differ from the DRF views for: {', '.join(mismatched)}")
+        self.stdout.write(self.style.SUCCESS("Async responses match the DRF views."))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from benchmarks import json_render, loadtest
+
+
+class Command(BaseCommand):
+    help = "Time the stdlib and orjson-backed DRF renderers/parsers on Product and Order list payloads."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 5_000, 10_000])
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **opts):
+        with loadtest.benchmark_database():
+            loadtest.seed(products=500, orders=100)
+            payloads = json_render.sample_payloads()
+        results = json_render.run(payloads, sizes=opts["sizes"], repeat=opts["repeat"])
+        self.stdout.write(json_render.format_table(results))
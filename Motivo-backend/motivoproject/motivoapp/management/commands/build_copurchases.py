@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from motivoapp import recommendations
+
+
+class Command(BaseCommand):
+    help = (
+        "Count products bought together in orders placed since the last run "
+        "(ProductViewSet bought-together serves each product's top companions)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=None,
+                            help="Order ids per transaction (default: RECOMMENDATIONS['CHUNK_ORDERS']).")
+        parser.add_argument("--rebuild", action="store_true", help="Discard all counts and recount every order.")
+
+    def handle(self, *args, **opts):
+        summary = recommendations.update(chunk_orders=opts["chunk_size"], rebuild=opts["rebuild"])
+        self.stdout.write(self.style.SUCCESS(
+            "Orders {from_order}..{to_order}: {pairs} product pair(s) across {products} product(s).".format(**summary)
+        ))
@@ -0,0 +1,285 @@
+import itertools
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.text import slugify
+
+from motivoapp.models import (
+    Category, Product, CartItem, WishlistItem, Order, OrderItem, Payment, UserProfile
+)
+from sellers.models import Seller
+
+ADJECTIVES = ["Happy", "Tiny", "Rainbow", "Wooden", "Magic", "Soft", "Super", "Cosy", "Bright", "Little"]
+NOUNS = {
+    "Toys": ["Car", "Robot", "Doll", "Train", "Blocks", "Puzzle", "Teddy"],
+    "Kids Clothing": ["Frock", "T-Shirt", "Shorts", "Jacket", "Romper", "Pyjamas"],
+    "Baby Care": ["Bottle", "Wipes", "Lotion", "Blanket", "Bib", "Diaper Bag"],
+    "Sports": ["Ball", "Bat", "Cycle", "Skates", "Racket", "Helmet"],
+    "Stationary": ["Crayons", "Notebook", "Pencil Box", "Sketch Pens", "Eraser Set"],
+    "Arts & Crafts": ["Clay Kit", "Paint Set", "Bead Kit", "Origami Pack", "Glitter Glue"],
+}
+CITIES = ["Hyderabad", "Bengaluru", "Chennai", "Mumbai", "Delhi", "Pune", "Kolkata", "Visakhapatnam", "Vijayawada", "Jaipur"]
+AGE_RANGES = [choice for choice, _ in Product.AGE_CHOICES]
+ORDER_STATUSES = ["pending", "processing", "shipped", "delivered", "cancelled"]
+ORDER_STATUS_WEIGHTS = [5, 5, 10, 70, 10]
+
+
+def zipf_cum_weights(n, exponent):
+    """Cumulative Zipf weights for ranks 1..n, for random.choices(cum_weights=...)."""
+    return list(itertools.accumulate(1.0 / (rank ** exponent) for rank in range(1, n + 1)))
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+@contextmanager
+def explicit_timestamps(*fields):
+    # bulk_create still runs pre_save, which would overwrite our spread of
+    # created_at values with "now" for auto_now_add fields.
+    saved = [(field, field.auto_now_add) for field in fields]
+    for field, _ in saved:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, value in saved:
+            field.auto_now_add = value
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a large synthetic dataset (users, sellers, products, carts, wishlists, orders, payments) "
+        "with skewed sellers and Zipfian product popularity. Deterministic for a given --seed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10_000)
+        parser.add_argument("--sellers", type=int, default=200)
+        parser.add_argument("--products", type=int, default=50_000)
+        parser.add_argument("--orders", type=int, default=20_000)
+        parser.add_argument("--cart-items", type=int, default=20_000)
+        parser.add_argument("--wishlist-items", type=int, default=20_000)
+        parser.add_argument("--max-items-per-order", type=int, default=4)
+        parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent for product/seller popularity.")
+        parser.add_argument("--days", type=int, default=365, help="Spread created_at over this many days.")
+        parser.add_argument("--chunk-size", type=int, default=5_000)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--prefix", default="gen", help="Username prefix for generated accounts.")
+
+    def handle(self, *args, **opts):
+        if opts["users"] < 1 or opts["sellers"] < 1 or opts["products"] < 1:
+            raise CommandError("--users, --sellers and --products must be positive")
+        self.opts = opts
+        self.rng = random.Random(opts["seed"])
+        self.now = timezone.now()
+        self.categories = list(Category.objects.order_by("id"))
+        if not self.categories:
+            raise CommandError("No categories found; run migrations first")
+
+        started = time.perf_counter()
+        with explicit_timestamps(
+            Product._meta.get_field("created_at"),
+            Order._meta.get_field("created_at"),
+            Payment._meta.get_field("created_at"),
+            Seller._meta.get_field("created_at"),
+        ):
+            seller_ids = self.create_users(opts["sellers"], role="seller")
+            self.create_sellers(seller_ids)
+            user_ids = self.create_users(opts["users"], role="user")
+            self.create_profiles(seller_ids + user_ids)
+            product_ids, prices = self.create_products(seller_ids)
+
+            self.product_weights = zipf_cum_weights(len(product_ids), opts["zipf"])
+            self.create_user_lists(CartItem, user_ids, product_ids, opts["cart_items"], quantity=True)
+            self.create_user_lists(WishlistItem, user_ids, product_ids, opts["wishlist_items"])
+            self.create_orders(user_ids, product_ids, prices)
+
+        self.reset_sequences()
+        self.stdout.write(self.style.SUCCESS(f"Dataset generated in {time.perf_counter() - started:.1f}s"))
+
+    # ------------------------
+    # Helpers
+    # ------------------------
+    def next_id(self, model):
+        return (model.objects.aggregate(m=Max("id"))["m"] or 0) + 1
+
+    def random_past(self):
+        return self.now - timedelta(seconds=self.rng.randrange(self.opts["days"] * 86400))
+
+    def insert(self, model, rows, label):
+        total = 0
+        for chunk in chunked(rows, self.opts["chunk_size"]):
+            with transaction.atomic():
+                model.objects.bulk_create(chunk, batch_size=self.opts["chunk_size"])
+            total += len(chunk)
+        self.stdout.write(f"  {label}: {total}")
+        return total
+
+    def reset_sequences(self):
+        # Rows were inserted with explicit ids; move Postgres sequences past them.
+        models = [User, Seller, UserProfile, Product, CartItem, WishlistItem, Order, OrderItem, Payment]
+        statements = connection.ops.sequence_reset_sql(self.style, models)
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+
+    # ------------------------
+    # Generators
+    # ------------------------
+    def create_users(self, count, role):
+        start = self.next_id(User)
+        prefix = self.opts["prefix"]
+        ids = list(range(start, start + count))
+
+        def rows():
+            for uid in ids:
+                email = f"{prefix}-{role}-{uid}@example.com"
+                yield User(
+                    id=uid, username=email, email=email, password="!",
+                    first_name=f"{role.title()}{uid}", date_joined=self.random_past(),
+                )
+
+        self.insert(User, rows(), f"{role} accounts")
+        return ids
+
+    def create_sellers(self, seller_ids):
+        start = self.next_id(Seller)
+        self.insert(Seller, (
+            Seller(id=start + i, user_id=uid, shop_name=f"Shop {uid}", created_at=self.random_past())
+            for i, uid in enumerate(seller_ids)
+        ), "sellers")
+
+    def create_profiles(self, user_ids):
+        # post_save would normally create these one at a time.
+        start = self.next_id(UserProfile)
+        self.insert(UserProfile, (
+            UserProfile(id=start + i, user_id=uid, city=self.rng.choice(CITIES))
+            for i, uid in enumerate(user_ids)
+        ), "profiles")
+
+    def create_products(self, seller_ids):
+        start = self.next_id(Product)
+        count = self.opts["products"]
+        seller_weights = zipf_cum_weights(len(seller_ids), self.opts["zipf"])
+        ids = list(range(start, start + count))
+        prices = {}
+
+        def rows():
+            for pid in ids:
+                category = self.rng.choice(self.categories)
+                name = f"{self.rng.choice(ADJECTIVES)} {self.rng.choice(NOUNS.get(category.name, ['Item']))}"
+                price = Decimal(round(self.rng.lognormvariate(6.3, 0.7), 2)).quantize(Decimal("0.01"))
+                on_sale = self.rng.random() < 0.3
+                prices[pid] = price
+                product = Product(
+                    id=pid,
+                    seller_id=self.rng.choices(seller_ids, cum_weights=seller_weights)[0],
+                    category=category,
+                    name=name,
+                    # The id makes the slug unique without Product.save()'s lookup loop.
+                    slug=f"{slugify(name)}-{pid}",
+                    description=f"{name} for kids.",
+                    price=price,
+                    original_price=(price * Decimal("1.25")).quantize(Decimal("0.01")) if on_sale else None,
+                    age_range=self.rng.choice(AGE_RANGES),
+                    is_new=self.rng.random() < 0.1,
+                    is_sale=on_sale,
+                    location=self.rng.choice(CITIES),
+                    created_at=self.random_past(),
+                )
+                product.set_coordinates()  # bulk_create skips save()
+                yield product
+
+        self.insert(Product, rows(), "products")
+        return ids, prices
+
+    def pick_products(self, product_ids, k):
+        picked = set()
+        # Popular products collide often; bound the attempts instead of looping forever.
+        for _ in range(k * 4):
+            picked.add(self.rng.choices(product_ids, cum_weights=self.product_weights)[0])
+            if len(picked) == k:
+                break
+        return picked
+
+    def create_user_lists(self, model, user_ids, product_ids, total, quantity=False):
+        start = self.next_id(model)
+        # Each user is visited at most once so (user, product) stays unique
+        # without tracking every pair in memory.
+        users = list(user_ids)
+        self.rng.shuffle(users)
+
+        def rows():
+            produced = 0
+            for user_id in users:
+                if produced >= total:
+                    return
+                for product_id in self.pick_products(product_ids, min(self.rng.randint(1, 8), total - produced)):
+                    row = model(id=start + produced, user_id=user_id, product_id=product_id)
+                    if quantity:
+                        row.quantity = self.rng.randint(1, 3)
+                    produced += 1
+                    yield row
+
+        self.insert(model, rows(), str(model._meta.verbose_name_plural))
+
+    def create_orders(self, user_ids, product_ids, prices):
+        order_start = self.next_id(Order)
+        item_start = self.next_id(OrderItem)
+        payment_start = self.next_id(Payment)
+        count = self.opts["orders"]
+        items, payments = [], []
+
+        def orders():
+            item_id = item_start
+            for i in range(count):
+                order_id = order_start + i
+                created = self.random_past()
+                lines = self.pick_products(product_ids, self.rng.randint(1, self.opts["max_items_per_order"]))
+                total = Decimal("0")
+                for product_id in lines:
+                    qty = self.rng.randint(1, 3)
+                    total += prices[product_id] * qty
+                    items.append(OrderItem(
+                        id=item_id, order_id=order_id, product_id=product_id,
+                        quantity=qty, price_at_purchase=prices[product_id],
+                    ))
+                    item_id += 1
+                status = self.rng.choices(ORDER_STATUSES, weights=ORDER_STATUS_WEIGHTS)[0]
+                payments.append(Payment(
+                    id=payment_start + i, order_id=order_id, amount=total,
+                    payment_method=self.rng.choice(["card", "upi"]),
+                    payment_status="Pending" if status == "pending" else "Completed",
+                    transaction_id=f"txn_{order_id}", created_at=created,
+                ))
+                yield Order(
+                    id=order_id, user_id=self.rng.choice(user_ids), total_price=total,
+                    status=status, created_at=created,
+                )
+
+        # Items and payments are flushed after each order chunk so memory stays bounded.
+        total = 0
+        for chunk in chunked(orders(), self.opts["chunk_size"]):
+            with transaction.atomic():
+                Order.objects.bulk_create(chunk)
+                OrderItem.objects.bulk_create(items, batch_size=self.opts["chunk_size"])
+                Payment.objects.bulk_create(payments, batch_size=self.opts["chunk_size"])
+            total += len(chunk)
+            items.clear()
+            payments.clear()
+        self.stdout.write(f"  orders: {total}")
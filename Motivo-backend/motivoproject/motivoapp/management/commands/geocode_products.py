@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from motivoapp import geo
+from motivoapp.models import Product
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill Product.latitude/longitude/geohash from Product.location using the bundled "
+        "gazetteer (no network calls), walking products in id chunks."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true",
+                            help="Re-geocode every product, e.g. after the gazetteer was extended.")
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **opts):
+        queryset = Product.objects.exclude(location__isnull=True).exclude(location="")
+        if not opts["all"]:
+            queryset = queryset.filter(latitude__isnull=True)
+
+        last_id = 0
+        located = unknown = 0
+        while True:
+            products = list(
+                queryset.filter(id__gt=last_id).order_by("id")
+                .only("id", "location", "latitude", "longitude", "geohash")[:opts["chunk_size"]]
+            )
+            if not products:
+                break
+            last_id = products[-1].id
+            for product in products:
+                product.set_coordinates()
+                if product.latitude is None:
+                    unknown += 1
+                else:
+                    located += 1
+            with transaction.atomic():
+                Product.objects.bulk_update(products, ["latitude", "longitude", "geohash"])
+
+        self.stdout.write(self.style.SUCCESS(f"Geocoded {located} products; {unknown} locations not in the gazetteer."))
@@ -0,0 +1,87 @@
+import json
+import platform
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from benchmarks import loadtest
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the in-process HTTP load benchmark against a throwaway database and "
+        "compare p50/p95/p99 latency, throughput and queries per request with the committed baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scenario", action="append", choices=sorted(loadtest.SCENARIOS),
+                            help="Scenario to run (repeatable). Defaults to all.")
+        parser.add_argument("--iterations", type=int, default=50)
+        parser.add_argument("--warmup", type=int, default=5)
+        parser.add_argument("--concurrency", type=int, default=1, help="Client threads per scenario.")
+        parser.add_argument("--products", type=int, default=200, help="Catalog size to seed.")
+        parser.add_argument("--orders", type=int, default=20, help="Existing orders to seed.")
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--baseline", default=str(loadtest.BASELINE_PATH))
+        parser.add_argument("--save-baseline", action="store_true", help="Overwrite the baseline with this run.")
+        parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed latency growth (0.25 = 25%%).")
+        parser.add_argument("--fail-on-regression", action="store_true")
+        parser.add_argument("--json", dest="json_out", help="Also write the results to this file.")
+
+    def handle(self, *args, **opts):
+        if opts["concurrency"] < 1 or opts["iterations"] < 1:
+            raise CommandError("--iterations and --concurrency must be positive")
+
+        names = opts["scenario"] or list(loadtest.SCENARIOS)
+        with loadtest.benchmark_database():
+            data = loadtest.seed(products=opts["products"], orders=opts["orders"], seed_value=opts["seed"])
+            ctx = loadtest.build_context(data)
+            results = {}
+            for name in names:
+                self.stdout.write(f"running {name} ...")
+                results[name] = loadtest.run_scenario(
+                    name, ctx,
+                    iterations=opts["iterations"],
+                    warmup=opts["warmup"],
+                    concurrency=opts["concurrency"],
+                    seed_value=opts["seed"],
+                )
+
+        baseline = loadtest.load_baseline(opts["baseline"])
+        self.stdout.write("")
+        self.stdout.write(loadtest.format_table(results, baseline))
+
+        meta = {
+            "iterations": opts["iterations"],
+            "concurrency": opts["concurrency"],
+            "products": opts["products"],
+            "orders": opts["orders"],
+            "python": platform.python_version(),
+            "database": connection.vendor,
+        }
+        if opts["json_out"]:
+            Path(opts["json_out"]).write_text(json.dumps({"meta": meta, "scenarios": results}, indent=2))
+        if opts["save_baseline"]:
+            loadtest.save_baseline(results, meta, opts["baseline"])
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {opts['baseline']}"))
+            return
+
+        if baseline:
+            mismatched = [k for k in ("concurrency", "products", "orders") if baseline.get("meta", {}).get(k) != meta[k]]
+            if mismatched:
+                self.stdout.write(self.style.WARNING(
+                    f"Baseline was recorded with different {', '.join(mismatched)}; latency deltas are not comparable."
+                ))
+        regressions = loadtest.compare(results, baseline, opts["tolerance"])
+        if not baseline:
+            self.stdout.write(self.style.WARNING("No baseline found; run with --save-baseline to record one."))
+        elif regressions:
+            self.stdout.write(self.style.ERROR("Regressions against baseline:"))
+            for line in regressions:
+                self.stdout.write(f"  {line}")
+            if opts["fail_on_regression"]:
+                raise CommandError(f"{len(regressions)} regression(s) against baseline")
+        else:
+            self.stdout.write(self.style.SUCCESS("No regressions against baseline."))
+
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks import startup
+
+
+class Command(BaseCommand):
+    help = "Boot a fresh interpreter the way a worker does and report phase timings and import time per module."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=25, help="Rows per table.")
+        parser.add_argument("--warmup", action="store_true", help="Also time the motivoapp.warmup steps.")
+
+    def handle(self, *args, **opts):
+        try:
+            phases, modules = startup.run(warmup=opts["warmup"])
+        except RuntimeError as exc:
+            raise CommandError(f"Startup failed: {exc}")
+        self.stdout.write(startup.format_report(phases, modules, limit=opts["limit"]))
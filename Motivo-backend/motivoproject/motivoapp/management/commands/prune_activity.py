@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from motivoapp.activity import current_hour
+from motivoapp.models import ProductActivity
+
+
+class Command(BaseCommand):
+    help = "Delete hourly product activity buckets older than the trending window, in small chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=int, default=None,
+                            help="Keep this many hours (default: PRODUCT_ACTIVITY['WINDOW_HOURS']).")
+        parser.add_argument("--chunk-size", type=int, default=5000)
+
+    def handle(self, *args, **opts):
+        hours = opts["hours"] or getattr(settings, "PRODUCT_ACTIVITY", {}).get("WINDOW_HOURS", 168)
+        cutoff = current_hour() - hours
+        deleted = 0
+        while True:
+            ids = list(
+                ProductActivity.objects.filter(hour__lte=cutoff)
+                .order_by("id").values_list("id", flat=True)[:opts["chunk_size"]]
+            )
+            if not ids:
+                break
+            with transaction.atomic():
+                deleted += ProductActivity.objects.filter(id__in=ids).delete()[0]
+        self.stdout.write(self.style.SUCCESS(f"Pruned {deleted} activity buckets older than {hours}h."))
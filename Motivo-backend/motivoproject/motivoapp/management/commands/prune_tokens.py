@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired outstanding/blacklisted JWT refresh tokens in small chunks, "
+        "so pruning never holds long locks on the token tables."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument("--sleep", type=float, default=0.0, help="Seconds to pause between chunks.")
+        parser.add_argument("--max-chunks", type=int, default=0, help="Stop after this many chunks (0 = no limit).")
+
+    def handle(self, *args, **opts):
+        # Tokens that expired before we started; rows expiring mid-run wait for the next run.
+        cutoff = timezone.now()
+        deleted_outstanding = deleted_blacklisted = chunks = 0
+
+        while True:
+            ids = list(
+                OutstandingToken.objects.filter(expires_at__lt=cutoff)
+                .order_by("id").values_list("id", flat=True)[:opts["chunk_size"]]
+            )
+            if not ids:
+                break
+            with transaction.atomic():
+                deleted_blacklisted += BlacklistedToken.objects.filter(token_id__in=ids).delete()[0]
+                deleted_outstanding += OutstandingToken.objects.filter(id__in=ids).delete()[0]
+            chunks += 1
+            if opts["max_chunks"] and chunks >= opts["max_chunks"]:
+                break
+            if opts["sleep"]:
+                time.sleep(opts["sleep"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Pruned {deleted_outstanding} outstanding and {deleted_blacklisted} blacklisted tokens in {chunks} chunk(s)."
+        ))
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from motivoapp.models import Product, Review
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild Product.rating/review_count/rating_total from the Review table, "
+        "walking products in id chunks. Use to repair drift; normal writes keep them up to date."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **opts):
+        last_id = 0
+        fixed = scanned = 0
+        while True:
+            products = list(
+                Product.objects.filter(id__gt=last_id).order_by("id")
+                .only("id", "rating", "review_count", "rating_total")[:opts["chunk_size"]]
+            )
+            if not products:
+                break
+            last_id = products[-1].id
+            scanned += len(products)
+
+            totals = {
+                row["product_id"]: (row["total"], row["count"])
+                for row in Review.objects.filter(product_id__in=[p.id for p in products])
+                .values("product_id").annotate(total=Sum("rating"), count=Count("id"))
+            }
+            changed = []
+            for product in products:
+                total, count = totals.get(product.id, (0, 0))
+                rating = total / count if count else 0.0
+                if (product.rating_total, product.review_count, product.rating) != (total, count, rating):
+                    product.rating_total, product.review_count, product.rating = total, count, rating
+                    changed.append(product)
+            if changed:
+                with transaction.atomic():
+                    Product.objects.bulk_update(changed, ["rating_total", "review_count", "rating"])
+                fixed += len(changed)
+
+        self.stdout.write(self.style.SUCCESS(f"Scanned {scanned} products, corrected {fixed}."))
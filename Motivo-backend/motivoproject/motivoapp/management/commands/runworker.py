@@ -0,0 +1,79 @@
+import logging
+import os
+import signal
+import socket
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection
+
+from motivoapp import jobs
+from motivoapp.metrics import registry as metrics_registry
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs (motivoapp.jobs) on a thread pool until stopped."
+
+    def add_arguments(self, parser):
+        config = getattr(settings, "JOB_QUEUE", {})
+        parser.add_argument("--queues", nargs="+", default=config.get("QUEUES", ["default", "email"]))
+        parser.add_argument("--concurrency", type=int, default=config.get("CONCURRENCY", 4),
+                            help="Jobs run at once by this worker (threads).")
+        parser.add_argument("--poll-interval", type=float, default=config.get("POLL_INTERVAL", 1.0),
+                            help="Seconds to wait when no job is due.")
+        parser.add_argument("--burst", action="store_true", help="Exit once no job is due.")
+
+    def handle(self, *args, **opts):
+        worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        housekeeping_interval = getattr(settings, "JOB_QUEUE", {}).get("HOUSEKEEPING_INTERVAL", 60)
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        self.stdout.write(f"Worker {worker_id}: queues {', '.join(opts['queues'])}, concurrency {opts['concurrency']}")
+
+        running = set()
+        done = 0
+        next_housekeeping = 0.0
+        with ThreadPoolExecutor(max_workers=opts["concurrency"], thread_name_prefix="job") as pool:
+            while not self.stopping:
+                try:
+                    if time.monotonic() >= next_housekeeping:
+                        jobs.requeue_stale()
+                        jobs.purge_finished()
+                        next_housekeeping = time.monotonic() + housekeeping_interval
+
+                    free = opts["concurrency"] - len(running)
+                    claimed = jobs.claim(opts["queues"], free, worker_id) if free else []
+                except DatabaseError as exc:
+                    # Transient (e.g. SQLite "database is locked" while web workers write):
+                    # drop the connection and try again after a pause instead of exiting
+                    logger.warning("Job queue poll failed: %s", exc)
+                    connection.close()
+                    claimed = []
+                    if not running:
+                        time.sleep(opts["poll_interval"])
+                        continue
+                running.update(pool.submit(jobs.run, job_row) for job_row in claimed)
+                if not running and not claimed and opts["burst"]:
+                    break
+
+                if running:
+                    # Wake as soon as a slot frees up, or poll again for newly due jobs
+                    finished, running = wait(running, timeout=opts["poll_interval"], return_when=FIRST_COMPLETED)
+                    done += len(finished)
+                    running = set(running)
+                elif not claimed:
+                    time.sleep(opts["poll_interval"])
+                metrics_registry.maybe_flush()
+
+            # Finish what was already claimed before exiting
+            done += len(wait(running).done)
+        metrics_registry.flush()
+        self.stdout.write(self.style.SUCCESS(f"Worker {worker_id} stopped after {done} job(s)."))
+
+    def stop(self, signum, frame):
+        self.stopping = True
@@ -0,0 +1,283 @@
+# metrics.py
+#
+# Small in-process metrics registry (counters, histograms, scrape-time gauges)
+# rendered in the Prometheus text format.
+#
+# gunicorn runs several worker processes, each with its own registry. Every
+# worker periodically writes a snapshot to METRICS_DIR/metrics-<pid>.json and
+# the /api/metrics/ endpoint merges all snapshots, so whichever worker serves
+# the scrape reports totals for the whole instance. Snapshots left behind by
+# workers that have exited (gunicorn restarts) are folded into one aggregate
+# file, so the totals keep counting what those workers served.
+import fcntl
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+
+# Counters and histograms of workers that have exited, folded together
+DEAD_SNAPSHOT = "metrics-dead.json"
+
+# Latency buckets in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HELP = {
+    "http_request_duration_seconds": ("histogram", "Request latency by route and method."),
+    "http_responses_total": ("counter", "Responses by route and status code."),
+    "db_queries_total": ("counter", "Database queries executed, by route."),
+    "db_query_duration_seconds_total": ("counter", "Time spent in database queries, by route."),
+    "cache_requests_total": ("counter", "Cache lookups by cache and result (hit/miss)."),
+}
+
+
+def _key(labels):
+    return tuple(sorted((labels or {}).items()))
+
+
+class MetricsRegistry:
+    def __init__(self, directory=None, flush_interval=5.0, buckets=DEFAULT_BUCKETS):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.buckets = tuple(buckets)
+        self.counters = {}    # name -> {label key: value}
+        self.histograms = {}  # name -> {label key: [bucket counts..., sum, count]}
+        self.gauges = {}      # name -> (help, callable returning {label key: value})
+        self.lock = threading.Lock()
+        self.last_flush = time.monotonic()
+
+    # ------------------------
+    # Recording
+    # ------------------------
+    def inc(self, name, labels=None, value=1):
+        key = _key(labels)
+        with self.lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name, value, labels=None):
+        key = _key(labels)
+        with self.lock:
+            series = self.histograms.setdefault(name, {})
+            state = series.get(key)
+            if state is None:
+                state = series[key] = [0] * (len(self.buckets) + 2)
+            index = bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def record_cache(self, cache, hit):
+        self.inc("cache_requests_total", {"cache": cache, "result": "hit" if hit else "miss"})
+
+    def register_gauge(self, name, help_text, collect):
+        """
+        Register a gauge evaluated at scrape time. `collect` returns a number or
+        a dict mapping label tuples, e.g. (("queue", "email"),), to numbers.
+        Gauges describe shared state (queue depths in the database), so they
+        are read once per scrape rather than summed across workers.
+        """
+        self.gauges[name] = (help_text, collect)
+
+    # ------------------------
+    # Cross-process aggregation
+    # ------------------------
+    def snapshot(self):
+        with self.lock:
+            return _serialise(self.counters, self.histograms)
+
+    def _path(self):
+        return os.path.join(self.directory, f"metrics-{os.getpid()}.json")
+
+    def flush(self):
+        if not self.directory:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path()
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as fh:
+            json.dump(self.snapshot(), fh)
+        os.replace(tmp, path)  # atomic, so readers never see half a file
+        self.last_flush = time.monotonic()
+
+    def maybe_flush(self):
+        if time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def collect(self):
+        """Merge this process's live data with the snapshots of every other worker."""
+        snapshots = [self.snapshot()]
+        if self.directory and os.path.isdir(self.directory):
+            self._fold_dead()
+            own = os.path.basename(self._path())
+            for name in os.listdir(self.directory):
+                if name != own and _is_snapshot(name):
+                    snap = _load(os.path.join(self.directory, name))
+                    if snap is not None:
+                        snapshots.append(snap)
+
+        counters, histograms = {}, {}
+        for snap in snapshots:
+            _merge(counters, histograms, snap)
+        return counters, histograms
+
+    def _fold_dead(self):
+        """
+        Add the snapshots of exited workers to DEAD_SNAPSHOT and delete them, so
+        the instance totals never go down when gunicorn recycles a worker
+        (Prometheus would read that as a counter reset). Gauges aren't part of
+        snapshots, so a dead worker's are simply gone.
+        """
+        dead = [
+            name for name in os.listdir(self.directory)
+            if _is_snapshot(name) and name != DEAD_SNAPSHOT and not _alive(name[len("metrics-"):-len(".json")])
+        ]
+        if not dead:
+            return
+        # Every worker may try this on a scrape; one folds at a time, and a file
+        # another worker already folded is gone by the time we hold the lock.
+        with open(os.path.join(self.directory, ".fold.lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            aggregate_path = os.path.join(self.directory, DEAD_SNAPSHOT)
+            counters, histograms = {}, {}
+            _merge(counters, histograms, _load(aggregate_path) or {})
+            folded = []
+            for name in dead:
+                path = os.path.join(self.directory, name)
+                snap = _load(path)
+                if snap is not None:
+                    _merge(counters, histograms, snap)
+                    folded.append(path)
+            if not folded:
+                return
+            tmp = f"{aggregate_path}.tmp"
+            with open(tmp, "w") as fh:
+                json.dump(_serialise(counters, histograms), fh)
+            os.replace(tmp, aggregate_path)
+            for path in folded:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    # ------------------------
+    # Exposition
+    # ------------------------
+    def render(self):
+        counters, histograms = self.collect()
+        lines = []
+
+        for name in sorted(histograms):
+            self._header(lines, name, "histogram")
+            for key, state in sorted(histograms[name].items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, state):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_labels(key + (('le', _num(bound)),))} {cumulative}")
+                lines.append(f"{name}_bucket{_labels(key + (('le', '+Inf'),))} {state[-1]}")
+                lines.append(f"{name}_sum{_labels(key)} {_num(state[-2])}")
+                lines.append(f"{name}_count{_labels(key)} {state[-1]}")
+
+        for name in sorted(counters):
+            self._header(lines, name, "counter")
+            for key, value in sorted(counters[name].items()):
+                lines.append(f"{name}{_labels(key)} {_num(value)}")
+
+        for name, (help_text, collect) in sorted(self.gauges.items()):
+            try:
+                values = collect()
+            except Exception:
+                continue  # a broken gauge must not take the whole scrape down
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            if not isinstance(values, dict):
+                values = {(): values}
+            for key, value in sorted(values.items()):
+                lines.append(f"{name}{_labels(key)} {_num(value)}")
+
+        return "\n".join(lines) + "\n"
+
+    def _header(self, lines, name, kind):
+        kind, help_text = HELP.get(name, (kind, name))
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+
+def _is_snapshot(name):
+    return name.startswith("metrics-") and name.endswith(".json")
+
+
+def _load(path):
+    try:
+        with open(path) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None  # file vanished or is being replaced
+
+
+def _serialise(counters, histograms):
+    return {
+        "counters": {n: [[list(k), v] for k, v in s.items()] for n, s in counters.items()},
+        "histograms": {n: [[list(k), list(v)] for k, v in s.items()] for n, s in histograms.items()},
+    }
+
+
+def _merge(counters, histograms, snap):
+    for name, series in snap.get("counters", {}).items():
+        merged = counters.setdefault(name, {})
+        for labels, value in series:
+            key = tuple(tuple(pair) for pair in labels)
+            merged[key] = merged.get(key, 0) + value
+    for name, series in snap.get("histograms", {}).items():
+        merged = histograms.setdefault(name, {})
+        for labels, state in series:
+            key = tuple(tuple(pair) for pair in labels)
+            if key in merged and len(merged[key]) == len(state):
+                merged[key] = [a + b for a, b in zip(merged[key], state)]
+            else:
+                merged[key] = list(state)
+
+
+def _alive(pid):
+    try:
+        os.kill(int(pid), 0)
+    except (ValueError, ProcessLookupError):
+        return False
+    except PermissionError:
+        return True  # exists, owned by another user
+    return True
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(key):
+    if not key:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in key) + "}"
+
+
+def _num(value):
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(value)
+
+
+registry = MetricsRegistry(
+    directory=getattr(settings, "METRICS_DIR", os.path.join(tempfile.gettempdir(), "motivo-metrics")),
+    flush_interval=getattr(settings, "METRICS_FLUSH_INTERVAL", 5.0),
+)
+
+
+def _payment_queue_depth():
+    # Payments created at checkout stay "Pending" until the gateway confirms them
+    from .models import Payment
+    return Payment.objects.filter(payment_status="Pending").count()
+
+
+registry.register_gauge("payment_queue_depth", "Payments still awaiting confirmation.", _payment_queue_depth)
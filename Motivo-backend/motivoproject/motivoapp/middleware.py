@@ -0,0 +1,311 @@
+# middleware.py
+import threading
+import time
+import zlib
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connection
+from django.http import JsonResponse
+from django.utils.cache import patch_vary_headers
+
+from .metrics import registry
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+
+class MetricsMiddleware:
+    """
+    Records per-route latency, status codes and database query count/time.
+    Routes are labelled with the URL pattern (not the raw path) so ids don't
+    explode the number of series. Streaming responses do their queries and
+    serialization while the body is sent, so for them the numbers are
+    recorded when the stream finishes, not when the view returns.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        db = {"count": 0, "time": 0.0}
+
+        def track_queries(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                db["count"] += 1
+                db["time"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        with connection.execute_wrapper(track_queries):
+            response = self.get_response(request)
+
+        if response.streaming:
+            finish = lambda: self.record(request, response, time.perf_counter() - start, db)  # noqa: E731
+            if response.is_async:
+                response.streaming_content = self._track_async(response.streaming_content, finish)
+            else:
+                response.streaming_content = self._track_stream(response.streaming_content, track_queries, finish)
+            return response
+
+        self.record(request, response, time.perf_counter() - start, db)
+        return response
+
+    @staticmethod
+    def _track_stream(content, track_queries, finish):
+        try:
+            with connection.execute_wrapper(track_queries):
+                yield from content
+        finally:
+            finish()  # also runs when the client disconnects and the server closes the stream
+
+    @staticmethod
+    async def _track_async(content, finish):
+        # Async views query from sync_to_async threads, outside this connection's wrapper
+        try:
+            async for chunk in content:
+                yield chunk
+        finally:
+            finish()
+
+    def record(self, request, response, elapsed, db):
+        match = getattr(request, "resolver_match", None)
+        route = match.route if match else "unmatched"
+        registry.observe("http_request_duration_seconds", elapsed, {"route": route, "method": request.method})
+        registry.inc("http_responses_total", {"route": route, "status": str(response.status_code)})
+        registry.inc("db_queries_total", {"route": route}, db["count"])
+        registry.inc("db_query_duration_seconds_total", {"route": route}, db["time"])
+        registry.maybe_flush()
+
+
+class ConcurrencyLimitMiddleware:
+    """
+    Load shedding: caps in-flight requests per path prefix in this process
+    (settings.CONCURRENCY_LIMITS = {"/api/auth/": 4, ...}). Past the cap the
+    request is turned away at once with 503 + Retry-After instead of queueing
+    behind the others, so the ones being served keep a bounded latency.
+
+    The cap is per process, so it only bites where one process serves many
+    requests at once: the ASGI entrypoint (async views, the order event
+    stream) or threaded workers. A gunicorn sync worker never exceeds one.
+    A streaming response keeps its slot until the body has been sent.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.limits = dict(getattr(settings, "CONCURRENCY_LIMITS", {}))
+        # Longest prefix first so "/api/orders/create-payment-intent/" beats "/api/orders/"
+        self.prefixes = sorted(self.limits, key=len, reverse=True)
+        self.in_flight = dict.fromkeys(self.limits, 0)
+        self.lock = threading.Lock()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        prefix = self.admit(request)
+        if prefix is False:
+            return self.shed(request)
+        if prefix is None:
+            return self.get_response(request)
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            self.release(prefix)
+            raise
+        return self.release_after(response, prefix)
+
+    async def __acall__(self, request):
+        prefix = self.admit(request)
+        if prefix is False:
+            return self.shed(request)
+        if prefix is None:
+            return await self.get_response(request)
+        try:
+            response = await self.get_response(request)
+        except BaseException:
+            self.release(prefix)
+            raise
+        return self.release_after(response, prefix)
+
+    def admit(self, request):
+        """The matched prefix with a slot taken, None if unlimited, False if full."""
+        prefix = next((p for p in self.prefixes if request.path_info.startswith(p)), None)
+        if prefix is None:
+            return None
+        with self.lock:
+            if self.in_flight[prefix] >= self.limits[prefix]:
+                return False
+            self.in_flight[prefix] += 1
+        return prefix
+
+    def shed(self, request):
+        prefix = next(p for p in self.prefixes if request.path_info.startswith(p))
+        registry.inc("http_shed_total", {"prefix": prefix})
+        response = JsonResponse({"detail": "Server busy, please retry shortly."}, status=503)
+        response["Retry-After"] = "1"
+        return response
+
+    def release(self, prefix):
+        with self.lock:
+            self.in_flight[prefix] -= 1
+
+    def release_after(self, response, prefix):
+        if not response.streaming:
+            self.release(prefix)
+            return response
+        # Both the WSGI and ASGI handlers close the response once the body is
+        # sent or the client goes away, including a stream that never started
+        released = []
+
+        def release_once():
+            if not released:
+                released.append(True)
+                self.release(prefix)
+        response._resource_closers.append(release_once)
+        return response
+
+
+class CompressionMiddleware:
+    """
+    Compresses text/JSON responses with brotli (when the brotli package is
+    installed) or gzip, whichever the client prefers. Buffered bodies under MIN_SIZE
+    are left alone. Streaming responses are compressed chunk by chunk with a
+    flush after each, so they stay streamed.
+
+    Paths under EXCLUDE_PREFIXES (auth endpoints, whose bodies carry tokens
+    next to user input) are never compressed, as a BREACH mitigation.
+    """
+
+    COMPRESSIBLE_TYPES = {
+        "application/json", "application/x-ndjson", "application/javascript",
+        "application/xml", "image/svg+xml",
+    }
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        config = getattr(settings, "COMPRESSION", {})
+        self.min_size = config.get("MIN_SIZE", 1024)
+        self.gzip_level = config.get("GZIP_LEVEL", 6)
+        self.brotli_quality = config.get("BROTLI_QUALITY", 4)
+        self.exclude = tuple(config.get("EXCLUDE_PREFIXES", ()))
+        self.codings = ("br", "gzip") if brotli is not None else ("gzip",)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not self.compressible(request, response):
+            return response
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        coding = self.choose(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if coding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = self._compress_async(response.streaming_content, coding)
+            else:
+                response.streaming_content = self._compress_stream(response.streaming_content, coding)
+            del response["Content-Length"]
+        else:
+            compressor = self.compressor(coding)
+            compressed = compressor.compress(response.content) + compressor.finish()
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response["Content-Length"] = str(len(compressed))
+
+        # The bytes differ from the uncompressed variant's, so the ETag can only be weak
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        response["Content-Encoding"] = coding
+        registry.inc("http_compressed_responses_total", {"encoding": coding})
+        return response
+
+    def compressible(self, request, response):
+        if response.has_header("Content-Encoding") or response.status_code in (204, 206, 304):
+            return False
+        if response.has_header("Accept-Ranges"):
+            return False  # byte ranges (serve_media) refer to the uncompressed file
+        if request.path_info.startswith(self.exclude) or "no-transform" in response.get("Cache-Control", ""):
+            return False
+        content_type = response.get("Content-Type", "").split(";")[0].strip().lower()
+        if content_type == "text/event-stream":
+            return False  # SSE: each event must reach the client as written
+        return content_type.startswith("text/") or content_type in self.COMPRESSIBLE_TYPES
+
+    def choose(self, accept_encoding):
+        """The preferred coding we support with q > 0, or None."""
+        weights = {}
+        for part in accept_encoding.split(","):
+            coding, _, params = part.strip().partition(";")
+            try:
+                weight = float(params.strip()[2:]) if params.strip().startswith("q=") else 1.0
+            except ValueError:
+                weight = 0.0
+            if coding:
+                weights[coding.strip().lower()] = weight
+        for coding in self.codings:
+            if weights.get(coding, weights.get("*", 0.0)) > 0:
+                return coding
+        return None
+
+    def compressor(self, coding):
+        if coding == "br":
+            return _BrotliCompressor(self.brotli_quality)
+        return _GzipCompressor(self.gzip_level)
+
+    def _compress_stream(self, chunks, coding):
+        compressor = self.compressor(coding)
+        for chunk in chunks:
+            data = compressor.compress(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+
+    async def _compress_async(self, chunks, coding):
+        compressor = self.compressor(coding)
+        async for chunk in chunks:
+            data = compressor.compress(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+
+
+class _GzipCompressor:
+    def __init__(self, level):
+        self.obj = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+
+    def compress(self, data):
+        return self.obj.compress(data)
+
+    def flush(self):
+        return self.obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self.obj.flush()
+
+
+class _BrotliCompressor:
+    def __init__(self, quality):
+        self.obj = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self.obj.process(data)
+
+    def flush(self):
+        return self.obj.flush()
+
+    def finish(self):
+        return self.obj.finish()
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:12
+
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def seed_rating_totals(apps, schema_editor):
+    # Derive the aggregates from the Review rows, as recompute_ratings does, so
+    # placeholder averages without reviews behind them don't survive the switch
+    Product = apps.get_model("motivoapp", "Product")
+    Review = apps.get_model("motivoapp", "Review")
+    totals = {
+        row["product_id"]: (row["total"], row["count"])
+        for row in Review.objects.values("product_id").annotate(total=Sum("rating"), count=Count("id"))
+    }
+    changed = []
+    for product in Product.objects.only("id", "rating", "review_count", "rating_total").iterator(chunk_size=1000):
+        total, count = totals.get(product.id, (0, 0))
+        rating = total / count if count else 0.0
+        if (product.rating_total, product.review_count, product.rating) != (total, count, rating):
+            product.rating_total, product.review_count, product.rating = total, count, rating
+            changed.append(product)
+    Product.objects.bulk_update(changed, ["rating_total", "review_count", "rating"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('motivoapp', '0002_auto_20250902_1502'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='rating_total',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='Review',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rating', models.PositiveSmallIntegerField(validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(5)])),
+                ('comment', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reviews', to='motivoapp.product')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reviews', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['product', '-created_at', '-id'], name='review_product_recent_idx')],
+                'unique_together': {('product', 'user')},
+            },
+        ),
+        migrations.RunPython(seed_rating_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('motivoapp', '0003_review_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.PositiveIntegerField()),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('cart_adds', models.PositiveIntegerField(default=0)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity', to='motivoapp.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['hour'], name='activity_hour_idx')],
+                'unique_together': {('product', 'hour')},
+            },
+        ),
+    ]
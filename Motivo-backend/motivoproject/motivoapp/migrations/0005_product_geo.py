@@ -0,0 +1,44 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:19
+
+from django.db import migrations, models
+
+from motivoapp import geo
+
+
+def geocode_existing(apps, schema_editor):
+    # Offline lookup against the bundled gazetteer; `manage.py geocode_products` does the same later
+    Product = apps.get_model("motivoapp", "Product")
+    products = []
+    for product in Product.objects.exclude(location__isnull=True).exclude(location="").only("id", "location").iterator():
+        point = geo.geocode(product.location)
+        if point:
+            product.latitude, product.longitude = point
+            product.geohash = geo.encode(*point)
+            products.append(product)
+    Product.objects.bulk_update(products, ["latitude", "longitude", "geohash"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('motivoapp', '0004_product_activity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=12),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.RunPython(geocode_existing, migrations.RunPython.noop),
+    ]
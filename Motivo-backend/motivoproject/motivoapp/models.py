@@ -1,10 +1,14 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, F, FloatField, When
+from django.db.models.functions import Cast
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.contrib.auth.models import User
 from django.utils.text import slugify
 import uuid
 from datetime import timedelta
 from django.db.models.signals import post_save
 from django.dispatch import receiver
+from . import geo
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 # Extend User with profile info (optional)
@@ -53,6 +57,9 @@ class Category(models.Model):
         verbose_name_plural = "Categories"
 
 
+CART_SUMMARY_FIELDS = ('name', 'price', 'original_price')
+
+
 class Product(models.Model):
     AGE_CHOICES = [
         ('0-2 years', '0-2 years'),
@@ -74,14 +81,28 @@ class Product(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2)
     original_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     image = models.ImageField(upload_to='product_imgs/', blank=True, null=True)
+    # Maintained incrementally from Review (see apply_review_delta)
     rating = models.FloatField(default=0)
     review_count = models.PositiveIntegerField(default=0)
+    rating_total = models.PositiveIntegerField(default=0)
     age_range = models.CharField(max_length=20, choices=AGE_CHOICES)
     is_new = models.BooleanField(default=False)
     is_sale = models.BooleanField(default=False)
     location = models.CharField(max_length=255, blank=True, null=True)
+    # Geocoded from `location` via the bundled gazetteer (see geo.py)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    geohash = models.CharField(max_length=12, blank=True, default='', db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_location = instance.__dict__.get('location')
+        # what the cart summary shows; a change invalidates carts holding it
+        instance._loaded_cart_fields = tuple(instance.__dict__.get(f) for f in CART_SUMMARY_FIELDS)
+        return instance
+
     def save(self, *args, **kwargs):
         # auto-slugify
         if not self.slug:
@@ -89,7 +110,38 @@ class Product(models.Model):
             while Product.objects.filter(slug=slug).exists():
                 slug = f"{slug}-{uuid.uuid4().hex[:6]}"
             self.slug = slug
+        if self._state.adding or self.location != getattr(self, '_loaded_location', self.location):
+            self.set_coordinates()
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'location' in update_fields:
+                kwargs['update_fields'] = {*update_fields, 'latitude', 'longitude', 'geohash'}
         super().save(*args, **kwargs)
+        self._loaded_location = self.location
+        self._loaded_cart_fields = tuple(getattr(self, f) for f in CART_SUMMARY_FIELDS)
+
+    def set_coordinates(self):
+        point = geo.geocode(self.location)
+        self.latitude, self.longitude = point or (None, None)
+        self.geohash = geo.encode(*point) if point else ''
+
+    @classmethod
+    def apply_review_delta(cls, product_id, rating_delta, count_delta):
+        """
+        Atomically adjust the running rating sum/count and the average in one
+        UPDATE. All right-hand sides see the pre-update row, so concurrent
+        reviews can't lose each other's changes.
+        """
+        new_total = F('rating_total') + rating_delta
+        new_count = F('review_count') + count_delta
+        cls.objects.filter(pk=product_id).update(
+            rating_total=new_total,
+            review_count=new_count,
+            rating=Case(
+                When(review_count__gt=-count_delta, then=Cast(new_total, FloatField()) / Cast(new_count, FloatField())),
+                default=0.0,
+                output_field=FloatField(),
+            ),
+        )
 
     @property
     def discount_percentage(self):
@@ -136,6 +188,16 @@ class Order(models.Model):
     total_price = models.DecimalField(max_digits=12, decimal_places=2)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     created_at = models.DateTimeField(auto_now_add=True)
+
+    archived = False  # see ArchivedOrder
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remembered so signals can tell a status transition from other edits
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+
     @property
     def total_items(self):
         return sum(item.quantity for item in self.order_items.all())
@@ -151,7 +213,7 @@ class OrderItem(models.Model):
     price_at_purchase = models.DecimalField(max_digits=10, decimal_places=2)
 
     def __str__(self):
-        return f"{self.product.name} x {self.quantity} (Order #{self.order.id})"
+        return f"{self.product.name} x {self.quantity} (Order #{self.order_id})"
 
 class OTP(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -175,4 +237,176 @@ class Payment(models.Model):
     payment_method = models.CharField(max_length=50)
     payment_status = models.CharField(max_length=20, default='Pending')
     transaction_id = models.CharField(max_length=100, null=True, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
\ No newline at end of file
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_payment_status = instance.__dict__.get('payment_status')
+        return instance
+
+
+# Product reviews; Product.rating/review_count are kept in sync by signals.py
+class Review(models.Model):
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='reviews')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reviews')
+    rating = models.PositiveSmallIntegerField(validators=[MinValueValidator(1), MaxValueValidator(5)])
+    comment = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('product', 'user')
+        indexes = [
+            # keyset pagination of a product's reviews, newest first
+            models.Index(fields=['product', '-created_at', '-id'], name='review_product_recent_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remembered so an edit can apply just the difference to the product
+        instance._loaded_rating = instance.__dict__.get('rating')
+        return instance
+
+    def save(self, *args, **kwargs):
+        # post_save updates the product aggregate; keep both in one transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.user.username} rated {self.product.name} {self.rating}/5"
+
+
+# Hourly product view / cart-add counts, written in batches by activity.py
+class ProductActivity(models.Model):
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='activity')
+    hour = models.PositiveIntegerField()  # hours since the Unix epoch
+    views = models.PositiveIntegerField(default=0)
+    cart_adds = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('product', 'hour')
+        indexes = [models.Index(fields=['hour'], name='activity_hour_idx')]
+
+    def __str__(self):
+        return f"{self.product_id}@{self.hour}: {self.views} views, {self.cart_adds} cart adds"
+
+
+# "Frequently bought together": the number of orders containing both
+# products. recommendations.py adds each new order's pairs past its Watermark,
+# so every co-occurring pair keeps its full count; readers take the top few
+class CoPurchase(models.Model):
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='co_purchases')
+    companion = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='+')
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('product', 'companion')
+        indexes = [models.Index(fields=['product', '-count'], name='copurchase_top_idx')]
+
+    def __str__(self):
+        return f"{self.product_id} + {self.companion_id}: {self.count} orders"
+
+
+# Progress marker for incremental jobs, e.g. the last order folded into CoPurchase
+class Watermark(models.Model):
+    name = models.CharField(max_length=50, unique=True)
+    position = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name}: {self.position}"
+
+
+# Version counters behind caching.py's per-user cache keys. Kept in the
+# database so a bump is one atomic UPDATE, whichever worker makes it.
+class CacheVersion(models.Model):
+    namespace = models.CharField(max_length=50)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    version = models.BigIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('namespace', 'user')
+
+    def __str__(self):
+        return f"{self.namespace}:{self.user_id} v{self.version}"
+
+
+# ------------------------
+# Order archive
+# ------------------------
+# Delivered/cancelled orders past ORDER_ARCHIVE["AFTER_DAYS"] are moved here
+# by `manage.py archive_orders`, keeping their ids, so the hot Order tables
+# (and their indexes) only hold recent and in-flight orders. Related names
+# mirror the hot models so OrderSerializer renders either.
+class ArchivedOrder(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_orders')
+    total_price = models.DecimalField(max_digits=12, decimal_places=2)
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['user', '-created_at'], name='archived_order_user_idx')]
+
+    archived = True
+
+    def __str__(self):
+        return f"Archived order #{self.id} by {self.user.username}"
+
+
+class ArchivedOrderItem(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    order = models.ForeignKey(ArchivedOrder, on_delete=models.CASCADE, related_name='order_items')
+    product = models.ForeignKey(Product, on_delete=models.PROTECT, related_name='archived_order_items')
+    quantity = models.PositiveIntegerField()
+    price_at_purchase = models.DecimalField(max_digits=10, decimal_places=2)
+
+    def __str__(self):
+        return f"{self.product.name} x {self.quantity} (Order #{self.order_id})"
+
+
+class ArchivedPayment(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    order = models.OneToOneField(ArchivedOrder, on_delete=models.CASCADE, related_name='payment')
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    payment_method = models.CharField(max_length=50)
+    payment_status = models.CharField(max_length=20)
+    transaction_id = models.CharField(max_length=100, null=True, blank=True)
+    created_at = models.DateTimeField()
+
+
+# ------------------------
+# Background jobs
+# ------------------------
+# Rows are the queue: jobs.enqueue() inserts, `manage.py runworker` claims,
+# runs and retries them (see jobs.py).
+class Job(models.Model):
+    QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+    STATUS_CHOICES = [(QUEUED, 'Queued'), (RUNNING, 'Running'), (DONE, 'Done'), (FAILED, 'Failed')]
+
+    queue = models.CharField(max_length=50, default='default')
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    priority = models.SmallIntegerField(default=0)  # higher runs first
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    run_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    last_error = models.TextField(blank=True)
+    locked_by = models.CharField(max_length=64, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # the claim query: queued jobs of a queue that are due, best first
+            models.Index(fields=['status', 'queue', '-priority', 'run_at'], name='job_ready_idx'),
+            models.Index(fields=['locked_by'], name='job_locked_by_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.id} ({self.status})"
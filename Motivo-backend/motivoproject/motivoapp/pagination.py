@@ -0,0 +1,11 @@
+# pagination.py
+from rest_framework.pagination import CursorPagination
+
+
+class ReviewCursorPagination(CursorPagination):
+    # Keyset pagination: each page is "WHERE created_at < last seen", served by
+    # review_product_recent_idx, so deep pages cost the same as the first one.
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
@@ -8,3 +8,11 @@ class IsAdminOrReadOnly(permissions.BasePermission):
             return True
         # Allow write access only for admins
         return request.user and request.user.is_staff
+
+
+class IsOwnerOrReadOnly(permissions.BasePermission):
+    def has_object_permission(self, request, view, obj):
+        # Anyone can read; only the author can change or delete
+        if request.method in permissions.SAFE_METHODS:
+            return True
+        return obj.user_id == request.user.id
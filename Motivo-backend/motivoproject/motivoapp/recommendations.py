@@ -0,0 +1,122 @@
+# recommendations.py
+#
+# "Frequently bought together" from order history.
+#
+# `manage.py build_copurchases` walks orders in id chunks from the last
+# processed order (a Watermark) and counts, per order, every pair of distinct
+# products in it. Each chunk's counts are added to CoPurchase with one batch
+# of upserts in the same transaction that moves the watermark, so a crash
+# never counts an order twice.
+#
+# Every pair's count is kept, not just each product's current top companions:
+# a pair trimmed between runs would restart from one each time and could never
+# climb into the top, so incremental runs would drift from --rebuild. The
+# table holds only pairs that actually co-occur (and MAX_BASKET skips bulk
+# orders), and companions() reads the top-k with an index scan and LIMIT.
+import itertools
+from collections import Counter
+from datetime import timedelta
+from operator import itemgetter
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import ArchivedOrder, ArchivedOrderItem, CoPurchase, Order, OrderItem, Watermark
+
+WATERMARK = "copurchase"
+
+_config = getattr(settings, "RECOMMENDATIONS", {})
+
+
+def basket_pairs(lines, max_basket=None):
+    """
+    Counter {(a, b): orders} with a < b, from (order_id, product_id) rows
+    sorted by order. Baskets bigger than max_basket (bulk buys) are skipped:
+    they add n^2 pairs and little signal.
+    """
+    max_basket = max_basket or _config.get("MAX_BASKET", 50)
+    counts = Counter()
+    for _, rows in itertools.groupby(lines, key=itemgetter(0)):
+        products = sorted({product_id for _, product_id in rows})
+        if 2 <= len(products) <= max_basket:
+            counts.update(itertools.combinations(products, 2))
+    return counts
+
+
+def _order_lines(after_id, upto_id):
+    # Archived orders keep their ids, so a range covers both tables
+    lines = []
+    for model in (ArchivedOrderItem, OrderItem):
+        lines += (
+            model.objects.filter(order_id__gt=after_id, order_id__lte=upto_id)
+            .exclude(order__status='cancelled')
+            .values_list('order_id', 'product_id')
+        )
+    lines.sort()
+    return lines
+
+
+def _add_pairs(pairs):
+    if not pairs:
+        return
+    rows = []
+    for (a, b), count in pairs.items():
+        rows += [(a, b, count), (b, a, count)]
+    table = connection.ops.quote_name(CoPurchase._meta.db_table)
+    sql = (
+        f"INSERT INTO {table} (product_id, companion_id, count) VALUES (%s, %s, %s) "
+        f"ON CONFLICT (product_id, companion_id) DO UPDATE SET count = {table}.count + excluded.count"
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, rows)
+
+
+def _settled_order_id():
+    # Orders and their items are written in separate statements (OrderViewSet.create),
+    # so leave the newest orders for the next run
+    cutoff = timezone.now() - timedelta(seconds=_config.get("SETTLE_SECONDS", 300))
+    ids = [
+        model.objects.filter(created_at__lt=cutoff).aggregate(last=Max('id'))['last'] or 0
+        for model in (Order, ArchivedOrder)
+    ]
+    return max(ids)
+
+
+def update(chunk_orders=None, rebuild=False):
+    """Fold orders placed since the last run into CoPurchase; returns a summary dict."""
+    chunk_orders = chunk_orders or _config.get("CHUNK_ORDERS", 2000)
+    if rebuild:
+        with transaction.atomic():
+            CoPurchase.objects.all().delete()
+            Watermark.objects.filter(name=WATERMARK).delete()
+
+    position = Watermark.objects.filter(name=WATERMARK).values_list('position', flat=True).first() or 0
+    upto = _settled_order_id()
+    start, pairs_added, touched = position, 0, set()
+    while position < upto:
+        end = min(position + chunk_orders, upto)
+        pairs = basket_pairs(_order_lines(position, end))
+        with transaction.atomic():
+            _add_pairs(pairs)
+            Watermark.objects.update_or_create(name=WATERMARK, defaults={'position': end})
+        pairs_added += len(pairs)
+        touched.update(itertools.chain.from_iterable(pairs))
+        position = end
+
+    return {
+        "from_order": start,
+        "to_order": position,
+        "pairs": pairs_added,
+        "products": len(touched),
+    }
+
+
+def companions(product_id, limit=10):
+    """[(companion_id, orders)] most frequently bought with product_id."""
+    return list(
+        CoPurchase.objects.filter(product_id=product_id)
+        .order_by('-count', 'companion_id')
+        .values_list('companion_id', 'count')[:limit]
+    )
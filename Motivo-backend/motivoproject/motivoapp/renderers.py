@@ -0,0 +1,118 @@
+# renderers.py
+#
+# Drop-in replacements for DRF's JSONRenderer/JSONParser backed by orjson.
+# orjson is optional: without it (or when a request needs something only the
+# stdlib path supports, e.g. ?indent= or a non-UTF-8 charset) these fall back
+# to the stock DRF classes, so the output stays valid either way.
+#
+# Enable in settings.py:
+#     REST_FRAMEWORK = {
+#         "DEFAULT_RENDERER_CLASSES": ("motivoapp.renderers.FastJSONRenderer", ...),
+#         "DEFAULT_PARSER_CLASSES": ("motivoapp.renderers.FastJSONParser", ...),
+#     }
+import codecs
+
+from django.conf import settings
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+from rest_framework import renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+_encoder = JSONEncoder()
+
+if orjson is not None:
+    # datetimes/dates/times and UUIDs are handled natively; Decimal, lazy
+    # translation strings, querysets etc. go through DRF's encoder so they
+    # come out exactly as with the stdlib renderer.
+    ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def dumps(data):
+    """Serialize `data` to JSON bytes, using orjson when it's available."""
+    if orjson is not None:
+        return orjson.dumps(data, default=_encoder.default, option=ORJSON_OPTIONS)
+    return renderers.JSONRenderer().render(data)
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context):
+            # Pretty-printing (browsable API, ?indent=) is not the hot path
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+        try:
+            # orjson rejects NaN/Infinity, matching DRF's STRICT_JSON default
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+
+# ------------------------
+# Streaming lists
+# ------------------------
+STREAM_CHUNK_SIZE = 500
+
+
+def iter_json_list(rows, serializer, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Yield a JSON array of `serializer.to_representation(row)` piece by piece:
+    "[" first, then one write per chunk_size rows. Querysets are read with
+    .iterator(chunk_size) (prefetches run per chunk), so memory stays at one
+    chunk however long the list is.
+    """
+    if isinstance(rows, QuerySet):
+        rows = rows.iterator(chunk_size=chunk_size)
+    yield b'['
+    separator = b''
+    batch = []
+    for row in rows:
+        batch.append(dumps(serializer.to_representation(row)))
+        if len(batch) == chunk_size:
+            yield separator + b','.join(batch)
+            separator, batch = b',', []
+    if batch:
+        yield separator + b','.join(batch)
+    yield b']'
+
+
+class StreamingJSONResponse(StreamingHttpResponse):
+    """A JSON list response written while the queryset is still being read."""
+
+    def __init__(self, rows, serializer, chunk_size=STREAM_CHUNK_SIZE, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(iter_json_list(rows, serializer, chunk_size), **kwargs)
+
+
+def stream_list(request, rows, serializer_class, context=None):
+    """
+    StreamingJSONResponse for JSON clients; the browsable API (and any other
+    negotiated renderer) gets a normal Response.
+    """
+    context = {'request': request, **(context or {})}
+    renderer = getattr(request, 'accepted_renderer', None)
+    if renderer is not None and renderer.format != 'json':
+        return Response(serializer_class(rows, many=True, context=context).data)
+    return StreamingJSONResponse(rows, serializer_class(context=context))
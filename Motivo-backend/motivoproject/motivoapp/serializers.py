@@ -1,10 +1,12 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from .models import (
-    UserProfile, Category, Product, CartItem, WishlistItem, Order, OrderItem
+    UserProfile, Category, Product, CartItem, WishlistItem, Order, OrderItem, Review
 )
 from django.contrib.auth.password_validation import validate_password
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
 from .models import Payment
+from .blacklist import FilteredRefreshToken
 # User Serializer (basic info)
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -78,6 +80,8 @@ class ProductSerializer(serializers.ModelSerializer):
             'is_new',
             'is_sale',
             'location',
+            'latitude',
+            'longitude',
             'created_at',
         ]
         read_only_fields = [
@@ -85,7 +89,9 @@ class ProductSerializer(serializers.ModelSerializer):
             'discount_percentage',
             'created_at',
             'rating',
-            'review_count'
+            'review_count',
+            'latitude',
+            'longitude'
         ]
 
     def get_image(self, obj):
@@ -97,6 +103,21 @@ class ProductSerializer(serializers.ModelSerializer):
         return None
 
 
+# Review Serializer
+class ReviewSerializer(serializers.ModelSerializer):
+    user = serializers.HiddenField(default=serializers.CurrentUserDefault())
+    user_name = serializers.CharField(source='user.first_name', read_only=True)
+
+    class Meta:
+        model = Review
+        fields = ['id', 'product', 'user', 'user_name', 'rating', 'comment', 'created_at', 'updated_at']
+        read_only_fields = ['created_at', 'updated_at']
+
+    def update(self, instance, validated_data):
+        validated_data.pop('product', None)  # a review can't move to another product
+        return super().update(instance, validated_data)
+
+
 # CartItem Serializer
 class CartItemSerializer(serializers.ModelSerializer):
     product = ProductSerializer(read_only=True)
@@ -157,7 +178,8 @@ class OrderSerializer(serializers.ModelSerializer):
         model = Order
         fields = [
             'id', 'total_price', 'status', 'created_at',
-            'order_items', 'payment','customer'  # ✅ include payment
+            'order_items', 'payment','customer',  # ✅ include payment
+            'archived',
         ]
 
     def get_total_price(self, obj):
@@ -197,3 +219,7 @@ class SignupSerializer(serializers.ModelSerializer):
 
         return user
 
+
+# Used by /api/token/refresh/ (SIMPLE_JWT["TOKEN_REFRESH_SERIALIZER"])
+class FilteredTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = FilteredRefreshToken
@@ -1,9 +1,109 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
+from django.db import transaction
 from django.contrib.auth.models import User
-from .models import UserProfile
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from .models import (
+    CART_SUMMARY_FIELDS, UserProfile, Category, Product, Review, CartItem, Order, Payment,
+)
+from .authentication import user_cache
+from .blacklist import BlacklistFilter
+from .caching import CART, bump_version, bump_versions
+from .autocomplete import CATEGORY, PRODUCT, autocomplete_index, category_entry, product_entry
+from .events import event_hub
 
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
     if created:
         UserProfile.objects.create(user=instance)
+
+
+# Drop cached users used by CachedJWTAuthentication when they change
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    user_cache.invalidate(instance.pk)
+
+
+# Keep Product.rating/review_count in step with reviews (running sum/count)
+@receiver(post_save, sender=Review)
+def add_review_to_product(sender, instance, created, **kwargs):
+    if created:
+        Product.apply_review_delta(instance.product_id, instance.rating, 1)
+    else:
+        previous = getattr(instance, '_loaded_rating', None)
+        if previous is not None and previous != instance.rating:
+            Product.apply_review_delta(instance.product_id, instance.rating - previous, 0)
+    instance._loaded_rating = instance.rating
+
+
+@receiver(post_delete, sender=Review)
+def remove_review_from_product(sender, instance, **kwargs):
+    Product.apply_review_delta(instance.product_id, -instance.rating, -1)
+
+
+# Let other workers' blacklist filters know there are rows to pull
+@receiver(post_save, sender=BlacklistedToken)
+def mark_blacklist_changed(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(BlacklistFilter.mark_changed)
+
+
+# The cart summary's ETag is the user's cart version (CartItemViewSet.summary):
+# bump it when a line changes, or when a product's name/price does. Bumped
+# after commit, so a reader can't pair the new version with uncommitted data.
+@receiver(post_save, sender=CartItem)
+@receiver(post_delete, sender=CartItem)
+def bump_cart_version(sender, instance, **kwargs):
+    transaction.on_commit(lambda: bump_version(CART, instance.user_id))
+
+
+@receiver(post_save, sender=Product)
+def bump_carts_holding_product(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_loaded_cart_fields', None)
+    if created or previous is None or previous == tuple(getattr(instance, f) for f in CART_SUMMARY_FIELDS):
+        return
+    user_ids = list(CartItem.objects.filter(product=instance).values_list('user_id', flat=True))
+    transaction.on_commit(lambda: bump_versions(CART, user_ids))
+
+
+# Keep this worker's autocomplete index in step with product/category edits
+@receiver(post_save, sender=Product)
+def index_product(sender, instance, **kwargs):
+    autocomplete_index.upsert(*product_entry(instance))
+
+
+@receiver(post_delete, sender=Product)
+def unindex_product(sender, instance, **kwargs):
+    autocomplete_index.remove(PRODUCT, instance.pk)
+
+
+@receiver(post_save, sender=Category)
+def index_category(sender, instance, **kwargs):
+    autocomplete_index.upsert(*category_entry(instance))
+
+
+@receiver(post_delete, sender=Category)
+def unindex_category(sender, instance, **kwargs):
+    autocomplete_index.remove(CATEGORY, instance.pk)
+
+
+# Push order/payment status transitions to the user's live event stream
+# (async_views.order_events), once the change is committed.
+@receiver(post_save, sender=Order)
+def publish_order_status(sender, instance, created, **kwargs):
+    previous = None if created else getattr(instance, '_loaded_status', None)
+    if created or (previous is not None and previous != instance.status):
+        data = {"order_id": instance.pk, "status": instance.status, "previous": previous}
+        transaction.on_commit(lambda: event_hub.publish(instance.user_id, "order_status", data))
+    instance._loaded_status = instance.status
+
+
+@receiver(post_save, sender=Payment)
+def publish_payment_status(sender, instance, created, **kwargs):
+    previous = None if created else getattr(instance, '_loaded_payment_status', None)
+    if created or (previous is not None and previous != instance.payment_status):
+        user_id = instance.order.user_id
+        data = {"order_id": instance.order_id, "payment_status": instance.payment_status, "previous": previous}
+        transaction.on_commit(lambda: event_hub.publish(user_id, "payment_status", data))
+    instance._loaded_payment_status = instance.payment_status
@@ -0,0 +1,43 @@
+# storage.py
+import hashlib
+import os
+import posixpath
+import re
+
+from django.core.files.storage import FileSystemStorage
+
+HASHED_NAME_RE = re.compile(r'(?:^|/)[0-9a-f]{2}/([0-9a-f]{64})(?:\.[A-Za-z0-9]+)?$')
+
+
+def content_hash(name):
+    """Return the sha256 a ContentAddressedStorage name was stored under, or None."""
+    match = HASHED_NAME_RE.search(name)
+    return match.group(1) if match else None
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Stores uploads under the sha256 of their content:
+        product_imgs/foo.jpg -> product_imgs/3a/3a7bd3e2...e1.jpg
+
+    Identical uploads share one file, and since a name can never point at
+    different bytes it can be served with an immutable Cache-Control header
+    (see views.serve_media).
+    """
+
+    def _save(self, name, content):
+        digest = hashlib.sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        for chunk in content.chunks():
+            digest.update(chunk)
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        digest = digest.hexdigest()
+
+        dirname, filename = posixpath.split(name)
+        ext = os.path.splitext(filename)[1].lower()
+        hashed_name = posixpath.join(dirname, digest[:2], digest + ext)
+        if self.exists(hashed_name):
+            return hashed_name  # already stored: deduplicated
+        return super()._save(hashed_name, content)
@@ -0,0 +1,21 @@
+# tasks.py
+#
+# Job handlers run by `manage.py runworker` (see jobs.py). Imported from
+# MotivoappConfig.ready() so every process knows the registered names.
+from django.conf import settings
+from django.core.mail import send_mail
+
+from .jobs import job
+from .models import OTP
+
+
+@job(queue="email")
+def send_otp_email(otp_id):
+    # The payload carries only the OTP id, so the code never sits in the Job
+    # table; a code that was used or expired before the job ran isn't sent.
+    # Raises on SMTP errors so the queue retries with backoff.
+    otp = OTP.objects.select_related('user').filter(id=otp_id).first()
+    if otp is None or otp.verified or not otp.is_valid():
+        return
+    send_mail('Your OTP Code', f'Your OTP is {otp.code}', settings.EMAIL_HOST_USER, [otp.user.email],
+              fail_silently=False)
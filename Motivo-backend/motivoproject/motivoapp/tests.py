@@ -1,3 +1,668 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import io
+import json
+import os
+import random
+import shutil
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock, skipIf
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import AsyncClient, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from . import geo, guest_cart, jobs
+from .admin_utils import EstimatedCountPaginator
+from .authentication import user_cache
+from .autocomplete import PRODUCT, PrefixIndex, product_entry
+from .blacklist import FilteredRefreshToken, blacklist_filter
+from .caching import CART, get_version
+from .events import EventHub, event_hub
+from .metrics import MetricsRegistry
+from .middleware import CompressionMiddleware, ConcurrencyLimitMiddleware, MetricsMiddleware, brotli
+from .models import (
+    OTP, ArchivedOrder, ArchivedOrderItem, ArchivedPayment, CartItem, Category, Job, Order, OrderItem,
+    Payment, Product,
+)
+
+
+class CartSummaryTests(TestCase):
+    url = "/api/cart/summary/"
+
+    def setUp(self):
+        self.user = User.objects.create(username="buyer@example.com", email="buyer@example.com")
+        category = Category.objects.create(name="Cart Test", slug="cart-test")
+        self.product = Product.objects.create(
+            category=category, name="Toy Train", price=Decimal("10.00"),
+            original_price=Decimal("12.00"), age_range="3-5 years",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.item = CartItem.objects.create(user=self.user, product=self.product, quantity=2)
+
+    def summary(self, etag=None):
+        headers = {"HTTP_IF_NONE_MATCH": etag} if etag else {}
+        return self.client.get(self.url, **headers)
+
+    def test_totals(self):
+        response = self.summary()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["item_count"], 2)
+        self.assertEqual(response.data["subtotal"], "20.00")
+        self.assertEqual(response.data["savings"], "4.00")
+        self.assertEqual(response.data["version"], get_version(CART, self.user.pk))
+
+    def test_unchanged_cart_is_not_modified(self):
+        etag = self.summary()["ETag"]
+        response = self.summary(etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        # CompressionMiddleware may have weakened the tag the client holds
+        self.assertEqual(self.summary(f"W/{etag}").status_code, 304)
+
+    def test_line_change_bumps_version(self):
+        etag = self.summary()["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.item.quantity = 3
+            self.item.save()
+        response = self.summary(etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.data["item_count"], 3)
+
+    def test_line_removal_bumps_version(self):
+        etag = self.summary()["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.item.delete()
+        response = self.summary(etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["item_count"], 0)
+
+    def test_product_price_change_bumps_version(self):
+        etag = self.summary()["ETag"]
+        product = Product.objects.get(pk=self.product.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            product.price = Decimal("8.00")
+            product.save()
+        response = self.summary(etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["subtotal"], "16.00")
+
+    def test_unrelated_product_change_keeps_version(self):
+        etag = self.summary()["ETag"]
+        product = Product.objects.get(pk=self.product.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            product.description = "Wooden"
+            product.save()
+        self.assertEqual(self.summary(etag).status_code, 304)
+
+    def test_every_bump_moves_version(self):
+        before = get_version(CART, self.user.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            CartItem.objects.filter(pk=self.item.pk).get().save()
+            CartItem.objects.filter(pk=self.item.pk).get().save()
+        self.assertEqual(get_version(CART, self.user.pk), before + 2)
+
+
+@override_settings(ALLOWED_HOSTS=["*"])
+class ProductListParityTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="Parity", slug="parity")
+        other = Category.objects.create(name="Parity Other", slug="parity-other")
+        for i, (price, rating) in enumerate([(5, 4.5), (15, 3.0), (25, 4.8), (35, 1.0)]):
+            Product.objects.create(
+                category=category if i % 3 else other, name=f"Parity Block {i}", price=Decimal(price),
+                rating=rating, review_count=i, age_range="3-5 years",
+            )
+
+    def ids(self, response):
+        self.assertEqual(response.status_code, 200)
+        return [row["id"] for row in json.loads(response.content)]
+
+    def test_both_stacks_filter_and_order_alike(self):
+        for query in (
+            "search=parity&ordering=-price",
+            "search=parity&min_rating=3&ordering=price",
+            "search=parity&min_price=10&max_price=30&ordering=-rating",
+            "category=parity&ordering=review_count,-price",
+            "search=block&min_price=nan&max_price=inf&ordering=bogus,-created_at",
+        ):
+            with self.subTest(query=query):
+                expected = self.ids(APIClient().get(f"/api/products/?{query}"))
+                self.assertTrue(expected)
+                actual = self.ids(async_to_sync(AsyncClient().get)(f"/api/async/products/?{query}"))
+                self.assertEqual(actual, expected)
+
+
+class JWTUserCacheTests(TestCase):
+    url = "/api/cart/summary/"
+
+    def setUp(self):
+        user_cache.clear()
+        self.addCleanup(user_cache.clear)
+        self.user = User.objects.create(username="jwt@example.com", email="jwt@example.com")
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.user).access_token}")
+
+    def user_lookups(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+        return [q for q in queries if 'FROM "auth_user"' in q["sql"]]
+
+    def test_repeat_request_skips_user_lookup(self):
+        self.assertEqual(len(self.user_lookups()), 1)
+        self.assertEqual(self.user_lookups(), [])
+
+    def test_saved_user_is_reloaded(self):
+        self.user_lookups()
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+
+class RefreshBlacklistTests(TestCase):
+    url = "/api/token/refresh/"
+
+    def setUp(self):
+        blacklist_filter.reset()
+        self.addCleanup(blacklist_filter.reset)
+        self.user = User.objects.create(username="refresh@example.com", email="refresh@example.com")
+        self.refresh = str(RefreshToken.for_user(self.user))
+
+    def test_rotated_token_is_rejected(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.post(self.url, {"refresh": self.refresh}).status_code, 200)
+        self.assertEqual(self.client.post(self.url, {"refresh": self.refresh}).status_code, 401)
+
+    def test_token_blacklisted_by_another_worker_is_rejected(self):
+        FilteredRefreshToken(self.refresh).check_blacklist()  # builds the filter
+        with self.captureOnCommitCallbacks(execute=True):
+            BlacklistedToken.objects.create(token=OutstandingToken.objects.get(user=self.user))
+        with self.assertRaises(TokenError):
+            FilteredRefreshToken(self.refresh).check_blacklist()
+
+    def test_filter_miss_skips_the_database(self):
+        FilteredRefreshToken(self.refresh).check_blacklist()
+        with CaptureQueriesContext(connection) as queries:
+            FilteredRefreshToken(self.refresh).check_blacklist()
+        self.assertEqual(len(queries), 0)
+
+
+class AutocompleteTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name="Typeahead", slug="typeahead")
+        self.train, self.robot, self.train_set = (
+            Product.objects.create(category=category, name=name, price=1, age_range="3-5 years", review_count=count)
+            for name, count in (("Wooden Toy Train", 5), ("Toy Robot", 9), ("Train Set", 1))
+        )
+        self.index = PrefixIndex()
+        self.index.build()
+
+    def names(self, query):
+        return [p["name"] for p in self.index.search(query)["products"]]
+
+    def test_word_prefixes_ranked_by_popularity(self):
+        self.assertEqual(self.names("toy"), ["Toy Robot", "Wooden Toy Train"])
+        self.assertEqual(self.names("Tra"), ["Wooden Toy Train", "Train Set"])
+        self.assertEqual(self.names("toy tr"), ["Wooden Toy Train"])
+        self.assertEqual(self.names("zebra"), [])
+
+    def test_repeated_upsert_does_not_duplicate(self):
+        self.names("wooden")  # memoise, so the upsert has to forget it
+        self.train.name = "Wooden Ark"
+        for _ in range(2):
+            self.index.upsert(*product_entry(self.train))
+        self.assertEqual(self.names("wooden"), ["Wooden Ark"])
+        self.assertEqual(self.names("train"), ["Train Set"])
+        self.assertEqual(sum(1 for _, kind, pk in self.index.keys if (kind, pk) == (PRODUCT, self.train.pk)), 2)
+
+    def test_remove(self):
+        self.index.remove(PRODUCT, self.robot.pk)
+        self.assertEqual(self.names("toy"), ["Wooden Toy Train"])
+
+
+class NearbyTests(TestCase):
+    origin = (17.4483, 78.3915)  # Madhapur, Hyderabad
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="Nearby", slug="nearby")
+        rng = random.Random(39)
+        points = [(cls.origin[0] + rng.uniform(-0.5, 0.5), cls.origin[1] + rng.uniform(-0.5, 0.5)) for _ in range(200)]
+        Product.objects.bulk_create([
+            Product(category=category, name=f"N{i}", slug=f"nearby-{i}", price=1, age_range="3-5 years",
+                    latitude=lat, longitude=lng, geohash=geo.encode(lat, lng))
+            for i, (lat, lng) in enumerate(points)
+        ])
+        cls.expected = sorted(
+            (geo.haversine_km(*cls.origin, p.latitude, p.longitude), p.id)
+            for p in Product.objects.filter(category=category)
+        )
+        cls.queryset = Product.objects.filter(category=category)
+
+    def test_radius_matches_brute_force(self):
+        for radius in (5, 15, 40):
+            with self.subTest(radius=radius):
+                hits = geo.nearby(self.queryset, *self.origin, radius_km=radius)
+                self.assertTrue(hits)
+                self.assertEqual([pk for _, pk in hits], [pk for d, pk in self.expected if d <= radius])
+
+    def test_nearest_matches_brute_force(self):
+        hits = geo.nearby(self.queryset, *self.origin, limit=15)
+        self.assertEqual([pk for _, pk in hits], [pk for _, pk in self.expected[:15]])
+        for (distance, _), (expected, _) in zip(hits, self.expected):
+            self.assertAlmostEqual(distance, expected, places=6)
+
+    def test_api_reports_distance(self):
+        params = {"lat": self.origin[0], "lng": self.origin[1], "nearest": 3, "category": "nearby"}
+        response = self.client.get("/api/products/", params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([p["id"] for p in response.json()], [pk for _, pk in self.expected[:3]])
+        self.assertEqual(response.json()[0]["distance_km"], round(self.expected[0][0], 2))
+
+
+@override_settings(ALLOWED_HOSTS=["*"])
+class OrderEventsTests(TestCase):
+    path = "/api/async/orders/events/"
+
+    def setUp(self):
+        self.user = User.objects.create(username="events@example.com", email="events@example.com")
+        self.auth = {"Authorization": f"Bearer {RefreshToken.for_user(self.user).access_token}"}
+
+    def ticket(self):
+        response = async_to_sync(AsyncClient().post)(f"{self.path}ticket/", headers=self.auth)
+        self.assertEqual(response.status_code, 200)
+        return response.json()["ticket"]
+
+    def test_wsgi_server_is_refused(self):
+        self.assertEqual(self.client.get(self.path, headers=self.auth).status_code, 501)
+
+    def test_ticket_is_single_use(self):
+        ticket = self.ticket()
+        get = async_to_sync(AsyncClient().get)
+        first = get(self.path, {"ticket": ticket})
+        self.assertEqual(first.status_code, 200)
+        first.close()
+        self.assertEqual(get(self.path, {"ticket": ticket}).status_code, 401)
+        self.assertEqual(get(self.path, {"ticket": "forged"}).status_code, 401)
+
+    def test_stream_sends_snapshot_then_published_events(self):
+        async def scenario():
+            response = await AsyncClient().get(self.path, headers=self.auth)
+            chunks = aiter(response.streaming_content)
+            received = [await anext(chunks), await anext(chunks)]
+            event_hub.publish(self.user.id, "order_status", {"order_id": 1, "status": "shipped"})
+            received.append(await anext(chunks))
+            await chunks.aclose()
+            return response, b"".join(received).decode()
+
+        response, body = async_to_sync(scenario)()
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertIn('event: snapshot\ndata: {"orders":[]}', body)
+        self.assertIn('event: order_status\ndata: {"order_id":1,"status":"shipped"}', body)
+        self.assertEqual(event_hub.subscriber_count(), 0)
+
+    def test_hub_delivers_across_threads(self):
+        hub = EventHub()
+
+        async def scenario():
+            queue = hub.subscribe(7)
+            await asyncio.to_thread(hub.publish, 7, "payment_status", {"payment_status": "paid"})
+            self.assertEqual(hub.publish(8, "payment_status", {}), 0)
+            return await asyncio.wait_for(queue.get(), 1)
+
+        message = async_to_sync(scenario)()
+        self.assertEqual((message["event"], message["data"]), ("payment_status", {"payment_status": "paid"}))
+
+
+class ArchiveOrdersTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="history@example.com", email="history@example.com")
+        category = Category.objects.create(name="Archive", slug="archive")
+        self.product = Product.objects.create(category=category, name="Kite", price=Decimal("4.00"), age_range="3-5 years")
+        self.old = self.order("delivered", days_ago=400)
+        self.old_open = self.order("shipped", days_ago=300)
+        self.recent = self.order("delivered", days_ago=1)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def order(self, status, days_ago):
+        order = Order.objects.create(user=self.user, total_price=Decimal("8.00"), status=status)
+        OrderItem.objects.create(order=order, product=self.product, quantity=2, price_at_purchase=Decimal("4.00"))
+        Payment.objects.create(order=order, amount=Decimal("8.00"), payment_method="upi", payment_status="Paid")
+        Order.objects.filter(pk=order.pk).update(created_at=timezone.now() - timedelta(days=days_ago))
+        return order
+
+    def listed_ids(self, **params):
+        response = self.client.get("/api/orders/", params)
+        return [row["id"] for row in json.loads(b"".join(response.streaming_content))]
+
+    def test_moves_old_finished_orders_with_items_and_payment(self):
+        call_command("archive_orders", "--days", "180", "--chunk-size", "1", stdout=io.StringIO())
+        self.assertEqual(set(Order.objects.values_list("id", flat=True)), {self.old_open.id, self.recent.id})
+        self.assertEqual(list(ArchivedOrder.objects.values_list("id", flat=True)), [self.old.id])
+        self.assertEqual(ArchivedOrderItem.objects.get().order_id, self.old.id)
+        self.assertEqual(ArchivedPayment.objects.get().payment_status, "Paid")
+        self.assertFalse(OrderItem.objects.filter(order_id=self.old.id).exists())
+        self.assertFalse(Payment.objects.filter(order_id=self.old.id).exists())
+
+    def test_archived_order_is_still_readable(self):
+        call_command("archive_orders", stdout=io.StringIO())
+        response = self.client.get(f"/api/orders/{self.old.id}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data["archived"])
+        self.assertEqual(response.data["total_price"], Decimal("8.00"))
+        self.assertEqual(response.data["payment"]["payment_status"], "Paid")
+
+        self.assertEqual(self.listed_ids(), [self.recent.id, self.old_open.id])
+        self.assertEqual(self.listed_ids(include_archived=1), [self.recent.id, self.old_open.id, self.old.id])
+
+    def test_dry_run_moves_nothing(self):
+        out = io.StringIO()
+        call_command("archive_orders", "--dry-run", stdout=out)
+        self.assertIn("1 order(s)", out.getvalue())
+        self.assertFalse(ArchivedOrder.objects.exists())
+
+
+class GuestCartTests(TestCase):
+    url = "/api/guest-cart/"
+
+    def setUp(self):
+        category = Category.objects.create(name="Guest", slug="guest")
+        self.ball, self.doll = (
+            Product.objects.create(category=category, name=name, price=Decimal("3.00"), age_range="3-5 years")
+            for name in ("Ball", "Doll")
+        )
+        self.user = User.objects.create(username="guest@example.com", email="guest@example.com")
+
+    def quantities(self):
+        return dict(CartItem.objects.filter(user=self.user).values_list("product_id", "quantity"))
+
+    def test_repeated_merge_adds_quantities_without_duplicating(self):
+        CartItem.objects.create(user=self.user, product=self.ball, quantity=1)
+        cart = {self.ball.id: 2, self.doll.id: 1, 999_999: 4}  # the last product no longer exists
+        before = get_version(CART, self.user.pk)
+        for _ in range(2):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(guest_cart.merge(self.user, cart), 2)
+        self.assertEqual(self.quantities(), {self.ball.id: 5, self.doll.id: 2})
+        self.assertEqual(CartItem.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(get_version(CART, self.user.pk), before + 2)
+
+    def test_cookie_round_trip(self):
+        self.client.post(self.url, {"product_id": self.ball.id, "quantity": 1})
+        response = self.client.post(self.url, {"product_id": self.ball.id, "quantity": 2})
+        self.assertEqual([(row["product"]["id"], row["quantity"]) for row in response.json()], [(self.ball.id, 3)])
+        self.assertEqual(self.client.delete(f"{self.url}?product_id={self.ball.id}").json(), [])
+
+    def test_tampered_cookie_is_ignored(self):
+        self.client.cookies[guest_cart.COOKIE_NAME] = f"{self.ball.id}:5:forged"
+        self.assertEqual(self.client.get(self.url).json(), [])
+
+
+@mock.patch.dict("django.conf.settings.RATE_LIMITS", clear=True)
+class OTPEmailTests(TestCase):
+    def signup(self):
+        return APIClient().post("/api/auth/signup/", {"email": "new@example.com", "first_name": "New", "last_name": "User"})
+
+    def test_sent_inline_by_default(self):
+        self.assertEqual(self.signup().status_code, 200)
+        otp = OTP.objects.get(user__email="new@example.com")
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn(otp.code, mail.outbox[0].body)
+        self.assertFalse(Job.objects.exists())
+
+    @mock.patch.dict(jobs._config, {"EAGER": False})
+    def test_queued_job_holds_no_code(self):
+        self.signup()
+        otp = OTP.objects.get(user__email="new@example.com")
+        job_row = Job.objects.get()
+        self.assertEqual(job_row.payload, {"otp_id": otp.id})
+        self.assertEqual(mail.outbox, [])
+
+        for claimed in jobs.claim(["email"], 10, "test"):
+            self.assertEqual(jobs.run(claimed), Job.DONE)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn(otp.code, mail.outbox[0].body)
+
+    @mock.patch.dict(jobs._config, {"EAGER": False})
+    def test_expired_code_is_not_sent(self):
+        self.signup()
+        OTP.objects.update(expires_at=OTP.objects.get().created_at)
+        for claimed in jobs.claim(["email"], 10, "test"):
+            jobs.run(claimed)
+        self.assertEqual(mail.outbox, [])
+
+
+class MetricsSnapshotTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def write_snapshot(self, pid, value):
+        registry = MetricsRegistry(directory=self.directory)
+        registry.inc("http_responses_total", {"status": "200"}, value)
+        with open(os.path.join(self.directory, f"metrics-{pid}.json"), "w") as fh:
+            json.dump(registry.snapshot(), fh)
+
+    def test_exited_worker_keeps_counting(self):
+        self.write_snapshot(999_999_999, 5)  # no such process
+        registry = MetricsRegistry(directory=self.directory)
+        registry.inc("http_responses_total", {"status": "200"}, 2)
+        key = (("status", "200"),)
+
+        self.assertEqual(registry.collect()[0]["http_responses_total"][key], 7)
+        self.assertNotIn("metrics-999999999.json", os.listdir(self.directory))
+        self.write_snapshot(999_999_998, 1)
+        self.assertEqual(registry.collect()[0]["http_responses_total"][key], 8)
+
+
+class StreamedMetricsTests(TestCase):
+    key = (("route", "unmatched"), ("status", "200"))
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.registry = MetricsRegistry(directory=directory)
+        patcher = mock.patch("motivoapp.middleware.registry", self.registry)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def responses(self):
+        return self.registry.collect()[0].get("http_responses_total", {}).get(self.key, 0)
+
+    def test_counted_once_the_stream_is_consumed(self):
+        middleware = MetricsMiddleware(lambda request: StreamingHttpResponse(iter([b"a", b"b"])))
+        response = middleware(RequestFactory().get("/stream/"))
+        self.assertEqual(self.responses(), 0)
+        self.assertEqual(b"".join(response.streaming_content), b"ab")
+        self.assertEqual(self.responses(), 1)
+
+    def test_async_stream(self):
+        async def chunks():
+            yield b"a"
+
+        middleware = MetricsMiddleware(lambda request: StreamingHttpResponse(chunks()))
+        response = middleware(RequestFactory().get("/stream/"))
+        self.assertEqual(self.responses(), 0)
+
+        async def consume():
+            return [chunk async for chunk in response.streaming_content]
+
+        self.assertEqual(async_to_sync(consume)(), [b"a"])
+        self.assertEqual(self.responses(), 1)
+
+    def test_buffered_response_is_counted_at_once(self):
+        MetricsMiddleware(lambda request: HttpResponse(b"ok"))(RequestFactory().get("/"))
+        self.assertEqual(self.responses(), 1)
+
+
+class CompressionTests(TestCase):
+    body = json.dumps([{"id": i, "name": f"Product {i}"} for i in range(200)]).encode()
+
+    def respond(self, accept_encoding, path="/api/products/", body=None):
+        def view(request):
+            response = HttpResponse(self.body if body is None else body, content_type="application/json")
+            response["ETag"] = '"v1"'
+            return response
+
+        request = RequestFactory().get(path, HTTP_ACCEPT_ENCODING=accept_encoding)
+        return CompressionMiddleware(view)(request)
+
+    def test_gzip(self):
+        response = self.respond("gzip, deflate")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), self.body)
+        self.assertEqual(response["Content-Length"], str(len(response.content)))
+        self.assertEqual(response["ETag"], 'W/"v1"')
+        self.assertIn("Accept-Encoding", response["Vary"])
+
+    @skipIf(brotli is None, "brotli is not installed")
+    def test_brotli_preferred(self):
+        response = self.respond("gzip, br")
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(brotli.decompress(response.content), self.body)
+
+    @mock.patch("motivoapp.middleware.brotli", None)
+    def test_brotli_only_client_without_brotli(self):
+        response = self.respond("br")
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response.content, self.body)
+
+    def test_left_alone(self):
+        for accept_encoding, path, body in (
+            ("gzip;q=0", "/api/products/", None),
+            ("gzip", "/api/auth/login/", None),
+            ("gzip", "/api/products/", b"[]"),
+        ):
+            with self.subTest(accept_encoding=accept_encoding, path=path):
+                response = self.respond(accept_encoding, path, body)
+                self.assertFalse(response.has_header("Content-Encoding"))
+                self.assertEqual(response["ETag"], '"v1"')
+
+    def test_stream_is_compressed_chunk_by_chunk(self):
+        def view(request):
+            return StreamingHttpResponse(iter([self.body[:500], self.body[500:]]), content_type="application/json")
+
+        response = CompressionMiddleware(view)(RequestFactory().get("/api/orders/", HTTP_ACCEPT_ENCODING="gzip"))
+        chunks = list(response.streaming_content)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertGreater(len(chunks), 2)
+        self.assertEqual(gzip.decompress(b"".join(chunks)), self.body)
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name="Paging", slug="paging")
+        Product.objects.bulk_create([
+            Product(category=category, name=f"P{i}", slug=f"paging-{i}", price=1, age_range="3-5 years")
+            for i in range(5)
+        ])
+
+    @mock.patch.object(EstimatedCountPaginator, "EXACT_COUNT_LIMIT", 3)
+    def test_large_table_without_statistics_stops_at_the_limit(self):
+        paginator = EstimatedCountPaginator(Product.objects.all(), 2)
+        with mock.patch("motivoapp.admin_utils.estimated_row_count", return_value=None), \
+                CaptureQueriesContext(connection) as queries:
+            self.assertEqual(paginator.count, 3)
+        self.assertEqual(len(queries), 1)  # no unbounded COUNT(*) after the bounded one
+
+    @mock.patch.object(EstimatedCountPaginator, "EXACT_COUNT_LIMIT", 3)
+    def test_uses_sqlite_statistics_when_analysed(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("sqlite_stat1 is SQLite only")
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        self.assertEqual(EstimatedCountPaginator(Product.objects.all(), 2).count, Product.objects.count())
+
+    def test_small_table_is_counted_exactly(self):
+        self.assertEqual(EstimatedCountPaginator(Product.objects.all(), 2).count, Product.objects.count())
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    RATE_LIMITS={"otp_verify_email": {"RATE": "10/hour", "BURST": 2}},
+)
+class ThrottleTests(TestCase):
+    def verify(self, email):
+        return APIClient().post("/api/auth/verify-otp/", {"email": email, "otp": "000000"})
+
+    def test_rejected_after_the_burst(self):
+        self.assertNotEqual(self.verify("kid@example.com").status_code, 429)
+        self.assertNotEqual(self.verify("Kid@example.com ").status_code, 429)  # same bucket
+        response = self.verify("kid@example.com")
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response["Retry-After"]), 0)
+        self.assertNotEqual(self.verify("other@example.com").status_code, 429)
+
+
+@override_settings(CONCURRENCY_LIMITS={"/api/async/orders/events/": 1})
+class ConcurrencyLimitTests(TestCase):
+    path = "/api/async/orders/events/"
+
+    def test_stream_holds_its_slot_until_closed(self):
+        middleware = ConcurrencyLimitMiddleware(lambda request: StreamingHttpResponse(iter([b"data"])))
+        first = middleware(RequestFactory().get(self.path))
+        self.assertEqual(middleware(RequestFactory().get(self.path)).status_code, 503)
+        first.close()
+        self.assertEqual(middleware(RequestFactory().get(self.path)).status_code, 200)
+
+    def test_async_stack_sheds_past_the_limit(self):
+        async def view(request):
+            return StreamingHttpResponse(iter([b"data"]))
+
+        async def scenario():
+            middleware = ConcurrencyLimitMiddleware(view)
+            first = await middleware(RequestFactory().get(self.path))
+            shed = await middleware(RequestFactory().get(self.path))
+            first.close()
+            return shed, await middleware(RequestFactory().get(self.path))
+
+        shed, after = async_to_sync(scenario)()
+        self.assertEqual(shed.status_code, 503)
+        self.assertEqual(shed["Retry-After"], "1")
+        self.assertEqual(after.status_code, 200)
+
+    def test_other_paths_are_not_limited(self):
+        middleware = ConcurrencyLimitMiddleware(lambda request: StreamingHttpResponse(iter([b"data"])))
+        responses = [middleware(RequestFactory().get("/api/products/")) for _ in range(3)]
+        self.assertEqual([r.status_code for r in responses], [200, 200, 200])
+
+
+class RunWorkerTests(TransactionTestCase):  # jobs run on worker threads, with their own connections
+    @mock.patch.dict(jobs._config, {"EAGER": False})
+    def test_survives_a_locked_database(self):
+        user = User.objects.create(username="otp@example.com", email="otp@example.com")
+        otp = OTP.objects.create(user=user, code="123456")
+        jobs.enqueue("send_otp_email", {"otp_id": otp.id})
+        real_claim = jobs.claim
+        calls = []
+
+        def flaky_claim(*args):
+            calls.append(args)
+            if len(calls) == 1:
+                raise OperationalError("database is locked")
+            return real_claim(*args)
+
+        with mock.patch.object(jobs, "claim", flaky_claim), mock.patch("time.sleep"):
+            # One slot, so the loop doesn't poll while the job thread writes: the
+            # in-memory test database refuses concurrent writers instead of waiting
+            call_command("runworker", "--burst", "--concurrency", "1", "--poll-interval", "0", stdout=io.StringIO())
+        self.assertGreater(len(calls), 1)
+        self.assertEqual(Job.objects.get().status, Job.DONE)
+        self.assertEqual(len(mail.outbox), 1)
@@ -0,0 +1,99 @@
+# throttling.py
+#
+# Token-bucket throttles for the unauthenticated OTP endpoints and checkout.
+#
+# Each bucket is stored as a single timestamp in the shared cache (the
+# "theoretical arrival time" form of a token bucket, GCRA), so every worker
+# on the instance sees the same limits. A request is allowed while the
+# bucket has tokens: up to BURST at once, refilled at RATE. Reads and writes
+# aren't atomic, so a handful of simultaneous requests can slip past a
+# nearly empty bucket; that's fine for abuse control.
+#
+# Rates live in settings.RATE_LIMITS keyed by scope. A missing scope
+# disables that throttle.
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+from .metrics import registry as metrics_registry
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(rate):
+    """'5/min' -> (5, 60)"""
+    count, period = rate.split("/")
+    return int(count), PERIODS[period.strip()[0]]
+
+
+class TokenBucketThrottle(BaseThrottle):
+    scope = None
+
+    def get_ident_key(self, request):
+        """What the bucket is keyed on; None skips throttling for this request."""
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        config = getattr(settings, "RATE_LIMITS", {}).get(self.scope)
+        ident = self.get_ident_key(request) if config else None
+        if ident is None:
+            return True
+
+        count, period = parse_rate(config["RATE"])
+        interval = period / count
+        capacity = config.get("BURST", count) * interval
+        key = f"throttle:{self.scope}:{hashlib.sha256(ident.encode()).hexdigest()[:32]}"
+
+        now = time.time()
+        tat = max(cache.get(key, now), now)
+        new_tat = tat + interval
+        if new_tat - now > capacity:
+            self.retry_after = new_tat - now - capacity
+            metrics_registry.inc("throttled_requests_total", {"scope": self.scope})
+            return False
+        cache.set(key, new_tat, timeout=int(new_tat - now) + 1)
+        return True
+
+    def wait(self):
+        return getattr(self, "retry_after", None)
+
+
+class IPThrottle(TokenBucketThrottle):
+    def get_ident_key(self, request):
+        return self.get_ident(request)  # honours REST_FRAMEWORK["NUM_PROXIES"]
+
+
+class EmailThrottle(TokenBucketThrottle):
+    def get_ident_key(self, request):
+        email = request.data.get("email") if hasattr(request.data, "get") else None
+        return email.strip().lower() if isinstance(email, str) and email.strip() else None
+
+
+class UserThrottle(TokenBucketThrottle):
+    def get_ident_key(self, request):
+        return str(request.user.pk) if request.user and request.user.is_authenticated else self.get_ident(request)
+
+
+# Endpoints that send OTP mail (signup, login_request)
+class OTPSendIPThrottle(IPThrottle):
+    scope = "otp_send_ip"
+
+
+class OTPSendEmailThrottle(EmailThrottle):
+    scope = "otp_send_email"
+
+
+# OTP verification: caps code guessing per address
+class OTPVerifyIPThrottle(IPThrottle):
+    scope = "otp_verify_ip"
+
+
+class OTPVerifyEmailThrottle(EmailThrottle):
+    scope = "otp_verify_email"
+
+
+class CheckoutThrottle(UserThrottle):
+    scope = "checkout"
@@ -2,10 +2,12 @@
 from rest_framework.routers import DefaultRouter
 from .views import (
     CategoryViewSet, ProductViewSet, CartItemViewSet,
-    WishlistViewSet, OrderViewSet, UserProfileViewSet,
-    signup, login_request, verify_otp, create_payment_intent
+    WishlistViewSet, OrderViewSet, UserProfileViewSet, ReviewViewSet,
+    signup, login_request, verify_otp, create_payment_intent, metrics, autocomplete,
+    guest_cart_view,
 )
 from django.urls import path
+from . import async_views
 
 # DRF router for viewsets
 router = DefaultRouter()
@@ -15,6 +17,7 @@ router.register(r'cart', CartItemViewSet, basename='cart')
 router.register(r'wishlist-items', WishlistViewSet, basename='wishlist')
 router.register(r'orders', OrderViewSet, basename='order')
 router.register(r'profile', UserProfileViewSet, basename='profile')
+router.register(r'reviews', ReviewViewSet, basename='review')
 
 urlpatterns = [
     # Auth endpoints
@@ -24,7 +27,25 @@ urlpatterns = [
 
     # Stripe payment endpoint
     path('orders/create-payment-intent/', create_payment_intent, name='create-payment-intent'),
-    
+
+    # Cart for signed-out visitors (signed cookie)
+    path('guest-cart/', guest_cart_view, name='guest-cart'),
+
+    # Typeahead for the search box
+    path('search/autocomplete/', autocomplete, name='autocomplete'),
+
+    # Prometheus metrics (staff only)
+    path('metrics/', metrics, name='metrics'),
+
+    # Async (ASGI) read path, same response shapes as the viewsets below
+    path('async/categories/', async_views.category_list, name='async-category-list'),
+    path('async/categories/<int:pk>/', async_views.category_detail, name='async-category-detail'),
+    path('async/products/', async_views.product_list, name='async-product-list'),
+    path('async/products/<int:pk>/', async_views.product_detail, name='async-product-detail'),
+    path('async/products/<int:pk>/related/', async_views.product_related, name='async-product-related'),
+    path('async/wishlist-items/', async_views.wishlist_list, name='async-wishlist-list'),
+    path('async/orders/events/', async_views.order_events, name='async-order-events'),
+    path('async/orders/events/ticket/', async_views.order_events_ticket, name='async-order-events-ticket'),
 ]
 
 # Include router URLs
@@ -1,25 +1,57 @@
 from rest_framework import viewsets, permissions, status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, authentication_classes, throttle_classes
 from rest_framework.permissions import AllowAny,IsAuthenticated
 from rest_framework.response import Response
 from django.contrib.auth.models import User
-from django.core.mail import send_mail
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework_simplejwt.tokens import RefreshToken
 import random
 import uuid
-from .models import Category, Product, CartItem, WishlistItem, Order, UserProfile, OTP,OrderItem
+from .models import Category, Product, CartItem, WishlistItem, Order, UserProfile, OTP,OrderItem, Review, ArchivedOrder
 from .serializers import (
     CategorySerializer, ProductSerializer, CartItemSerializer,
-    WishlistItemSerializer, OrderSerializer, UserProfileSerializer
+    WishlistItemSerializer, OrderSerializer, UserProfileSerializer, ReviewSerializer
 )
+from .pagination import ReviewCursorPagination
+from .permissions import IsOwnerOrReadOnly
 from datetime import datetime, timedelta
 from rest_framework_simplejwt.views import TokenRefreshView
 from rest_framework import filters
-import stripe # type: ignore
 from .models import Payment
 from django.conf import settings
-from django.db.models import Q
+from django.db.models import Case, DecimalField, ExpressionWrapper, F, Q, Sum, Value, When, Window
+from django.http import (
+    FileResponse, Http404, HttpResponse, HttpResponseNotAllowed, HttpResponseNotModified
+)
+from django.core.exceptions import SuspiciousFileOperation
+from django.utils._os import safe_join
+from .storage import content_hash
+import mimetypes
+import os
+import re
+from rest_framework.authentication import SessionAuthentication
+from .authentication import CachedJWTAuthentication, user_cache
+from .blacklist import FilteredRefreshToken
+from .metrics import registry as metrics_registry
+from .caching import CART, get_version
+from django.core.cache import cache
+from .activity import CART_ADD, VIEW, activity_buffer, trending, trending_cache_key
+from .throttling import (
+    CheckoutThrottle, OTPSendEmailThrottle, OTPSendIPThrottle, OTPVerifyEmailThrottle, OTPVerifyIPThrottle
+)
+from .autocomplete import autocomplete_index
+from . import geo
+from .catalog import ORDERING_FIELDS, SEARCH_FIELDS, filter_products
+from .recommendations import companions
+from . import guest_cart
+from .jobs import enqueue
+from decimal import Decimal
+from django.core.files.storage import default_storage
+from django.db import transaction
+from rest_framework.generics import get_object_or_404
+from .archive import include_archived, newest_first
+from .renderers import stream_list
 # ------------------------
 # Category API (Public)
 # ------------------------
@@ -31,25 +63,100 @@ class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
 # ------------------------
 # Product API (Public with category filter)
 # ------------------------
+GEO_MAX_RADIUS_KM = 500
+GEO_DEFAULT_NEAREST = 20
+GEO_MAX_NEAREST = 100
+BOUGHT_TOGETHER_MAX = 20
+
+
 class ProductViewSet(viewsets.ModelViewSet):  # changed from ReadOnly
     queryset = Product.objects.select_related('category').all()
     serializer_class = ProductSerializer
     permission_classes = [permissions.AllowAny]  # only logged-in users can create
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['name', 'category__name']
+    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    search_fields = SEARCH_FIELDS
+    ordering_fields = ORDERING_FIELDS
 
     def get_queryset(self):
-        queryset = super().get_queryset()
-        category_slug = self.request.query_params.get('category')
-
-        if category_slug:
-            queryset = queryset.filter(category__slug__iexact=category_slug)
+        return filter_products(super().get_queryset(), self.request.query_params)
 
-        return queryset
+    def list(self, request, *args, **kwargs):
+        # "Near me": ?lat=&lng= with either &radius=<km> or &nearest=<n> (geo.py)
+        if 'lat' not in request.query_params or 'lng' not in request.query_params:
+            return super().list(request, *args, **kwargs)
+        try:
+            lat, lng = float(request.query_params['lat']), float(request.query_params['lng'])
+            radius = request.query_params.get('radius')
+            radius = min(float(radius), GEO_MAX_RADIUS_KM) if radius else None
+            nearest = min(int(request.query_params.get('nearest', GEO_DEFAULT_NEAREST)), GEO_MAX_NEAREST)
+        except ValueError:
+            return Response({"detail": "lat, lng, radius and nearest must be numbers"}, status=status.HTTP_400_BAD_REQUEST)
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180) or (radius is not None and radius <= 0) or nearest < 1:
+            return Response({"detail": "Coordinates or radius out of range"}, status=status.HTTP_400_BAD_REQUEST)
+
+        hits = geo.nearby(self.filter_queryset(self.get_queryset()), lat, lng, radius_km=radius, limit=nearest)
+        products = self.get_queryset().in_bulk([pk for _, pk in hits])
+        data = []
+        for distance, pk in hits:
+            item = self.get_serializer(products[pk]).data
+            item['distance_km'] = round(distance, 2)
+            data.append(item)
+        return Response(data)
 
     def perform_create(self, serializer):
         serializer.save(seller=self.request.user)
 
+    def retrieve(self, request, *args, **kwargs):
+        response = super().retrieve(request, *args, **kwargs)
+        activity_buffer.record(kwargs['pk'], VIEW)
+        activity_buffer.maybe_flush()
+        return response
+
+    # "Frequently bought together", precomputed by `manage.py build_copurchases`
+    @action(detail=True, methods=['get'], url_path='bought-together')
+    def bought_together(self, request, pk=None):
+        product = self.get_object()
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), BOUGHT_TOGETHER_MAX)
+        except ValueError:
+            limit = 10
+
+        ranked = companions(product.pk, limit)
+        products = Product.objects.select_related('category').in_bulk([pid for pid, _ in ranked])
+        data = []
+        for pid, count in ranked:
+            item = self.get_serializer(products[pid]).data
+            item['bought_together_count'] = count
+            data.append(item)
+        response = Response(data)
+        response['Cache-Control'] = 'public, max-age=300'  # changes only when the job runs
+        return response
+
+    # Products ranked by recent views/cart adds with exponential decay (activity.py)
+    @action(detail=False, methods=['get'])
+    def trending(self, request):
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), 50)
+        except ValueError:
+            limit = 10
+        category_slug = request.query_params.get('category') or ''
+
+        key = trending_cache_key(limit, category_slug)
+        ranked = cache.get(key)
+        metrics_registry.record_cache("trending", ranked is not None)
+        if ranked is None:
+            ranked = trending(limit, category_slug)
+            cache.set(key, ranked, timeout=60)
+
+        products = Product.objects.select_related('category').in_bulk([pid for pid, _ in ranked])
+        data = []
+        for pid, score in ranked:
+            if pid in products:
+                item = self.get_serializer(products[pid]).data
+                item['trending_score'] = round(score, 3)
+                data.append(item)
+        return Response(data)
+
     @action(detail=True, methods=['get'])
     def related(self, request, pk=None):
         product = self.get_object()
@@ -57,6 +164,29 @@ class ProductViewSet(viewsets.ModelViewSet):  # changed from ReadOnly
         serializer = self.get_serializer(related, many=True, context={"request": request})
         return Response(serializer.data)
 
+# ------------------------
+# Review API (public read, author-only writes)
+# ------------------------
+class ReviewViewSet(viewsets.ModelViewSet):
+    serializer_class = ReviewSerializer
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
+    pagination_class = ReviewCursorPagination
+
+    def get_queryset(self):
+        queryset = Review.objects.select_related('user')
+        product_id = self.request.query_params.get('product')
+        if product_id:
+            try:
+                queryset = queryset.filter(product_id=int(product_id))
+            except ValueError:
+                raise ValidationError({"product": "Must be a product id"})
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        if not request.query_params.get('product'):
+            return Response({"detail": "product query parameter is required"}, status=status.HTTP_400_BAD_REQUEST)
+        return super().list(request, *args, **kwargs)
+
 # ------------------------
 # UserProfile API (Authenticated user)
 # ------------------------
@@ -65,17 +195,31 @@ class UserProfileViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        qs = UserProfile.objects.filter(user=self.request.user)
-        if not qs.exists():
-            UserProfile.objects.create(user=self.request.user)
-            qs = UserProfile.objects.filter(user=self.request.user)
-        return qs
+        # Profiles are created by the post_save signal (and `backfill_profiles`
+        # for older accounts), so there is no create branch on the hot path.
+        return UserProfile.objects.select_related('user').filter(user=self.request.user)
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
     def perform_update(self, serializer):
         serializer.save(user=self.request.user)
+
+    @action(detail=False, methods=['get', 'put', 'patch'], url_path='me')
+    def me(self, request):
+        """/api/profile/me/ - the current user's profile in a single query."""
+        try:
+            profile = self.get_queryset().get()
+        except UserProfile.DoesNotExist:
+            profile, _ = UserProfile.objects.get_or_create(user=request.user)
+
+        if request.method == 'GET':
+            return Response(self.get_serializer(profile).data)
+
+        serializer = self.get_serializer(profile, data=request.data, partial=request.method == 'PATCH')
+        serializer.is_valid(raise_exception=True)
+        self.perform_update(serializer)
+        return Response(serializer.data)
 # ------------------------
 # CartItem API (Authenticated user)
 # ------------------------
@@ -106,6 +250,8 @@ class CartItemViewSet(viewsets.ModelViewSet):
         else:
             cart_item.quantity = quantity
             cart_item.save()
+        activity_buffer.record(product.id, CART_ADD)
+        activity_buffer.maybe_flush()
 
         serializer = CartItemSerializer(cart_item)
         return Response(serializer.data)
@@ -117,9 +263,124 @@ class CartItemViewSet(viewsets.ModelViewSet):
         cart_item.save()
         serializer = CartItemSerializer(cart_item)
         return Response(serializer.data)
+
+    # Totals for the cart sidebar without the nested product payloads. Lines and
+    # totals come from one query (window sums); the ETag is the user's cart
+    # version, so an unchanged cart is answered with a 304 after one PK lookup.
+    @action(detail=False, methods=['get'])
+    def summary(self, request):
+        version = get_version(CART, request.user.pk)
+        etag = f'"cart-{request.user.pk}-{version}"'
+        headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+        # CompressionMiddleware weakens the ETag, so compare weakly
+        if etag in [tag.strip().removeprefix('W/') for tag in request.headers.get('If-None-Match', '').split(',')]:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        money = DecimalField(max_digits=12, decimal_places=2)
+        line_total = ExpressionWrapper(F('quantity') * F('product__price'), output_field=money)
+        line_savings = Case(
+            When(product__original_price__gt=F('product__price'),
+                 then=F('quantity') * (F('product__original_price') - F('product__price'))),
+            default=Value(0),
+            output_field=money,
+        )
+        lines = list(
+            self.get_queryset()
+            .annotate(
+                line_total=line_total,
+                line_savings=line_savings,
+                item_count=Window(Sum('quantity')),
+                subtotal=Window(Sum(line_total)),
+                savings=Window(Sum(line_savings)),
+            )
+            .order_by('id')
+            .values('id', 'product_id', 'product__name', 'product__price', 'quantity',
+                    'line_total', 'line_savings', 'item_count', 'subtotal', 'savings')
+        )
+        totals = lines[0] if lines else {'item_count': 0, 'subtotal': 0, 'savings': 0}
+        return Response({
+            'version': version,
+            'item_count': totals['item_count'],
+            'subtotal': _money(totals['subtotal']),
+            'savings': _money(totals['savings']),
+            'lines': [{
+                'id': line['id'],
+                'product_id': line['product_id'],
+                'name': line['product__name'],
+                'quantity': line['quantity'],
+                'unit_price': _money(line['product__price']),
+                'line_total': _money(line['line_total']),
+                'savings': _money(line['line_savings']),
+            } for line in lines],
+        }, headers=headers)
+
+
+CENT = Decimal('0.01')
+
+
+def _money(value):
+    # Same "12.50" strings DRF's DecimalField produces
+    return str(Decimal(str(value or 0)).quantize(CENT))
+# ------------------------
+# Guest cart (signed cookie, no DB writes; merged into CartItem on verify_otp)
+# ------------------------
+#   GET                                   -> [{"product": {...}, "quantity": n}]
+#   POST {"product_id", "quantity"}       -> add to the line
+#   PUT  {"product_id", "quantity"}       -> set the line (0 removes it)
+#   DELETE [?product_id=]                 -> remove one line, or empty the cart
+@api_view(['GET', 'POST', 'PUT', 'DELETE'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def guest_cart_view(request):
+    stored = guest_cart.read(request)
+    cart = dict(stored)
+
+    if request.method in ('POST', 'PUT'):
+        try:
+            product_id = int(request.data.get('product_id'))
+            quantity = int(request.data.get('quantity', 1))
+        except (TypeError, ValueError):
+            return Response({"error": "product_id and quantity must be integers"}, status=400)
+        if quantity < 0 or (request.method == 'POST' and quantity == 0):
+            return Response({"error": "Invalid quantity"}, status=400)
+        if not Product.objects.filter(id=product_id).exists():
+            return Response({"error": "Product not found"}, status=404)
+        if request.method == 'POST':
+            quantity += cart.get(product_id, 0)
+        cart.pop(product_id, None)
+        if quantity:
+            if len(cart) >= guest_cart.MAX_LINES:
+                return Response({"error": f"A guest cart holds at most {guest_cart.MAX_LINES} products"}, status=400)
+            cart[product_id] = min(quantity, guest_cart.MAX_QUANTITY)
+        if request.method == 'POST':
+            activity_buffer.record(product_id, CART_ADD)
+            activity_buffer.maybe_flush()
+    elif request.method == 'DELETE':
+        product_id = request.query_params.get('product_id')
+        if product_id is None:
+            cart = {}
+        elif product_id.isdigit():
+            cart.pop(int(product_id), None)
+
+    products = Product.objects.select_related('category').in_bulk(list(cart))
+    cart = {pid: qty for pid, qty in cart.items() if pid in products}  # drop deleted products
+    data = [
+        {"product": ProductSerializer(products[pid], context={"request": request}).data, "quantity": qty}
+        for pid, qty in cart.items()
+    ]
+    response = Response(data)
+    response['Cache-Control'] = 'private, no-store'
+    if cart != stored:
+        guest_cart.write(response, cart)
+    return response
+
+
 # ------------------------
 # WishlistItem API (Authenticated user)
 # ------------------------
+WISHLIST_BATCH_LIMIT = 200
+
+
 class WishlistViewSet(viewsets.ModelViewSet):
     queryset = WishlistItem.objects.all()
     serializer_class = WishlistItemSerializer
@@ -131,6 +392,45 @@ class WishlistViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+
+    # Compact membership list for product-card toggles: {"product_ids": [...]}.
+    # Not cached: one index range scan on (user_id, product_id) is cheaper than
+    # reading a cache version and then the cached entry.
+    @action(detail=False, methods=['get'])
+    def ids(self, request):
+        product_ids = list(
+            WishlistItem.objects.filter(user_id=request.user.id).order_by('product_id')
+            .values_list('product_id', flat=True)
+        )
+        return Response({"product_ids": product_ids})
+
+    # Batch toggle: {"add": [product ids], "remove": [product ids]}; returns the new membership.
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        add_ids, remove_ids = request.data.get('add', []), request.data.get('remove', [])
+        if not isinstance(add_ids, list) or not isinstance(remove_ids, list):
+            return Response({"detail": "add and remove must be lists of product ids"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            add_ids = {int(pk) for pk in add_ids}
+            remove_ids = {int(pk) for pk in remove_ids}
+        except (TypeError, ValueError):
+            return Response({"detail": "add and remove must be lists of product ids"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(add_ids) + len(remove_ids) > WISHLIST_BATCH_LIMIT:
+            return Response({"detail": f"At most {WISHLIST_BATCH_LIMIT} ids per request"}, status=status.HTTP_400_BAD_REQUEST)
+
+        user = request.user
+        add_ids -= remove_ids
+        existing = set(Product.objects.filter(id__in=add_ids).values_list('id', flat=True))
+        with transaction.atomic():
+            if remove_ids:
+                WishlistItem.objects.filter(user=user, product_id__in=remove_ids).delete()
+            if existing:
+                WishlistItem.objects.bulk_create(
+                    [WishlistItem(user=user, product_id=pk) for pk in existing], ignore_conflicts=True
+                )
+        response = self.ids(request)
+        response.data["missing"] = sorted(add_ids - existing)
+        return response
 # ------------------------
 # Orders API (Read-only for authenticated user)
 # ------------------------
@@ -142,6 +442,33 @@ class OrderViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         return Order.objects.filter(user=self.request.user).order_by('-created_at')
 
+    def get_archived_queryset(self):
+        return (
+            ArchivedOrder.objects.filter(user=self.request.user).order_by('-created_at')
+            .select_related('user', 'payment').prefetch_related('order_items__product__category')
+        )
+
+    def list(self, request, *args, **kwargs):
+        # Streamed in chunks, so long histories don't build one big payload in memory
+        orders = self.get_queryset().select_related('user', 'payment').prefetch_related('order_items__product__category')
+        # Archived (old, finished) orders are only read when asked for
+        if include_archived(request):
+            orders = newest_first(orders, self.get_archived_queryset())
+        return stream_list(request, orders, self.get_serializer_class(), self.get_serializer_context())
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            return super().retrieve(request, *args, **kwargs)
+        except Http404:
+            archived = get_object_or_404(self.get_archived_queryset(), pk=kwargs[self.lookup_field])
+            return Response(self.get_serializer(archived).data)
+
+    def get_throttles(self):
+        # Only placing an order is rate limited; browsing history isn't
+        if self.action == 'create':
+            return [CheckoutThrottle()]
+        return super().get_throttles()
+
     def create(self, request, *args, **kwargs):
         user = request.user
         items_data = request.data.get("items", [])
@@ -191,8 +518,11 @@ class OrderViewSet(viewsets.ModelViewSet):
 # ------------------------
 # Signup with OTP
 # ------------------------
+OTP_EMAIL_PRIORITY = 10  # ahead of other queued mail: the code expires in 5 minutes
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([OTPSendIPThrottle, OTPSendEmailThrottle])
 def signup(request):
     email = request.data.get('email')
     first_name = request.data.get('first_name')
@@ -209,15 +539,10 @@ def signup(request):
 
     # Generate OTP
     otp_code = str(random.randint(100000, 999999))
-    OTP.objects.create(user=user, code=otp_code)
-
-    send_mail(
-        'Your OTP Code',
-        f'Your OTP is {otp_code}',
-        'karrilokesh108@gmail.com',  # replace with your email
-        [email],
-        fail_silently=False
-    )
+    otp = OTP.objects.create(user=user, code=otp_code)
+
+    # Sent through the job queue (inline unless a runworker process is configured)
+    enqueue("send_otp_email", {"otp_id": otp.id}, priority=OTP_EMAIL_PRIORITY, max_attempts=3)
 
     return Response({"message": "User created. OTP sent to email."})
 
@@ -226,6 +551,7 @@ def signup(request):
 # ------------------------
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([OTPSendIPThrottle, OTPSendEmailThrottle])
 def login_request(request):
     email = request.data.get('email')
     try:
@@ -238,15 +564,9 @@ def login_request(request):
 
     # Generate new OTP
     otp_code = str(random.randint(100000, 999999))
-    OTP.objects.create(user=user, code=otp_code)
-
-    send_mail(
-        'Your OTP Code',
-        f'Your OTP is {otp_code}',
-        settings.EMAIL_HOST_USER,
-        [email],
-        fail_silently=False
-    )
+    otp = OTP.objects.create(user=user, code=otp_code)
+
+    enqueue("send_otp_email", {"otp_id": otp.id}, priority=OTP_EMAIL_PRIORITY, max_attempts=3)
 
     return Response({"message": "OTP sent to email. Please verify to login."})
 
@@ -256,6 +576,7 @@ def login_request(request):
 # ------------------------
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([OTPVerifyIPThrottle, OTPVerifyEmailThrottle])
 def verify_otp(request):
     email = request.data.get('email')
     otp_input = request.data.get('otp')
@@ -272,6 +593,10 @@ def verify_otp(request):
     otp_obj.verified = True
     otp_obj.save()
 
+    # Fold any guest cart built before signing in into the user's cart
+    cart = guest_cart.read(request)
+    cart_merged = guest_cart.merge(user, cart) if cart else 0
+
     # Generate tokens
     refresh = RefreshToken.for_user(user)
     access_token = str(refresh.access_token)
@@ -281,8 +606,11 @@ def verify_otp(request):
         "user": {
             "name": user.first_name,
             "email": user.email,
-        }
+        },
+        "cart_merged": cart_merged,
     })
+    if cart:
+        guest_cart.clear(response)
 
     # ✅ Correct: Set HTTP-only refresh token cookie (7 days)
     expires_at = datetime.utcnow() + settings.SIMPLE_JWT["REFRESH_TOKEN_LIFETIME"]
@@ -305,8 +633,9 @@ def logout_view(request):
     try:
         refresh_token = request.COOKIES.get(settings.SIMPLE_JWT['AUTH_COOKIE'])
         if refresh_token:
-            token = RefreshToken(refresh_token)
+            token = FilteredRefreshToken(refresh_token)
             token.blacklist()
+        user_cache.invalidate(request.user.pk)
     except Exception as e:
         return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -324,6 +653,7 @@ def generate_payment_token(request):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@throttle_classes([CheckoutThrottle])
 def create_payment_intent(request):
     """
     Create a Stripe PaymentIntent for the given order
@@ -342,6 +672,8 @@ def create_payment_intent(request):
     # Convert to integer cents for Stripe
     amount_cents = int(order.total_price * 100)
 
+    import stripe  # type: ignore  # imported on first use: it adds ~1s to process start
+
     intent = stripe.PaymentIntent.create(
         amount=amount_cents,
         currency='inr',
@@ -351,4 +683,124 @@ def create_payment_intent(request):
     return Response({
         'client_secret': intent.client_secret,
         'order_id': order.id,
-    })
\ No newline at end of file
+    })
+
+# ------------------------
+# Metrics (Prometheus text format, staff only)
+# ------------------------
+@api_view(['GET'])
+@authentication_classes([CachedJWTAuthentication, SessionAuthentication])
+@permission_classes([permissions.IsAdminUser])
+def metrics(request):
+    return HttpResponse(metrics_registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+# ------------------------
+# Search-box autocomplete (in-memory prefix index, no DB per request)
+# ------------------------
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def autocomplete(request):
+    try:
+        limit = min(max(int(request.query_params.get('limit', 8)), 1), 20)
+    except ValueError:
+        limit = 8
+    result = autocomplete_index.search(request.query_params.get('q', ''), limit)
+    products = [
+        {**p, "image": request.build_absolute_uri(default_storage.url(p["image"])) if p["image"] else None}
+        for p in result["products"]
+    ]
+    response = Response({"categories": result["categories"], "products": products})
+    response['Cache-Control'] = 'public, max-age=60'
+    return response
+
+
+# ------------------------
+# Media files (works with DEBUG off)
+# ------------------------
+MEDIA_IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+MEDIA_MUTABLE_MAX_AGE = 60 * 60
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class _RangeFile:
+    """File wrapper that stops after `length` bytes (for 206 responses)."""
+
+    def __init__(self, fh, start, length):
+        fh.seek(start)
+        self.fh = fh
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.fh.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.fh.close()
+
+
+def serve_media(request, path):
+    """
+    Serve uploaded media with validators and long-lived caching. Files stored by
+    ContentAddressedStorage are named by their sha256, so they are immutable
+    and the hash doubles as the ETag. Full responses use FileResponse, which
+    lets the WSGI server use sendfile (wsgi.file_wrapper).
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return HttpResponseNotAllowed(['GET', 'HEAD'])
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not full_path or not os.path.isfile(full_path):
+        raise Http404
+
+    stat = os.stat(full_path)
+    digest = content_hash(path)
+    if digest:
+        etag = f'"{digest}"'
+        cache_control = f'public, max-age={MEDIA_IMMUTABLE_MAX_AGE}, immutable'
+    else:
+        etag = f'"{stat.st_size:x}-{int(stat.st_mtime):x}"'
+        cache_control = f'public, max-age={MEDIA_MUTABLE_MAX_AGE}'
+
+    headers = {'ETag': etag, 'Cache-Control': cache_control, 'Accept-Ranges': 'bytes'}
+    if etag in [tag.strip() for tag in request.headers.get('If-None-Match', '').split(',')]:
+        response = HttpResponseNotModified()
+        for key, value in headers.items():
+            response[key] = value
+        return response
+
+    content_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+    range_header = request.headers.get('Range', '')
+    if_range = request.headers.get('If-Range')
+    match = RANGE_RE.match(range_header) if range_header and (not if_range or if_range == etag) else None
+
+    if match and (match.group(1) or match.group(2)):
+        size = stat.st_size
+        if match.group(1):
+            start = int(match.group(1))
+            end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+        else:  # suffix range: last N bytes
+            start = max(size - int(match.group(2)), 0)
+            end = size - 1
+        if start >= size or start > end:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+        response = FileResponse(_RangeFile(open(full_path, 'rb'), start, end - start + 1),
+                                status=206, content_type=content_type)
+        response['Content-Length'] = str(end - start + 1)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    else:
+        response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+
+    for key, value in headers.items():
+        response[key] = value
+    return response
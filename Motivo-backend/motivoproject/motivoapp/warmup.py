@@ -0,0 +1,88 @@
+# warmup.py
+#
+# Optional work done once per process before it serves traffic, so the first
+# request after a cold start doesn't pay for it. wsgi.py and asgi.py call
+# maybe_warm_up() right after the application is loaded, which under
+# gunicorn/uvicorn is before the worker accepts connections. Enable with
+# WARMUP["ENABLED"] (env WARMUP_ON_START=1).
+#
+# Each step is best effort: a failure is counted in warmup_errors_total and
+# startup continues. `manage.py profile_startup --warmup` times the steps.
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections
+
+from .metrics import registry as metrics_registry
+
+WARMUP_URL_NAMES = ["product-list", "category-list", "order-list", "autocomplete", "async-product-list"]
+
+
+def _urls():
+    from django.urls import get_resolver, reverse
+
+    get_resolver().url_patterns
+    for name in WARMUP_URL_NAMES:
+        reverse(name)  # builds the resolver's reverse lookup tables
+
+
+def _serializers():
+    from django.apps import apps
+    from rest_framework.serializers import ModelSerializer
+
+    from . import serializers
+
+    for model in apps.get_models():
+        model._meta.get_fields()  # relation tree the ORM otherwise builds on first query
+    for value in vars(serializers).values():
+        if isinstance(value, type) and issubclass(value, ModelSerializer) and value.__module__ == serializers.__name__:
+            value().fields  # ModelSerializer field introspection
+
+
+def _catalog():
+    from django.core.cache import cache
+
+    from . import geo
+    from .activity import trending, trending_cache_key
+    from .autocomplete import autocomplete_index
+    from .models import Category
+
+    list(Category.objects.all())
+    geo.gazetteer()
+    autocomplete_index.ensure_built()
+    cache.add(trending_cache_key(10), trending(10), timeout=60)  # the home page's default
+
+
+STEPS = {"urls": _urls, "serializers": _serializers, "catalog": _catalog}
+
+
+def warm_up(steps=None):
+    """Run the warm-up steps; returns {step: seconds, or None if it failed}."""
+    timings = {}
+    for name in steps or STEPS:
+        start = time.perf_counter()
+        try:
+            STEPS[name]()
+        except Exception:
+            metrics_registry.inc("warmup_errors_total", {"step": name})
+            timings[name] = None
+        else:
+            timings[name] = time.perf_counter() - start
+    # Don't hand a connection opened here to forked workers (gunicorn --preload)
+    connections.close_all()
+    return timings
+
+
+def maybe_warm_up():
+    config = getattr(settings, "WARMUP", {})
+    if not config.get("ENABLED"):
+        return None
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return warm_up(config.get("STEPS"))
+    # Loaded from inside an event loop (uvicorn), where the sync ORM refuses to run
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(warm_up, config.get("STEPS")).result()
@@ -1,5 +1,16 @@
+# Serve with any ASGI server to get the async read path in motivoapp/async_views.py
+# without a thread per request, e.g.
+#   uvicorn motivoproject.asgi:application
+#   gunicorn motivoproject.asgi:application -k uvicorn.workers.UvicornWorker
+# The order status stream (/api/async/orders/events/) needs ASGI: it holds the
+# connection open, and its event hub (motivoapp/events.py) is per process.
 import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'motivoproject.settings')
 application = get_asgi_application()
+
+# Optional warm-up (settings.WARMUP) before the server accepts connections
+from motivoapp.warmup import maybe_warm_up  # noqa: E402
+
+maybe_warm_up()
@@ -1,8 +1,8 @@
 from pathlib import Path
 from datetime import timedelta
 import uuid
-import stripe
 import os
+import tempfile
 
 # ----------------------
 # Base Directory
@@ -41,6 +41,8 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",  # MUST be first
     "django.middleware.security.SecurityMiddleware",
+    "motivoapp.middleware.ConcurrencyLimitMiddleware",  # shed load before any real work
+    "motivoapp.middleware.CompressionMiddleware",  # outside everything that builds the body
     "whitenoise.middleware.WhiteNoiseMiddleware",  # ✅ whitenoise right after security
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -48,6 +50,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "motivoapp.middleware.MetricsMiddleware",
 ]
 
 # ----------------------
@@ -92,6 +95,20 @@ else:
         }
     }
 
+# ----------------------
+# Cache
+# ----------------------
+# File-based so every gunicorn worker on the instance shares entries and
+# invalidations; point CACHE_LOCATION somewhere persistent in production.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get("CACHE_LOCATION", os.path.join(tempfile.gettempdir(), "motivo-cache")),
+        "TIMEOUT": 300,
+        "OPTIONS": {"MAX_ENTRIES": 10_000},
+    }
+}
+
 # ----------------------
 # Email Settings
 # ----------------------
@@ -116,11 +133,24 @@ CORS_ALLOW_CREDENTIALS = True
 # ----------------------
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "motivoapp.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
     ),
+    # orjson-backed JSON (falls back to the stdlib encoder if orjson is missing)
+    "DEFAULT_RENDERER_CLASSES": (
+        "motivoapp.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "motivoapp.renderers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
+    # Render's proxy appends the client address to X-Forwarded-For; only that
+    # last hop is trusted for IP throttles (anything before it is client-supplied)
+    "NUM_PROXIES": int(os.environ.get("NUM_PROXIES", "1")),
 }
 
 SIMPLE_JWT = {
@@ -134,6 +164,22 @@ SIMPLE_JWT = {
     "AUTH_COOKIE_HTTP_ONLY": True,
     "AUTH_COOKIE_PATH": "/",
     "AUTH_COOKIE_SAMESITE": "Lax",
+    "TOKEN_REFRESH_SERIALIZER": "motivoapp.serializers.FilteredTokenRefreshSerializer",
+}
+
+# In-memory Bloom filter in front of refresh-token blacklist lookups
+# (motivoapp.blacklist). Expired rows are removed with `manage.py prune_tokens`.
+TOKEN_BLACKLIST_FILTER = {
+    "CAPACITY": 100_000,
+    "ERROR_RATE": 0.001,
+    "REBUILD_INTERVAL": 3600,  # seconds
+}
+
+# Per-process cache of authenticated users (motivoapp.authentication).
+# Other workers see user changes after at most TTL seconds.
+JWT_USER_CACHE = {
+    "MAX_SIZE": 2048,
+    "TTL": 60,
 }
 
 # ----------------------
@@ -146,9 +192,138 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Uploads are stored under their content hash (deduplicated, cacheable forever)
+# and served by motivoapp.views.serve_media.
+STORAGES = {
+    "default": {"BACKEND": "motivoapp.storage.ContentAddressedStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 CSRF_TRUSTED_ORIGINS = ["https://motiv-x199.onrender.com"]
+
+# ----------------------
+# Metrics (/api/metrics/, staff only)
+# ----------------------
+# Each gunicorn worker writes its snapshot here; the endpoint merges them.
+METRICS_DIR = os.environ.get("METRICS_DIR", os.path.join(tempfile.gettempdir(), "motivo-metrics"))
+METRICS_FLUSH_INTERVAL = 5  # seconds
+
+# ----------------------
+# Rate limiting & load shedding
+# ----------------------
+# Token buckets (motivoapp.throttling), shared through CACHES so all workers
+# agree: RATE is the refill rate, BURST the bucket size. Drop a scope to disable it.
+RATE_LIMITS = {
+    "otp_send_ip": {"RATE": "20/hour", "BURST": 5},
+    "otp_send_email": {"RATE": "5/hour", "BURST": 3},
+    "otp_verify_ip": {"RATE": "30/hour", "BURST": 10},
+    "otp_verify_email": {"RATE": "10/hour", "BURST": 5},
+    "checkout": {"RATE": "30/hour", "BURST": 5},
+}
+
+# Max in-flight requests per path prefix in each process (ConcurrencyLimitMiddleware);
+# more are answered 503 + Retry-After immediately. Only reachable where a process
+# serves requests concurrently (ASGI, threaded workers). Event streams hold
+# their slot for as long as the client stays connected.
+CONCURRENCY_LIMITS = {
+    "/api/auth/": 8,
+    "/api/orders/": 8,
+    "/api/async/orders/events/": 200,
+}
+
+# ----------------------
+# Autocomplete (/api/search/autocomplete/)
+# ----------------------
+# Per-worker in-memory index; rebuilt periodically to pick up other workers' edits.
+AUTOCOMPLETE = {
+    "REBUILD_INTERVAL": 600,  # seconds
+    "MAX_SCAN": 20000,        # index terms examined per uncached prefix
+}
+
+# ----------------------
+# Product activity (views / cart adds -> trending)
+# ----------------------
+# Counts are buffered per process and upserted into hourly buckets.
+PRODUCT_ACTIVITY = {
+    "FLUSH_INTERVAL": 10,    # seconds between batched writes
+    "MAX_PENDING": 5000,     # flush early once this many (product, hour) keys are buffered
+    "HALF_LIFE_HOURS": 24,   # an hour's activity counts half as much HALF_LIFE_HOURS later
+    "WINDOW_HOURS": 168,     # ignore buckets older than this
+    "VIEW_WEIGHT": 1.0,
+    "CART_ADD_WEIGHT": 5.0,
+}
+
+# ----------------------
+# Response compression (motivoapp.middleware.CompressionMiddleware)
+# ----------------------
+# brotli is used when the `brotli` package is installed, gzip otherwise.
+COMPRESSION = {
+    "MIN_SIZE": 1024,        # bytes; smaller bodies aren't worth it
+    "GZIP_LEVEL": 6,
+    "BROTLI_QUALITY": 4,     # 0-11; higher is much slower for dynamic responses
+    "EXCLUDE_PREFIXES": ["/api/auth/", "/api/token/"],
+}
+
+# ----------------------
+# Background jobs (motivoapp/jobs.py, manage.py runworker)
+# ----------------------
+# Stored in the main database; no broker. Jobs run inline in the request
+# unless JOB_QUEUE_EAGER=0, which is only safe once a `manage.py runworker`
+# process shares this database (the render.yaml web service has none).
+JOB_QUEUE = {
+    "EAGER": os.environ.get("JOB_QUEUE_EAGER", "1") != "0",
+    "QUEUES": ["default", "email"],
+    "CONCURRENCY": 4,             # threads per worker
+    "POLL_INTERVAL": 1.0,         # seconds between polls when idle
+    "MAX_ATTEMPTS": 5,
+    "RETRY_BASE_SECONDS": 10,     # 10s, 20s, 40s, ... between attempts
+    "RETRY_MAX_SECONDS": 3600,
+    "VISIBILITY_TIMEOUT": 600,    # a job running longer is assumed orphaned and requeued
+    "HOUSEKEEPING_INTERVAL": 60,
+    "KEEP_DONE_HOURS": 72,
+}
+
+# ----------------------
+# Guest cart (/api/guest-cart/, signed cookie)
+# ----------------------
+GUEST_CART = {
+    "COOKIE_NAME": "guest_cart",
+    "MAX_AGE": 30 * 24 * 3600,  # seconds
+    "MAX_LINES": 50,            # keeps the cookie well under 4 KB
+    "MAX_QUANTITY": 99,
+}
+
+# ----------------------
+# Frequently bought together (manage.py build_copurchases)
+# ----------------------
+RECOMMENDATIONS = {
+    "CHUNK_ORDERS": 2000,      # order ids counted per transaction
+    "MAX_BASKET": 50,          # skip orders with more distinct products than this
+    "SETTLE_SECONDS": 300,     # leave orders newer than this for the next run
+}
+
+# ----------------------
+# Warm-up (motivoapp/warmup.py)
+# ----------------------
+# Primes URL resolvers, serializers and catalog caches when wsgi.py/asgi.py
+# load, before the first request is accepted.
+WARMUP = {
+    "ENABLED": os.environ.get("WARMUP_ON_START", "") == "1",
+    "STEPS": ["urls", "serializers", "catalog"],
+}
+
+# ----------------------
+# Order archive (manage.py archive_orders)
+# ----------------------
+# Finished orders older than AFTER_DAYS move to the Archived* tables; order
+# history endpoints include them with ?include_archived=1.
+ORDER_ARCHIVE = {
+    "AFTER_DAYS": 180,
+    "STATUSES": ["delivered", "cancelled"],
+    "CHUNK_SIZE": 500,
+}
 # ----------------------
 # Localization
 # ----------------------
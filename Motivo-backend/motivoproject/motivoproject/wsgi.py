@@ -3,3 +3,8 @@ from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'motivoproject.settings')
 application = get_wsgi_application()
+
+# Optional warm-up (settings.WARMUP) before the server accepts connections
+from motivoapp.warmup import maybe_warm_up  # noqa: E402
+
+maybe_warm_up()
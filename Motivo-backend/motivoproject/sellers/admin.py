@@ -1,12 +1,15 @@
 from django.contrib import admin
 from django.utils.html import format_html
+from motivoapp.admin_utils import LargeTableAdmin
 from .models import Seller
 
-class SellerAdmin(admin.ModelAdmin):
+class SellerAdmin(LargeTableAdmin):
     list_display = ('user', 'shop_name', 'phone_number', 'website', 'created_at', 'profile_image_preview')
     search_fields = ('user__username', 'shop_name', 'user__email', 'phone_number', 'website')
     readonly_fields = ('created_at', 'updated_at', 'profile_image_preview')
     list_filter = ('created_at',)
+    list_select_related = ('user',)
+    raw_id_fields = ('user',)
     fieldsets = (
         (None, {
             'fields': ('user', 'shop_name', 'phone_number', 'address', 'website', 'bio', 'profile_image', 'profile_image_preview')
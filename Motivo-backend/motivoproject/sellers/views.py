@@ -5,11 +5,20 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from motivoapp.models import Product
-from django.db.models import Sum, F
-from motivoapp.models import Order, OrderItem
+from django.db.models import Count, Sum, F
+from motivoapp.models import Order, OrderItem, ArchivedOrder, ArchivedOrderItem
+from motivoapp.archive import include_archived, newest_first
 from rest_framework.views import APIView
 from motivoapp.serializers import ProductSerializer, OrderSerializer
 from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework.negotiation import BaseContentNegotiation
+from motivoapp.renderers import dumps, stream_list
+from datetime import datetime, timedelta
+import csv
+import itertools
 class SellerSignupView(generics.CreateAPIView):
     queryset = Seller.objects.all()
     serializer_class = SellerSerializer
@@ -40,9 +49,9 @@ class SellerProfileView(generics.RetrieveUpdateAPIView):
 @permission_classes([IsAuthenticated])
 def my_products(request):
     # Assuming Product.seller is a ForeignKey to User
-    products = Product.objects.filter(seller=request.user)
-    serializer = ProductSerializer(products, many=True)
-    return Response(serializer.data)
+    # Unpaginated, so stream it: memory and time to first byte don't grow with the catalogue
+    products = Product.objects.filter(seller=request.user).select_related('category').order_by('id')
+    return stream_list(request, products, ProductSerializer)
 
 # sellers/views.py
 class SellerOrdersView(APIView):
@@ -50,10 +59,140 @@ class SellerOrdersView(APIView):
 
     def get(self, request):
         seller = request.user
-        orders = Order.objects.filter(order_items__product__seller=seller).distinct()
-        serializer = OrderSerializer(orders, many=True, context={"request": request})
-        return Response(serializer.data)
+        orders = (
+            Order.objects.filter(order_items__product__seller=seller).distinct()
+            .select_related('user', 'payment').prefetch_related('order_items__product__category')
+        )
+        if include_archived(request):
+            archived = (
+                ArchivedOrder.objects.filter(order_items__product__seller=seller).distinct()
+                .select_related('user', 'payment').prefetch_related('order_items__product__category')
+            )
+            orders = newest_first(orders.order_by('-created_at'), archived.order_by('-created_at'))
+        return stream_list(request, orders, OrderSerializer)
     
+# Streaming export of the seller's order lines for accounting.
+#   GET /api/sellers/my-orders/export/?export_format=csv|jsonl&from=YYYY-MM-DD&to=YYYY-MM-DD
+# ("format" is reserved by DRF for format suffixes.) Rows are read with
+# values_list().iterator() and written as they arrive, so memory stays flat
+# and the first bytes go out before the query has finished.
+EXPORT_COLUMNS = (
+    ('order_id', 'order_id'),
+    ('order_date', 'order__created_at'),
+    ('order_status', 'order__status'),
+    ('product_id', 'product_id'),
+    ('product_name', 'product__name'),
+    ('quantity', 'quantity'),
+    ('unit_price', 'price_at_purchase'),
+)
+EXPORT_HEADER = [name for name, _ in EXPORT_COLUMNS] + ['line_total']
+EXPORT_CHUNK_SIZE = 2000
+
+
+class IgnoreClientContentNegotiation(BaseContentNegotiation):
+    # The export picks its own content type; don't 406 on Accept: text/csv
+    def select_parser(self, request, parsers):
+        return parsers[0]
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+
+class _Echo:
+    # csv.writer target that hands the formatted line straight back
+    def write(self, value):
+        return value
+
+
+class SellerOrderExportView(APIView):
+    permission_classes = [IsAuthenticated]
+    content_negotiation_class = IgnoreClientContentNegotiation
+
+    def get(self, request):
+        export_format = request.query_params.get('export_format', 'csv')
+        if export_format not in ('csv', 'jsonl'):
+            return Response({"detail": "export_format must be csv or jsonl"}, status=400)
+        try:
+            date_from = self._parse_date('from')
+            date_to = self._parse_date('to')
+        except ValueError:
+            return Response({"detail": "from/to must be dates in YYYY-MM-DD format"}, status=400)
+
+        # Archived orders are older, so their lines go first
+        rows = itertools.chain(*(
+            self._rows(model.objects.filter(product__seller=request.user), date_from, date_to)
+            for model in (ArchivedOrderItem, OrderItem)
+        ))
+
+        if export_format == 'csv':
+            content, content_type = self._csv(rows), 'text/csv; charset=utf-8'
+        else:
+            content, content_type = self._jsonl(rows), 'application/x-ndjson'
+        response = StreamingHttpResponse(content, content_type=content_type)
+        filename = f"orders-{date_from or 'start'}-{date_to or 'now'}.{export_format}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        response['Cache-Control'] = 'no-store'
+        return response
+
+    def _rows(self, items, date_from, date_to):
+        if date_from:
+            items = items.filter(order__created_at__gte=self._start_of(date_from))
+        if date_to:
+            items = items.filter(order__created_at__lt=self._start_of(date_to + timedelta(days=1)))
+        return (
+            items.order_by('order_id', 'id')
+            .values_list(*(source for _, source in EXPORT_COLUMNS))
+            .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        )
+
+    def _parse_date(self, param):
+        value = self.request.query_params.get(param)
+        if not value:
+            return None
+        parsed = parse_date(value)
+        if parsed is None:
+            raise ValueError(param)
+        return parsed
+
+    @staticmethod
+    def _start_of(day):
+        return timezone.make_aware(datetime.combine(day, datetime.min.time()))
+
+    @staticmethod
+    def _row(row):
+        row = list(row)
+        row[1] = timezone.localtime(row[1]).isoformat()
+        row.append(str(row[6] * row[5]))
+        row[6] = str(row[6])
+        return row
+
+    def _csv(self, rows):
+        writer = csv.writer(_Echo())
+        yield writer.writerow(EXPORT_HEADER)
+        yield from _batched(writer.writerow(self._row(row)) for row in rows)
+
+    def _jsonl(self, rows):
+        yield from _batched(dumps(dict(zip(EXPORT_HEADER, self._row(row)))) + b'\n' for row in rows)
+
+
+def _batched(lines, size=500):
+    # The first line goes out alone so the client sees bytes at once; the rest in fewer, larger writes
+    lines = iter(lines)
+    first = next(lines, None)
+    if first is None:
+        return
+    yield first
+    empty = first[:0]  # '' or b''
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) == size:
+            yield empty.join(batch)
+            batch = []
+    if batch:
+        yield empty.join(batch)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def seller_dashboard_stats(request):
@@ -62,14 +201,15 @@ def seller_dashboard_stats(request):
     # Total products listed by seller
     products_count = Product.objects.filter(seller=seller).count()
 
-    # Total orders for seller products
-    # Using OrderItem to get seller-specific product orders
-    total_orders = OrderItem.objects.filter(product__seller=seller).count()
-
-    # Total earnings
-    total_earnings = OrderItem.objects.filter(product__seller=seller).aggregate(
-        earnings=Sum(F('price_at_purchase') * F('quantity'))
-    )['earnings'] or 0
+    # Total orders / earnings for seller products, from OrderItem lines.
+    # Lifetime totals, so archived order lines count too.
+    total_orders = total_earnings = 0
+    for model in (OrderItem, ArchivedOrderItem):
+        totals = model.objects.filter(product__seller=seller).aggregate(
+            lines=Count('id'), earnings=Sum(F('price_at_purchase') * F('quantity'))
+        )
+        total_orders += totals['lines']
+        total_earnings += totals['earnings'] or 0
 
     return Response({
         "products_listed": products_count,
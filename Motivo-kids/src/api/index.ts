@@ -112,8 +112,7 @@ export const logoutUser = () => {
 // ================== USER PROFILE ==================
 export const fetchCurrentUserProfile = async (): Promise<any | null> => {
   try {
-    const res = await api.get('/profile/');
-    if (Array.isArray(res.data)) return res.data.length > 0 ? res.data[0] : null;
+    const res = await api.get('/profile/me/');
     return res.data;
   } catch (err) {
     console.error('Failed to fetch user profile:', (err as AxiosError).message);
@@ -121,12 +120,12 @@ export const fetchCurrentUserProfile = async (): Promise<any | null> => {
   }
 };
 
-export const updateUserProfile = async (id: number, data: any, profileImage?: File) => {
+export const updateUserProfile = async (_id: number, data: any, profileImage?: File) => {
   const formData = new FormData();
   Object.keys(data).forEach(key => formData.append(key, data[key]));
   if (profileImage) formData.append('profile_image', profileImage);
 
-  const res = await api.patch(`/profile/${id}/`, formData, {
+  const res = await api.patch('/profile/me/', formData, {
     headers: { 'Content-Type': 'multipart/form-data' },
   });
   return res.data;
@@ -140,6 +139,13 @@ export const fetchProductsByCategory = async (categorySlug?: string): Promise<an
 export const fetchFeaturedProducts = async (): Promise<any[]> => fetchProductsByCategory();
 export const fetchAllProducts = async (): Promise<any[]> => fetchProductsByCategory();
 
+// Typeahead suggestions from the server's in-memory index (no full product query)
+export const fetchAutocomplete = async (q: string, limit = 8) =>
+  (await api.get('/search/autocomplete/', { params: { q, limit } })).data as {
+    categories: { id: number; name: string; slug: string }[];
+    products: { id: number; name: string; slug: string; price: number; image?: string }[];
+  };
+
 // ================== CART ==================
 export const fetchCart = async () => (await api.get('/cart/')).data;
 export const addToCart = async (productId: number, quantity = 1) =>
@@ -148,6 +154,19 @@ export const removeFromCart = async (cartItemId: number) =>
   (await api.delete(`/cart/${cartItemId}/`)).data;
 export const updateCart = async (cartItemId: number, quantity: number) =>
   (await api.put(`/cart/${cartItemId}/`, { quantity: Number(quantity) })).data;
+// Totals + line totals without product payloads. The browser revalidates it with
+// the ETag (If-None-Match), so an unchanged cart comes back as a bodiless 304.
+export const fetchCartSummary = async () => (await api.get('/cart/summary/')).data;
+
+// Signed-out cart, kept in a signed cookie by the API; verify-otp merges it
+// into the user's cart (response.cart_merged), so no replay is needed after login.
+export const fetchGuestCart = async () => (await api.get('/guest-cart/')).data;
+export const addToGuestCart = async (productId: number, quantity = 1) =>
+  (await api.post('/guest-cart/', { product_id: Number(productId), quantity: Number(quantity) })).data;
+export const updateGuestCart = async (productId: number, quantity: number) =>
+  (await api.put('/guest-cart/', { product_id: Number(productId), quantity: Number(quantity) })).data;
+export const removeFromGuestCart = async (productId: number) =>
+  (await api.delete('/guest-cart/', { params: { product_id: productId } })).data;
 
 // ================== WISHLIST ==================
 export const fetchWishlist = async (): Promise<any[]> => {
@@ -186,6 +205,36 @@ export interface OrderItemPayload {
 export const createOrder = async (items: OrderItemPayload[]): Promise<any> =>
   (await api.post('/orders/', { items })).data;
 
+// Live order/payment status via Server-Sent Events instead of polling /orders/.
+// Events: "snapshot" ({orders: [...]}) on connect, then "order_status" / "payment_status".
+// EventSource can't send headers, so each connection uses a fresh single-use ticket;
+// on error the stream is reopened with a new one (the snapshot catches it up).
+export const subscribeOrderEvents = (onEvent: (event: string, data: any) => void): (() => void) => {
+  let source: EventSource | null = null;
+  let closed = false;
+  const connect = async () => {
+    try {
+      const { ticket } = (await api.post('/async/orders/events/ticket/')).data;
+      if (closed) return;
+      source = new EventSource(`${API_BASE}/async/orders/events/?ticket=${encodeURIComponent(ticket)}`);
+      ['snapshot', 'order_status', 'payment_status'].forEach((name) =>
+        source!.addEventListener(name, (e) => onEvent(name, JSON.parse((e as MessageEvent).data)))
+      );
+      source.onerror = () => {
+        source?.close();
+        if (!closed) setTimeout(connect, 5000);
+      };
+    } catch (err) {
+      if (!closed) setTimeout(connect, 5000);
+    }
+  };
+  connect();
+  return () => {
+    closed = true;
+    source?.close();
+  };
+};
+
 export const markOrderPaid = async (orderId: number, method: string, transactionId?: string): Promise<any> =>
   (await api.post(`/orders/${orderId}/mark_paid/`, { method, transaction_id: transactionId || null })).data;
 // ================== SELLER AUTH ==================
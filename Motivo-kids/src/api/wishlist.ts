@@ -45,4 +45,24 @@ export const clearWishlist = async (): Promise<void> => {
   } catch (err) {
     console.error("Failed to clear wishlist:", err);
   }
-};
\ No newline at end of file
+};
+// Ids-only membership for product-card toggles
+export const fetchWishlistIds = async (): Promise<number[]> => {
+  try {
+    const res = await api.get("/wishlist-items/ids/");
+    return Array.isArray(res.data?.product_ids) ? res.data.product_ids : [];
+  } catch (err) {
+    console.error("Failed to fetch wishlist ids:", err);
+    return [];
+  }
+};
+
+export const batchUpdateWishlist = async (add: number[] = [], remove: number[] = []): Promise<number[] | null> => {
+  try {
+    const res = await api.post("/wishlist-items/batch/", { add, remove });
+    return res.data.product_ids;
+  } catch (err) {
+    console.error("Failed to update wishlist:", err);
+    return null;
+  }
+};
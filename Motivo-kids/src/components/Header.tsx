@@ -9,6 +9,7 @@ import { useTheme } from '../contexts/ThemeContext';
 import mtvLogo from '../assets/mtv.png';
 import confetti from 'canvas-confetti';
 import defaultAvatar from '../assets/default-avatar.png';
+import { fetchAutocomplete } from '../api';
 
 interface Product {
   id: number;
@@ -61,11 +62,8 @@ const Header: React.FC<HeaderProps> = ({ cartItemCount, onCartClick }) => {
     }
     const fetchSuggestions = async () => {
       try {
-        const res = await fetch(
-          `http://127.0.0.1:8000/api/products/?search=${encodeURIComponent(searchQuery)}`
-        );
-        const data: Product[] = await res.json();
-        setSuggestions(data.slice(0, 5));
+        const data = await fetchAutocomplete(searchQuery, 5);
+        setSuggestions(data.products);
         setShowDropdown(true);
         setShowProfileDropdown(false);
         setShowPartnerDropdown(false);